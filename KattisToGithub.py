@@ -1,38 +1,146 @@
+from __future__ import annotations
 import os
+import re
 import sys
-import requests
-import subprocess
+import time
+import threading
+import importlib.util
 from pathlib import Path
+from argparse import Namespace
+from urllib.parse import quote
 from functools import cached_property
-from typing import List, Dict, Generator
-from bs4 import BeautifulSoup as Soup
+from itertools import zip_longest
+from contextlib import contextmanager, asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, List, Dict, Generator, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from src.constants import *
 from src.csv_handler import CsvHandler
+from src.sqlite_state import SqliteStateStore
+from src.git_backend import GitBackend
+from src.solution_writer import SolutionWriter
+from src.progress_journal import ProgressJournal
+from src.problem_registry import ProblemRegistry
+from src.recent_activity import RecentActivity
 from src.markdown_list import MarkdownList
-from src.argument_parser import parse_arguments
-from src.solved_problem import SolvedProblem, ProblemStatus
+from src.http_cache import HttpCache, CacheEntry
+from src.http_client import HttpClient, FetchError
+from src.http2_session import Http2Session, http2_is_available
+from src.run_profiler import RunProfiler
+from src.session_store import SessionStore
+from src.html_parser import HtmlParser, PROBLEMS_PAGE, SUBMISSIONS_PAGE, SUBMISSION_PAGE, LOGIN_PAGE
+from src.argument_parser import parse_arguments, parse_offline_arguments
+from src.offline_commands import run_offline_command
+from src.batch_config import BatchConfig, AccountConfig, load_batch_config
+from src.rate_limiter import RateLimiter
+from src.solved_problem import SolvedProblem, ProblemStatus, Difficulty, intern_language
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup as Soup
+    from src.async_http_client import Fetch
 
 
 class KattisToGithub:
     def __init__(self) -> None:
+        import requests
         self.session = requests.Session()
+        self.profiler = RunProfiler()
+        self.profile_path: Path = None
+        self.http_client = HttpClient(self.session, profiler=self.profiler)
         self.base_url = BASE_URL
         self.login_url = LOGIN_URL
-        self.solved_problems: List[SolvedProblem] = []
-        self.user_should_git_push = False
+        self.registry = ProblemRegistry()
+        self.git: GitBackend = None
+        self.solution_writer: SolutionWriter = None
+        self.state_store = None
+        self.workers = DEFAULT_WORKERS
+        self.full_sync = False
+        self.http_cache: HttpCache = None
+        self.html_parser = HtmlParser()
+        self.recently_active_links = set()
+        self.journal: ProgressJournal = None
+        self.unfinished_links = set()
+        self.state_lock = threading.Lock()
+        self.failed_links = set()
+        self.session_store: SessionStore = None
+        self.shared_executor: ThreadPoolExecutor = None
+        self.discover = False
+        self.discovered_submissions: Dict[str, List[List[str]]] = None
+        self.async_engine = False
+        self.async_fetch: Fetch = None
+        self.transport = TRANSPORTS[0]
 
     def get_run_details_from_sys_argv(self) -> None:
         """
         Uses src/argument_parser to extract the Kattis login details from command line input.
         Stores these values to self.user and self.password respectively.
         """
-        parser = parse_arguments(sys.argv[1:])
+        self.get_run_details(parse_arguments(sys.argv[1:]))
+
+    def get_run_details(self, parser: Namespace) -> None:
+        """
+        Stores the run details from arguments parsed by src/argument_parser.
+        """
         self.user = parser.user
         self.password = parser.password
         self.directory = Path(__file__).parent / parser.directory
         self.no_git = parser.no_git
         self.no_readme = parser.no_readme
         self.py_main_only = parser.py_main_only
+        self.commit_each = parser.commit_each
+        self.state_backend = parser.state
+        self.git = GitBackend(self.directory)
+        self.solution_writer = SolutionWriter(self.directory, self.state_lock)
+        self.session_store = SessionStore(self.directory)
+        self.workers = parser.workers
+        self.full_sync = parser.full
+        self.no_cache = parser.no_cache
+        self.html_parser = HtmlParser(backend=parser.html_parser)
+        self.base_url = parser.base_url.rstrip('/')
+        self.login_url = self.base_url + LOGIN_PATH
+        self.profile_path = Path(parser.profile) if parser.profile is not None else None
+        self.profiler.cprofile = parser.cprofile
+        self.poll_interval = parser.poll_interval
+        self.discover = parser.discover
+        self.async_engine = parser.async_engine
+        self.transport = parser.transport
+        self._size_connection_pool()
+
+    def _size_connection_pool(self) -> None:
+        """
+        Mounts a HTTPAdapter whose connection pool is large enough for every worker to keep its own connection alive.
+        With --transport http2 the session is replaced by an Http2Session instead, whose one connection is shared by every worker.
+        """
+        if self.transport == 'http2' and self._use_http2():
+            return
+        from requests.adapters import HTTPAdapter
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _use_http2(self) -> bool:
+        """
+        Returns:
+        - bool: True if requests are made over HTTP/2; False if httpx or h2 is not installed, and HTTP/1.1 is used instead
+        """
+        if isinstance(self.session, Http2Session):
+            return True
+        if not http2_is_available():
+            print('#: --transport http2 requires httpx and h2, install them with "pip install httpx[http2]". Using HTTP/1.1 instead')
+            return False
+        self.session = Http2Session(self.session)
+        self.http_client.session = self.session
+        return True
+
+    @contextmanager
+    def _worker_pool(self) -> Generator[ThreadPoolExecutor, None, None]:
+        """
+        Yields the worker pool shared by the accounts of a batch run, or otherwise a pool of self.workers threads.
+        """
+        if self.shared_executor is not None:
+            yield self.shared_executor
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield executor
 
     def create_folders_for_solutions(self) -> None:
         """
@@ -42,8 +150,48 @@ class KattisToGithub:
             print(f'#: Creating folder for problem solutions')
             os.mkdir(self.directory / 'Solutions')
 
+    def create_http_cache(self) -> None:
+        """
+        Creates the on-disk HTTP response cache next to status.csv, unless --no-cache was given.
+        """
+        if not self.no_cache:
+            self.http_cache = HttpCache(self.directory)
+
+    @property
+    def solved_problems(self) -> List[SolvedProblem]:
+        return self.registry.solved_problems
+
+    @solved_problems.setter
+    def solved_problems(self, solved_problems: List[SolvedProblem]) -> None:
+        self.registry = ProblemRegistry(solved_problems)
+
+    def _get_state_store(self):
+        """
+        Returns the CsvHandler or SqliteStateStore selected with --state. Both offer load_registry, save and should_add_to_gitignore.
+        """
+        if self.state_store is None:
+            self.state_store = SqliteStateStore(self.directory) if self.state_backend == 'sqlite' else CsvHandler(self.directory)
+        return self.state_store
+
+    @property
+    def _state_is_upserted(self) -> bool:
+        """
+        True if SolvedProblems are saved one by one as their state changes, i.e. with --state sqlite.
+        status.csv is instead rewritten as a whole at the end of the run.
+        """
+        return isinstance(self._get_state_store(), SqliteStateStore)
+
+    def _save_solved_problem(self, solved_problem: SolvedProblem) -> None:
+        if self._state_is_upserted:
+            self._get_state_store().upsert(solved_problem)
+
     def load_solved_problem_status_csv(self) -> None:
-        self.solved_problems = CsvHandler(self.directory).load_solved_problems()
+        """
+        Loads the state of SolvedProblems, and replays the progress journal left behind by an interrupted run.
+        """
+        self.registry = self._get_state_store().load_registry()
+        self.journal = ProgressJournal(self.directory)
+        self.unfinished_links = self.journal.replay(self.registry)
 
     @property
     def login_payload(self) -> Dict:
@@ -58,12 +206,16 @@ class KattisToGithub:
         return f'{self.base_url}/users/{self.user}'
 
     @cached_property
-    def _solved_problem_submission_url(self) -> str:
-        return f'{self._solved_problems_url}?tab=submissions&problem='
+    def _recent_solved_problems_url(self) -> str:
+        return f'{self._solved_problems_url}?{RECENT_ACTIVITY_QUERY}'
+
+    @cached_property
+    def _submissions_tab_url(self) -> str:
+        return f'{self._solved_problems_url}?tab=submissions'
 
     @cached_property
-    def _solved_problem_links(self) -> str:
-        return [problem.submissions_link for problem in self.solved_problems]
+    def _solved_problem_submission_url(self) -> str:
+        return f'{self._submissions_tab_url}&problem='
 
     def _get_CSRF_token(self) -> str:
         """
@@ -72,72 +224,271 @@ class KattisToGithub:
         Returns:
         - str: CSRF token
         """
-        response = self.session.get(self.login_url)
-        if response.status_code != 200:
-            print('#: GETin the login page failed')
+        try:
+            response = self.http_client.get(self.login_url)
+        except FetchError as e:
+            print(f'#: GETin the login page failed: {e}')
             return
-        soup = Soup(response.text, 'html.parser')
+        soup = self._parse(response.text, LOGIN_PAGE)
         return soup.find('input', {'name': 'csrf_token'}).get('value')
 
     def login(self) -> bool:
         """
-        Logs into Kattis with the given credentials.
+        Logs into Kattis. A session saved by an earlier run is reused if it is still valid,
+        otherwise the given credentials are used and the new session is saved.
 
         Returns:
         - bool: True if successfully logged in; False otherwise
         """
+        if self.session_store is not None and self.session_store.load(self.session, self.user):
+            if self._session_is_valid():
+                print('#: Reusing the saved Kattis session')
+                return True
+            print('#: Saved Kattis session has expired')
+            self.session.cookies.clear()
         print('#: Attempting to login')
-        response = self.session.post(self.login_url, data=self.login_payload, timeout=30)
-        if response.status_code != 200:
-            print('#: Something went wrong during login')
+        try:
+            response = self.http_client.post(self.login_url, data=self.login_payload)
+        except FetchError as e:
+            print(f'#: Something went wrong during login: {e}')
             return False
         if response.url == self.login_url:
             print(f'#: Login failed')
             return False
         else:
             print('#: Logged in to Kattis')
+            if self.session_store is not None:
+                self.session_store.save(self.session, self.user)
             return True
 
-    def _get_html(self, url: str) -> Soup:
-        response = self.session.get(url)
-        return Soup(response.text, 'html.parser')
+    def _session_is_valid(self) -> bool:
+        """
+        Probes the front page, which links to /logout only for a logged in session. The page is not parsed.
+        """
+        try:
+            return LOGGED_IN_MARKER in self.http_client.get(self.base_url).text
+        except FetchError:
+            return False
+
+    def _get_html(self, url: str, page: str = None) -> Soup:
+        entry, _ = self._fetch_page(url)
+        return self._parse(entry.body, page)
+
+    def _parse(self, text: str, page: str = None) -> Soup:
+        with self.profiler.timer('parse'):
+            return self.html_parser.parse(text, page)
+
+    def _fetch_page(self, url: str, permanent: bool = False) -> Tuple[CacheEntry, bool]:
+        """
+        GETs the given URL. If the URL is cached, the request is made conditional, and permanent entries are not requested at all.
+        Raises FetchError if the page could not be downloaded.
+
+        Parameters:
+        - url: URL of the page.
+        - permanent: If True, the page never changes and is kept in the cache regardless of its age.
+
+        Returns:
+        - Tuple[CacheEntry, bool]: The page, and whether it is unchanged since it was cached
+        """
+        if self.http_cache is None:
+            return CacheEntry(url=url, body=self.http_client.get(url).text, content_hash=None), False
+        entry = self.http_cache.get(url)
+        if entry is not None and entry.permanent and entry.parsed:
+            return entry, True
+        response = self.http_client.get(url, headers=entry.conditional_headers if entry is not None else {})
+        return self._cache_response(url, entry, response, permanent)
+
+    def _cache_response(self, url: str, entry: CacheEntry, response: Any, permanent: bool) -> Tuple[CacheEntry, bool]:
+        """
+        Stores a response to a request made for _fetch_page in the cache. A 304 response only refreshes the cached entry.
+
+        Parameters:
+        - url: URL of the page.
+        - entry: The entry cached before the request; None if there was none.
+        - response: A requests.Response, or an AsyncResponse of the --async engine.
+        - permanent: If True, the page never changes and is kept in the cache regardless of its age.
+
+        Returns:
+        - Tuple[CacheEntry, bool]: The page, and whether it is unchanged since it was cached
+        """
+        if response.status_code == 304 and entry is not None:
+            self.http_cache.touch(entry)
+            return entry, True
+        unchanged = entry is not None and entry.content_hash == HttpCache.content_hash(response.text)
+        entry = self.http_cache.store(
+            url, response.text, etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'), permanent=permanent
+        )
+        return entry, unchanged
+
+    def _get_page_data(self, url: str, extract: Callable[[Soup], Any], page: str = None, permanent: bool = False) -> Any:
+        """
+        Returns the data extracted from a page. For unchanged cached pages the previously extracted data is reused,
+        so neither the download nor the parsing is repeated.
+
+        Parameters:
+        - url: URL of the page.
+        - extract: Function which extracts JSON serializable data from the parsed page.
+        - page: Kind of the page, see src/html_parser.PAGE_SUBTREES.
+        - permanent: If True, the page never changes and is kept in the cache regardless of its age.
+
+        Returns:
+        - Any: The value returned by extract
+        """
+        entry, unchanged = self._fetch_page(url, permanent)
+        return self._extract_page_data(entry, unchanged, extract, page)
+
+    def _extract_page_data(self, entry: CacheEntry, unchanged: bool, extract: Callable[[Soup], Any], page: str = None) -> Any:
+        if unchanged and extract.__name__ in entry.parsed:
+            return entry.parsed[extract.__name__]
+        soup = self._parse(entry.body, page)
+        with self.profiler.timer('extract'):
+            data = extract(soup)
+        self.html_parser.decompose(soup)
+        if self.http_cache is not None and entry.content_hash is not None:
+            self.http_cache.store_parsed(entry, extract.__name__, data)
+        return data
 
     def get_solved_problems(self) -> None:
-        html = self._get_html(self._solved_problems_url)
-        pages = ['']
-        for page in pages:
-            print(f'#: Collecting solved problems from {self._solved_problems_url + page}')
-            html = self._get_html(self._solved_problems_url + page)
+        """
+        Collects the SolvedProblems listed on the user's problems tab.
+        Unless a full sync was requested, or nothing is known from status.csv yet, only the most recently active pages are checked.
+
+        Returns:
+        - None
+        """
+        if self.full_sync or len(self.solved_problems) == 0:
+            self._get_all_solved_problems()
+        else:
+            self._get_recently_solved_problems()
+
+    def _get_all_solved_problems(self) -> None:
+        """
+        Collects the SolvedProblems listed on every page of the user's problems tab, sorted by most recent activity.
+        The first page is used to find out the number of pages, after which the remaining pages are fetched concurrently.
+        Known SolvedProblems with new activity are marked to be checked for new submissions.
+
+        Returns:
+        - None
+        """
+        print(f'#: Collecting solved problems from {self._recent_solved_problems_url}')
+        try:
+            first_page = self._get_html(self._recent_solved_problems_url, PROBLEMS_PAGE)
+        except FetchError as e:
+            print(f'#: Could not collect solved problems: {e}')
+            return
+        activity = RecentActivity(self.registry)
+        self._add_solved_problems_from_page(first_page, activity)
+        for html in self._get_remaining_pages(first_page):
+            if html is not None:
+                self._add_solved_problems_from_page(html, activity)
+                self.html_parser.decompose(html)
+        self.html_parser.decompose(first_page)
+        for sp in activity.finish():
+            self._save_solved_problem(sp)
+        print(f'#: Found a total of {len(self.solved_problems)} solved problems')
+
+    def _get_recently_solved_problems(self) -> None:
+        """
+        Walks the problems tab sorted by most recent activity, one page at a time.
+        SolvedProblems with new activity are marked to be checked for new submissions, see RecentActivity.
+        Paging stops at the first page without new activity. Known SolvedProblems whose rows were never recorded
+        are checked if they are on the first page.
+
+        Returns:
+        - None
+        """
+        activity = RecentActivity(self.registry)
+        page, last_page = 1, 1
+        while page <= last_page:
+            url = self._problems_page_url(page)
+            print(f'#: Collecting recently solved problems from {url}')
+            try:
+                html = self._get_html(url, PROBLEMS_PAGE)
+            except FetchError as e:
+                print(f'#: Could not collect recently solved problems: {e}')
+                break
+            page_has_changes = False
             for sp_html in self._find_solved_problems_from_html(html):
                 sp = self._parse_solved_problem(sp_html)
-                if sp.submissions_link not in self._solved_problem_links:
-                    self.solved_problems += [sp]
-            self._get_links_to_next_pages(html, pages)
+                if activity.observe(sp, unrecorded_is_active=page == 1):
+                    self.recently_active_links.add(sp.submissions_link)
+                    page_has_changes = True
+            last_page = self._get_last_page_number(html)
+            self.html_parser.decompose(html)
+            if not page_has_changes:
+                break
+            page += 1
+        for sp in activity.finish():
+            self._save_solved_problem(sp)
         print(f'#: Found a total of {len(self.solved_problems)} solved problems')
 
-    def _find_solved_problems_from_html(self, html: Soup) -> List[Soup]:
+    def _problems_page_url(self, page: int) -> str:
+        return self._recent_solved_problems_url + (f'&page={page}' if page > 1 else '')
+
+    def _get_remaining_pages(self, first_page: Soup) -> Generator[Soup, None, None]:
         """
-        Extracts entries from the 'problems-tab' of the user's page.
+        Fetches the pages following the first page of the problems tab in parallel. Pages are yielded in order.
+        Should the pagination only show a window of page numbers, the last fetched pages are used to look for more.
+        A page which could not be fetched is yielded as None.
+
+        Parameters:
+        - first_page: BeautifulSoup object of the first page of the problems tab.
 
         Returns:
-        - List[Soup]: List of table elements containing info on solved problems
+        - Generator[Soup]: The pages 2..N of the problems tab
         """
-        return [solved_problem_html for solved_problem_html in \
-            html.find('div', attrs={'id': 'problems-tab'}).find('tbody').find_all('tr')
-        ]
+        fetched_until = 1
+        last_page = self._get_last_page_number(first_page)
+        with self._worker_pool() as executor:
+            while last_page > fetched_until:
+                page_urls = [self._problems_page_url(n) for n in range(fetched_until + 1, last_page + 1)]
+                print(f'#: Collecting solved problems from {len(page_urls)} more pages')
+                fetched_until = last_page
+                for html in executor.map(self.profiler.profiled(self._try_get_problems_page), page_urls):
+                    if html is not None:
+                        last_page = max(last_page, self._get_last_page_number(html))
+                    yield html
+
+    def _add_solved_problems_from_page(self, html: Soup, activity: RecentActivity) -> None:
+        for sp_html in self._find_solved_problems_from_html(html):
+            sp = self._parse_solved_problem(sp_html)
+            if activity.observe(sp):
+                self.recently_active_links.add(sp.submissions_link)
 
-    def _get_links_to_next_pages(self, html: Soup, pages: List[str]) -> None:
+    def _try_get_problems_page(self, url: str) -> Soup:
+        try:
+            return self._get_html(url, PROBLEMS_PAGE)
+        except FetchError as e:
+            print(f'#: Skipping a page of solved problems: {e}')
+            return None
+
+    def _get_last_page_number(self, html: Soup) -> int:
         """
-        Looks for the numbered next page buttons and obtains the query strings from them.
+        Looks for the numbered page buttons and returns the largest page number found among them.
 
         Parameters:
         - html: BeautifulSoup object created from a HTTP request response.
-        - pages: List of query params leading to further pages. The lists contents is updated inside this function.
+
+        Returns:
+        - int: Number of the last page; 1 if there are no further pages
+        """
+        page_numbers = [
+            int(match.group(1)) for match in (
+                re.search(r'[?&]page=(\d+)', href.attrs['href']) for href in html.find_all('a', href=True, attrs={'role': 'button'})
+            ) if match
+        ]
+        return max(page_numbers, default=1)
+
+    def _find_solved_problems_from_html(self, html: Soup) -> List[Soup]:
+        """
+        Extracts entries from the 'problems-tab' of the user's page.
+
+        Returns:
+        - List[Soup]: List of table elements containing info on solved problems
         """
-        next_pages = [href.attrs['href'] for href in html.find_all('a', href=True, attrs={'role': 'button'}) if '?page=' in href.attrs['href']]
-        for next_page in next_pages:
-            if next_page not in pages and next_page != '?page=1':
-                pages += [next_page]
+        return [solved_problem_html for solved_problem_html in \
+            html.find('div', attrs={'id': 'problems-tab'}).find('tbody').find_all('tr')
+        ]
 
     def _parse_solved_problem(self, html) -> SolvedProblem:
         """
@@ -151,35 +502,254 @@ class KattisToGithub:
         """
         problem_link = html.contents[0].find('a')['href']
         return SolvedProblem(
-            problem_link=BASE_URL + problem_link,
+            problem_link=self.base_url + problem_link,
             submissions_link = self._solved_problem_submission_url + problem_link.replace('/problems/', ''),
             name = html.contents[0].text,
             points = html.contents[4].find('span').text,
-            difficulty = html.contents[4].find('span').attrs['class'][-1].split('_')[1].capitalize()
+            difficulty = Difficulty.parse(html.contents[4].find('span').attrs['class'][-1].split('_')[1]),
+            activity = '|'.join(td.text.strip() for td in html.contents[1:])
         )
 
     def get_codes_for_solved_problems(self) -> None:
+        """
+        Downloads the codes of SolvedProblems which don't yet have the status CODE_FOUND.
+        With --async the asyncio engine of src/async_pipeline is used, if aiohttp is installed; otherwise a pool of worker threads.
+        SolvedProblems whose pages could not be downloaded are skipped, and checked again on the next run.
+
+        Returns:
+        - None
+        """
+        self.discover_new_submissions()
         print('#: Starting to fetch codes for solved problems')
-        ctr = 0
+        solved_problems_to_check = [sp for sp in self.solved_problems if self._should_look_for_code(sp)]
+        if self.async_engine and self._async_engine_is_available():
+            self._get_codes_asynchronously(solved_problems_to_check)
+        else:
+            self._get_codes_with_threads(solved_problems_to_check)
+        print(f'#: {len(self.solution_writer.changed_paths)} solution files were written')
+        if len(self.failed_links) > 0:
+            print(f'#: {len(self.failed_links)} solved problems could not be checked')
+
+    def _get_codes_with_threads(self, solved_problems_to_check: List[SolvedProblem]) -> None:
+        """
+        Each SolvedProblem is handled by exactly one worker of a pool with self.workers threads,
+        so its files and fields are never modified concurrently.
+        """
+        futures = {}
+        with self._worker_pool() as executor:
+            try:
+                get_code = self.profiler.profiled(self._get_code_for_solved_problem)
+                futures = {executor.submit(get_code, sp): sp for sp in solved_problems_to_check}
+                for ctr, future in enumerate(as_completed(futures), start=1):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self._skip_solved_problem(futures[future], e)
+                    if ctr % 59 == 0:
+                        print(f'#: Checked {ctr} solved problems...')
+                    if self.journal is not None and self.journal.records_since_compaction >= JOURNAL_COMPACTION_INTERVAL:
+                        self._compact_journal()
+            except KeyboardInterrupt:
+                print('#: Downloading solutions was interrupted by user')
+                print('#: Performing final steps before shutdown...')
+            finally:
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                # The new activity of unchecked SolvedProblems is already recorded, so they are retried through the journal
+                self.failed_links |= {sp.submissions_link for future, sp in futures.items() if future.cancelled() or future.exception() is not None}
+
+    def _skip_solved_problem(self, solved_problem: SolvedProblem, error: Exception) -> None:
+        """
+        Leaves a SolvedProblem whose code could not be downloaded or extracted to the next run, so that one failing problem,
+        e.g. one whose page has an unexpected layout, does not abort the sync before the state is saved.
+        """
+        reason = str(error) if isinstance(error, FetchError) else f'{type(error).__name__}: {error}'
+        print(f'#: Skipping {solved_problem.name}, it will be retried on the next run: {reason}')
+        self.failed_links.add(solved_problem.submissions_link)
+
+    def _async_engine_is_available(self) -> bool:
+        if self.async_fetch is None and importlib.util.find_spec('aiohttp') is None:
+            print('#: --async requires aiohttp, install it with "pip install aiohttp". Downloading with threads instead')
+            return False
+        return True
+
+    def _get_codes_asynchronously(self, solved_problems_to_check: List[SolvedProblem]) -> None:
+        """
+        Downloads the codes with src/async_pipeline. Up to self.workers requests are made concurrently over kept-alive connections,
+        while parsing and disk access run in a small thread pool, or in the pool shared by the accounts of a batch run.
+        """
+        import asyncio
+        from src.async_pipeline import AsyncPipeline
+        from src.async_http_client import AsyncHttpClient
+
+        async def download() -> None:
+            async with self._async_fetch() as fetch:
+                pipeline = AsyncPipeline(self, AsyncHttpClient(self.http_client, fetch), executor, consumers=self.workers)
+                await pipeline.run(solved_problems_to_check)
+        executor = self.shared_executor if self.shared_executor is not None else ThreadPoolExecutor()
         try:
-            for solved_problem in self.solved_problems:
-                if self._should_look_for_code(solved_problem):
-                    solved_problem_html = self._get_html(solved_problem.submissions_link)
-                    for link, language in self._get_submission_link_and_language(solved_problem_html):
-                        if language not in solved_problem.filename_language_dict.values() or solved_problem.status == ProblemStatus.UPDATE:
-                            submission_html = self._get_html(link)
-                            self._parse_submission(solved_problem, submission_html, language)
-                        else:
-                            pass
-                ctr += 1
-                if ctr > 0 and ctr % 59 == 0:
-                    print(f'#: Checked {ctr} solved problems...')
+            asyncio.run(download())
         except KeyboardInterrupt:
             print('#: Downloading solutions was interrupted by user')
             print('#: Performing final steps before shutdown...')
+            self.failed_links |= {sp.submissions_link for sp in solved_problems_to_check}
+        finally:
+            if executor is not self.shared_executor:
+                executor.shutdown(wait=True)
+
+    @asynccontextmanager
+    async def _async_fetch(self) -> AsyncIterator[Fetch]:
+        """
+        Yields the injected self.async_fetch, or otherwise a fetch using aiohttp with one connection for each worker.
+        """
+        if self.async_fetch is not None:
+            yield self.async_fetch
+            return
+        from src.async_http_client import aiohttp_fetch
+        async with aiohttp_fetch(self.session, self.workers) as fetch:
+            yield fetch
+
+    def _get_code_for_solved_problem(self, solved_problem: SolvedProblem) -> None:
+        """
+        Fetches the submissions list of a SolvedProblem and downloads the accepted submissions from it.
+        Only the newest submission of each language and filename is kept, so older submissions of a language are fetched only if a newer one was rejected.
+        Each code is written to disk as soon as it is downloaded, and only its filename, language and hash are kept in memory.
+
+        Parameters:
+        - solved_problem: The SolvedProblem whose code should be downloaded.
+        """
+        if self._submissions_were_discovered(solved_problem):
+            submissions = self.discovered_submissions[solved_problem.submissions_link]
+        else:
+            submissions = self._get_page_data(solved_problem.submissions_link, self._extract_submission_links, SUBMISSIONS_PAGE)
+        added_languages, added_filenames = set(), set()
+        for link, language in self._get_unseen_submissions(solved_problem, submissions):
+            if language in added_languages:
+                continue
+            submission = self._get_submission(solved_problem, link, language)
+            if submission['filename'] in added_filenames:
+                continue
+            if self._add_submission(solved_problem, submission, language):
+                added_languages.add(language)
+                added_filenames.add(submission['filename'])
+        self._finish_solved_problem(solved_problem, submissions)
+
+    def _finish_solved_problem(self, solved_problem: SolvedProblem, submissions: List[List[str]]) -> None:
+        """
+        Remembers the newest accepted submission of a SolvedProblem whose submissions were all checked, and records it as finished in the journal.
+        With --state sqlite the SolvedProblem is saved right away.
+        """
+        if len(submissions) > 0:
+            with self.state_lock:
+                solved_problem.last_submission_id = self._get_submission_id(submissions[0][0])
+        if self.journal is not None:
+            self.journal.record(solved_problem, finished=True)
+        self._save_solved_problem(solved_problem)
+
+    def discover_new_submissions(self) -> None:
+        """
+        With --discover, pages through the user's submissions tab, newest first, until reaching the newest submission seen on an earlier run.
+        The accepted submissions found are grouped by problem into self.discovered_submissions, so that problems downloaded on earlier runs
+        need no submissions page of their own. If the newest seen submission is unknown or not reached, every problem is checked separately.
+
+        Returns:
+        - None
+        """
+        self.discovered_submissions = None
+        last_seen_id = self._get_last_seen_submission_id()
+        if not self.discover or last_seen_id is None:
+            return
+        discovered_submissions = {}
+        page, last_page = 1, 1
+        while page <= last_page:
+            url = self._submissions_tab_url + (f'&page={page}' if page > 1 else '')
+            print(f'#: Discovering new submissions from {url}')
+            try:
+                submissions_tab = self._get_page_data(url, self._extract_submissions_tab, SUBMISSIONS_PAGE)
+            except FetchError as e:
+                print(f'#: Could not discover new submissions, checking solved problems one by one: {e}')
+                return
+            for link, language, problem_link, accepted in submissions_tab['submissions']:
+                if int(self._get_submission_id(link)) <= last_seen_id:
+                    self.discovered_submissions = discovered_submissions
+                    print(f'#: Discovered new submissions for {len(discovered_submissions)} solved problems')
+                    return
+                if accepted:
+                    submissions_link = self._solved_problem_submission_url + problem_link.replace('/problems/', '')
+                    discovered_submissions.setdefault(submissions_link, []).append([link, language])
+            last_page = submissions_tab['last_page']
+            page += 1
+        print('#: The newest submission seen before was not found, checking solved problems one by one')
+
+    def _get_last_seen_submission_id(self) -> int:
+        """
+        Returns:
+        - int: The largest last_submission_id among the SolvedProblems; None if no submission has been seen yet
+        """
+        return max(
+            (int(sp.last_submission_id) for sp in self.solved_problems if sp.last_submission_id is not None and sp.last_submission_id.isdigit()),
+            default=None
+        )
+
+    def _submissions_were_discovered(self, solved_problem: SolvedProblem) -> bool:
+        """
+        Discovery covers only the submissions made after the newest seen one. Those are all that is needed for SolvedProblems
+        whose code was found up to their last seen submission; others still have their submissions page checked.
+        """
+        return self.discovered_submissions is not None \
+            and solved_problem.status == ProblemStatus.CODE_FOUND \
+            and solved_problem.last_submission_id is not None \
+            and solved_problem.submissions_link not in self.unfinished_links
+
+    def _compact_journal(self) -> None:
+        """
+        Saves the state of all SolvedProblems and starts a new journal.
+        SolvedProblems with files not yet committed are recorded again, so that a crash before git still commits them on the next run.
+        """
+        with self.state_lock:
+            if not self._state_is_upserted:
+                self._get_state_store().save(self.registry)
+            self.journal.compact(sp for sp in self.solved_problems if len(sp.changed_filenames) > 0)
+
+    def _get_unseen_submissions(self, solved_problem: SolvedProblem, submissions: List[List[str]]) -> List[List[str]]:
+        """
+        Picks the accepted submissions which are newer than the SolvedProblem's last seen submission.
+        If no submission has been seen yet, only submissions in languages without downloaded code are picked.
+        The status UPDATE picks every submission.
+
+        Parameters:
+        - solved_problem: The SolvedProblem the submissions belong to.
+        - submissions: [link, language] pairs of accepted submissions, newest first.
+
+        Returns:
+        - List[List[str]]: The picked [link, language] pairs, newest first
+        """
+        if solved_problem.status == ProblemStatus.UPDATE:
+            return submissions
+        unseen_submissions = []
+        for link, language in submissions:
+            if self._get_submission_id(link) == solved_problem.last_submission_id:
+                break
+            if solved_problem.last_submission_id is None and language in solved_problem.filename_language_dict.values():
+                continue
+            unseen_submissions += [[link, language]]
+        return unseen_submissions
+
+    def _get_submission_id(self, submission_link: str) -> str:
+        return submission_link.rstrip('/').split('/')[-1]
 
     def _should_look_for_code(self, solved_problem: SolvedProblem) -> bool:
-        return solved_problem.status != ProblemStatus.CODE_FOUND
+        """
+        SolvedProblems without code are always checked. Ones with code are checked if they had new activity on the problems tab,
+        as a new accepted submission may have been made for them, or if an interrupted run did not finish them.
+        If new submissions were discovered from the submissions tab, a SolvedProblem covered by discovery is checked only if it has some.
+        """
+        if self._submissions_were_discovered(solved_problem):
+            return solved_problem.submissions_link in self.discovered_submissions
+        return solved_problem.status != ProblemStatus.CODE_FOUND \
+            or solved_problem.submissions_link in self.recently_active_links \
+            or solved_problem.submissions_link in self.unfinished_links
 
     def _get_submission_link_and_language(self, html: Soup) -> Generator[str, str, None]:
         for tr in html.find('div', attrs={'id': 'submissions-tab'}).find('tbody').find_all('tr'):
@@ -188,17 +758,109 @@ class KattisToGithub:
                 programming_language = tr.find('td', attrs={'data-type': 'lang'}).text
                 yield submission_link, programming_language
 
+    def _extract_submission_links(self, html: Soup) -> List[List[str]]:
+        return [[link, language] for link, language in self._get_submission_link_and_language(html)]
+
+    def _extract_submissions_tab(self, html: Soup) -> Dict:
+        """
+        Extracts every submission listed on a page of the user's submissions tab, accepted or not, and the number of the last page.
+
+        Returns:
+        - Dict: {'submissions': [[link, language, problem link, accepted], ...] newest first, 'last_page': int}
+        """
+        submissions = []
+        for tr in html.find('div', attrs={'id': 'submissions-tab'}).find('tbody').find_all('tr'):
+            submissions += [[
+                self.base_url + tr.find('td', attrs={'data-type': 'actions'}).find('a', href=True).attrs['href'],
+                tr.find('td', attrs={'data-type': 'lang'}).text,
+                tr.find('td', attrs={'data-type': 'problem'}).find('a', href=True).attrs['href'],
+                tr.find('div', {'class': 'status is-status-accepted'}) is not None
+            ]]
+        return {'submissions': submissions, 'last_page': self._get_last_page_number(html)}
+
+    def _get_submission(self, solved_problem: SolvedProblem, link: str, language: str) -> Dict:
+        """
+        Downloads a submission. If the SolvedProblem already has code in the same language, the submission most likely has the same filename,
+        and only its raw source file is downloaded, which is much smaller than the highlighted submission page and needs no parsing.
+        Otherwise, or if there is no raw source file by that name, the code is extracted from the submission page.
+
+        Parameters:
+        - solved_problem: The SolvedProblem the submission belongs to.
+        - link: URL of the submission page.
+        - language: Programming language of the submission.
+
+        Returns:
+        - Dict: {'filename': str, 'code': str}, see _extract_submission
+        """
+        filename = self._get_known_filename(solved_problem, language)
+        if filename is not None:
+            try:
+                code = self._read_raw_source(self.http_client.get(self._submission_source_url(link, filename)))
+            except FetchError:
+                code = None
+            if code is not None:
+                return {'filename': filename, 'code': code}
+        return self._get_page_data(link, self._extract_submission, SUBMISSION_PAGE, permanent=True)
+
+    def _get_known_filename(self, solved_problem: SolvedProblem, language: str) -> str:
+        """
+        Returns:
+        - str: The filename of the newest code downloaded for the language; None if there is none
+        """
+        return next((filename for filename, lang in reversed(list(solved_problem.filename_language_dict.items())) if lang == language), None)
+
+    def _submission_source_url(self, link: str, filename: str) -> str:
+        return f'{link.rstrip("/")}/source/{quote(filename)}'
+
+    def _read_raw_source(self, response: Any) -> str:
+        """
+        Decodes a raw source file. A HTML response, such as the login page after the session has expired, is not a source file.
+
+        Parameters:
+        - response: A requests.Response, or an AsyncResponse of the --async engine.
+
+        Returns:
+        - str: The code; None if the response is not a source file
+        """
+        content_type = response.headers.get('Content-Type', '')
+        if 'text/html' in content_type:
+            return None
+        charset = re.search(r'charset=([\w-]+)', content_type)
+        return response.content.decode(charset.group(1) if charset else 'utf-8', errors='replace')
+
     def _parse_submission(self, solved_problem: SolvedProblem, html: Soup, language: str) -> bool:
+        return self._add_submission(solved_problem, self._extract_submission(html), language)
+
+    def _extract_submission(self, html: Soup) -> Dict:
+        """
+        Extracts the filename and code from a submission page.
+
+        Returns:
+        - Dict: {'filename': str, 'code': str}; both values are None if the submission has more than one file
+        """
         if len(html.find_all('div', attrs={'class': 'horizontal_link_list'})) > 0:
+            return {'filename': None, 'code': None}
+        code_html = html.find(name='div', attrs={'class': 'source-highlight w-full'})
+        return {
+            'filename': html.find('div', attrs={'class': 'file_source-content-test'})['data-filename'],
+            'code': code_html.text if code_html is not None else None
+        }
+
+    def _add_submission(self, solved_problem: SolvedProblem, submission: Dict, language: str) -> bool:
+        if not self._submission_is_acceptable(solved_problem, submission, language):
+            return False
+        self.__add_submission_contents_to_solved_problem(solved_problem, submission['filename'], submission['code'], language)
+        return True
+
+    def _submission_is_acceptable(self, solved_problem: SolvedProblem, submission: Dict, language: str) -> bool:
+        filename, code = submission['filename'], submission['code']
+        if filename is None:
             print(f'#: CAN\'T DOWNLOAD SUBMISSION FOR {solved_problem.name} BECAUSE THERE IS MORE THAN ONE FILE PRESENT')
             return False
-        filename = html.find('div', attrs={'class': 'file_source-content-test'})['data-filename']
-        if filename in solved_problem.filename_code_dict:
+        if code is None:
             return False
-        code = html.find(name='div', attrs={'class': 'source-highlight w-full'}).text
         if language == 'Python 3' and not self._python_3_code_is_acceptable(code):
             return False
-        self.__add_submission_contents_to_solved_problem(solved_problem, filename, code, language)
         return True
 
     def _python_3_code_is_acceptable(self, code: str) -> bool:
@@ -207,42 +869,47 @@ class KattisToGithub:
         return True
 
     def __add_submission_contents_to_solved_problem(self, solved_problem: SolvedProblem, filename: str, code: str, lang: str) -> None:
+        """
+        The state lock is only held while the SolvedProblem changes, so that workers do not wait for each other's disk writes.
+        Each SolvedProblem is handled by one worker, so recording it to the journal needs no lock either.
+        """
         print(f'#: Downloading code for {filename}')
-        solved_problem.filename_code_dict[filename] = code
-        solved_problem.filename_language_dict[filename] = lang
-        solved_problem.status = ProblemStatus.CODE_FOUND
-        solved_problem.write_to_file(self.directory)
+        with self.state_lock:
+            solved_problem.filename_language_dict[filename] = intern_language(lang)
+            solved_problem.status = ProblemStatus.CODE_FOUND
+        with self.profiler.timer('write'):
+            self.solution_writer.write(solved_problem, filename, code)
+        if self.journal is not None:
+            self.journal.record(solved_problem, finished=False)
+
+    @property
+    def user_should_git_push(self) -> bool:
+        return self.git is not None and self.git.commit_made
 
     def git_add_and_commit_solutions(self) -> None:
         """
-        Calls git add on SolvedProblems for which new code was found.
-        If there are at most 5 SolvedProblems to commit, each problem gets its own commit message, otherwise only one commit is made.
+        Calls git add on the solution files which were written during this run, staging every file with one git call.
+        If there are at most 5 SolvedProblems to commit, or --commit-each was given, each problem gets its own commit message,
+        otherwise only one commit is made.
 
         Returns:
         - None
         """
         if self.no_git:
             return
-        solutions_to_commit = [solved_problem for solved_problem in self.solved_problems if len(solved_problem.filename_code_dict) > 0]
-        if len(solutions_to_commit) > 0:
-            print('#: Calling git add and commit on downloaded solutions')
-        should_commit_one_by_one = len(solutions_to_commit) < 6
-        for solved_problem in solutions_to_commit:
-            for filename in solved_problem.filename_code_dict:
-                self.__git_add(f'Solutions/{filename}')
-                if should_commit_one_by_one:
-                    self.__git_commit(f'Solution for {solved_problem.name}')
-        if not should_commit_one_by_one:
-            self.__git_commit('Added new solutions')
-
-    def __git_add(self, filename: str) -> None:
-        if not self.no_git:
-            subprocess.Popen(['git', 'add', filename], cwd=self.directory, stdout=subprocess.DEVNULL).wait()
-
-    def __git_commit(self, message: str) -> None:
-        if not self.no_git:
-            self.user_should_git_push = True
-            subprocess.Popen(['git', 'commit', f'-m {message}'], cwd=self.directory, stdout=subprocess.DEVNULL).wait()
+        solutions_to_commit = [
+            (solved_problem.name, [f'Solutions/{filename}' for filename in solved_problem.changed_filenames])
+            for solved_problem in self.solved_problems if len(solved_problem.changed_filenames) > 0
+        ]
+        if len(solutions_to_commit) == 0:
+            return
+        print('#: Calling git add and commit on downloaded solutions')
+        should_commit_one_by_one = self.commit_each or len(solutions_to_commit) <= ONE_BY_ONE_COMMIT_LIMIT
+        if not self.git.commit_solutions(solutions_to_commit, should_commit_one_by_one):
+            print('#: Some solutions could not be committed, please check the repository with "git status"')
+            return
+        for solved_problem in self.solved_problems:
+            solved_problem.changed_filenames = []
 
     def create_markdown_table(self):
         """
@@ -253,42 +920,231 @@ class KattisToGithub:
         """
         if not self.no_readme:
             print('#: Adding any updates to README.md')
-            md_list = MarkdownList(directory=self.directory, solved_problems=self.solved_problems)
+            md_list = MarkdownList(directory=self.directory, solved_problems=self.registry)
             md_list.create()
             if md_list.should_add_and_commit and not self.no_git:
                 print('#: Calling git add & commit on README.md')
-                self.__git_add(md_list.filename)
-                self.__git_commit('Updated README.md')
+                self.git.add_and_commit('Updated README.md', [md_list.filename])
 
     def update_status_to_csv(self) -> None:
         """
-        Writes the information on SolvedProblems into status.csv
+        Writes the information on SolvedProblems into status.csv. With --state sqlite, status.db already holds every change,
+        as SolvedProblems were upserted one by one.
 
         Returns:
         - None
         """
         self.solved_problems.sort(key=lambda sp: sp.name)
-        csv_handler = CsvHandler(self.directory)
-        csv_handler.write_solved_problems_to_csv(self.solved_problems)
-        if csv_handler.should_add_to_gitignore and not self.no_git:
+        state_store = self._get_state_store()
+        if not self._state_is_upserted:
+            state_store.save(self.registry)
+        if self.journal is not None:
+            self.journal.clear()
+            for submissions_link in self.failed_links:
+                self.journal.record(self.registry.get(submissions_link), finished=False)
+        gitignore_updated = state_store.should_add_to_gitignore
+        if self.journal is not None:
+            gitignore_updated |= self.journal.should_add_to_gitignore
+        if self.session_store is not None:
+            gitignore_updated |= self.session_store.should_add_to_gitignore
+        if gitignore_updated and not self.no_git:
             print('#: Calling git add and commit on .gitignore')
-            self.__git_add('.gitignore')
-            self.__git_commit('Updated .gitignore')
+            self.git.add_and_commit('Updated .gitignore', ['.gitignore'])
+
+    def evict_http_cache(self) -> None:
+        """
+        Removes too old entries from the HTTP cache, and the oldest ones if it has grown too large.
+        """
+        if self.http_cache is not None:
+            self.http_cache.evict()
 
     def git_push_info_print(self):
         if self.user_should_git_push:
             print('#: Please use the command "git push" to push commited changes to your repository!')
 
 
+    def run(self) -> bool:
+        """
+        Runs every step of a sync. get_run_details_from_sys_argv must have been called before.
+        If --profile was given, the time spent in each phase is written to a JSON report at the end.
+
+        Returns:
+        - bool: True if the sync was run; False if logging in failed
+        """
+        with self.profiler.phase('setup'):
+            self.create_folders_for_solutions()
+            self.create_http_cache()
+            self.load_solved_problem_status_csv()
+        with self.profiler.phase('login'):
+            logged_in = self.login()
+        if logged_in:
+            self._sync()
+        if self.profile_path is not None:
+            self.profiler.write(self.profile_path)
+        return logged_in
+
+    def _sync(self) -> None:
+        """
+        Runs the steps of a sync which follow logging in. Each sync starts with the full error budget.
+        """
+        self.http_client.reset_error_budget()
+        with self.profiler.phase('problem_listing'):
+            self.get_solved_problems()
+        with self.profiler.phase('submission_fetch'):
+            self.get_codes_for_solved_problems()
+        with self.profiler.phase('git'):
+            self.git_add_and_commit_solutions()
+        with self.profiler.phase('readme'):
+            self.create_markdown_table()
+        with self.profiler.phase('state'):
+            self.update_status_to_csv()
+        with self.profiler.phase('cache_eviction'):
+            self.evict_http_cache()
+        print(f'#: {self.profiler.summary()}')
+        self.git_push_info_print()
+
+    def watch(self) -> None:
+        """
+        Syncs once, then keeps the session and state in memory and polls the first page of the recently active problems.
+        A new sync is made only when that page changes. The polling interval doubles after every idle poll, up to
+        WATCH_MAX_INTERVAL, and drops back to --poll-interval once new activity is seen. Stopped with Ctrl+C.
+        """
+        if not self.run():
+            return
+        interval = self.poll_interval
+        last_activity = self._poll_recent_activity()
+        try:
+            while True:
+                print(f'#: Checking for new activity in {interval} seconds')
+                time.sleep(interval)
+                activity = self._poll_recent_activity()
+                if activity is None or activity == last_activity:
+                    interval = min(interval * 2, max(self.poll_interval, WATCH_MAX_INTERVAL))
+                    continue
+                print('#: New activity found on Kattis')
+                last_activity = activity
+                interval = self.poll_interval
+                self.recently_active_links = set()
+                self.unfinished_links, self.failed_links = self.failed_links, set()
+                self._sync()
+        except KeyboardInterrupt:
+            print('#: Stopped watching for new activity')
+        if self.profile_path is not None:
+            self.profiler.write(self.profile_path)
+
+    def _poll_recent_activity(self) -> List[str]:
+        """
+        Fetches the first page of the problems tab ordered by recent activity, the cheapest sign of new submissions.
+        Logs in again if the session has expired.
+
+        Returns:
+        - List[str]: Text of each row on the page, which changes with new submissions; None if the page could not be checked
+        """
+        self.http_client.reset_error_budget()
+        try:
+            entry, _ = self._fetch_page(self._recent_solved_problems_url)
+        except FetchError as e:
+            print(f'#: Could not check for new activity: {e}')
+            return None
+        if LOGGED_IN_MARKER not in entry.body:
+            print('#: The Kattis session has expired')
+            self.login()
+            return None
+        html = self._parse(entry.body, PROBLEMS_PAGE)
+        activity = [row.get_text('|', strip=True) for row in self._find_solved_problems_from_html(html)]
+        self.html_parser.decompose(html)
+        return activity
+
+
+def run_batch(config_path: Path) -> bool:
+    """
+    Syncs every account of a batch config in this process. Each account has its own session and state,
+    while the worker pool and the rate limiter are shared. A failing account does not stop the others.
+    On Ctrl-C the accounts not yet started are skipped, while the ones being synced finish and save their state.
+
+    Parameters:
+    - config_path: Path to the JSON batch config, see src/batch_config.py.
+
+    Returns:
+    - bool: True if every account was synced; False otherwise
+    """
+    try:
+        config = load_batch_config(config_path)
+    except ValueError as e:
+        print(f'#: {e}')
+        return False
+    rate_limiter = RateLimiter(config.requests_per_second) if config.requests_per_second is not None else None
+    interrupted = False
+    with ThreadPoolExecutor(max_workers=config.workers) as shared_executor, \
+        ThreadPoolExecutor(max_workers=config.parallel_accounts) as account_executor:
+        futures = []
+        try:
+            for account in config.accounts:
+                futures += [account_executor.submit(_run_batch_account, account, config, shared_executor, rate_limiter)]
+            wait(futures)
+        except KeyboardInterrupt:
+            # The accounts run in the pool's threads, so only the main thread sees the interrupt
+            print('#: Batch run was interrupted by user, waiting for the accounts being synced to finish')
+            interrupted = True
+            for future in futures:
+                future.cancel()
+        results = [
+            _skipped_batch_account(account) if future is None or future.cancelled() else future.result()
+            for account, future in zip_longest(config.accounts, futures)
+        ]
+    print('#: Batch summary:')
+    for result in results:
+        print(
+            f'#: {result["user"]} -> {result["directory"]}: {result["status"]}, {result["solved_problems"]} solved problems, '
+            f'{result["files_written"]} files written, {result["failed_problems"]} failed, '
+            f'{result["requests"]} requests in {result["wall_time"]:.1f} s'
+        )
+    return not interrupted and all(result['status'] == 'ok' for result in results)
+
+
+def _skipped_batch_account(account: AccountConfig) -> Dict:
+    return {
+        'user': account.arguments.user, 'directory': account.arguments.directory, 'status': 'skipped', 'solved_problems': 0,
+        'files_written': 0, 'failed_problems': 0, 'requests': 0, 'wall_time': 0.0
+    }
+
+
+def _run_batch_account(account: AccountConfig, config: BatchConfig, shared_executor: ThreadPoolExecutor, rate_limiter: RateLimiter) -> Dict:
+    print(f'#: Syncing {account.arguments.user} into {account.arguments.directory}')
+    ktg = KattisToGithub()
+    ktg.shared_executor = shared_executor
+    ktg.http_client.rate_limiter = rate_limiter
+    start = time.perf_counter()
+    try:
+        ktg.get_run_details(account.arguments)
+        ktg.workers = config.workers
+        ktg._size_connection_pool()
+        status = 'ok' if ktg.run() else 'login failed'
+    except Exception as e:
+        print(f'#: Syncing {account.arguments.user} failed: {e!r}')
+        status = f'failed ({type(e).__name__})'
+    return {
+        'user': account.arguments.user,
+        'directory': account.arguments.directory,
+        'status': status,
+        'solved_problems': len(ktg.solved_problems),
+        'files_written': len(ktg.solution_writer.changed_paths) if ktg.solution_writer is not None else 0,
+        'failed_problems': len(ktg.failed_links),
+        'requests': ktg.profiler.requests,
+        'wall_time': time.perf_counter() - start
+    }
+
+
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in OFFLINE_COMMANDS:
+        arguments = parse_offline_arguments(sys.argv[1:])
+        sys.exit(0 if run_offline_command(arguments, Path(__file__).parent / arguments.directory) else 1)
+    arguments = parse_arguments(sys.argv[1:])
+    if arguments.batch is not None:
+        sys.exit(0 if run_batch(Path(arguments.batch)) else 1)
     KTG = KattisToGithub()
-    KTG.get_run_details_from_sys_argv()
-    KTG.create_folders_for_solutions()
-    KTG.load_solved_problem_status_csv()
-    if KTG.login():
-        KTG.get_solved_problems()
-        KTG.get_codes_for_solved_problems()
-        KTG.git_add_and_commit_solutions()
-        KTG.create_markdown_table()
-        KTG.update_status_to_csv()
-        KTG.git_push_info_print()
+    KTG.get_run_details(arguments)
+    if arguments.watch:
+        KTG.watch()
+    else:
+        KTG.run()
@@ -0,0 +1,196 @@
+"""
+Offline benchmark of a full KTG run against a local Kattis stand-in.
+
+Every scenario syncs a synthetic account twice: a cold run into an empty repository, and a warm run after a few problems
+got new accepted submissions. Each run happens in its own process, so that its peak memory can be measured.
+The time it takes to import KattisToGithub, which every start of KTG pays, is measured too and checked against IMPORT_TIME_BUDGET.
+
+Usage, from the repository root:
+    python -m benchmark.run_benchmark                     Runs the default scenarios and compares them to benchmark/baseline.json
+    python -m benchmark.run_benchmark --sizes 100 10000   Runs accounts with 100 and 10,000 solved problems
+    python -m benchmark.run_benchmark --save-baseline     Stores the results as the new baseline
+"""
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+from pathlib import Path
+from argparse import ArgumentParser, SUPPRESS
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Dict, List
+from benchmark.stand_in import KattisStandIn, SyntheticAccount
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+DEFAULT_SIZES = [100, 1000]
+WARM_RUN_NEW_SUBMISSIONS = 5
+REGRESSION_THRESHOLD = 1.25
+IMPORT_TIME_BUDGET = 0.15
+IMPORT_TIME_RUNS = 5
+COMPARED_METRICS = ['wall_time', 'requests', 'bytes', 'peak_memory_kb']
+PHASES = [
+    'load_solved_problem_status_csv', 'login', 'get_solved_problems', 'get_codes_for_solved_problems',
+    'git_add_and_commit_solutions', 'create_markdown_table', 'update_status_to_csv', 'evict_http_cache'
+]
+USER, PASSWORD = 'benchmark', 'benchmark-password'
+
+
+def parse_arguments(args: List[str]):
+    parser = ArgumentParser(description='Benchmarks a full KTG run against a local Kattis stand-in.')
+    parser.add_argument('--sizes', metavar='', type=int, nargs='+', default=DEFAULT_SIZES, help='Numbers of solved problems of the synthetic accounts.')
+    parser.add_argument('--latency', metavar='', type=float, default=0.0, help='Seconds every response of the stand-in is delayed by.')
+    parser.add_argument('--error-rate', metavar='', type=float, default=0.0, help='Share of requests the stand-in answers with 503.')
+    parser.add_argument('--no-compression', default=False, action='store_true', help='Make the stand-in send its responses uncompressed.')
+    parser.add_argument('--workers', metavar='', type=int, default=None, help='Passed on to KTG as --workers.')
+    parser.add_argument('--extra-args', metavar='', type=str, default='', help='Further arguments passed on to KTG, e.g. "--state sqlite".')
+    parser.add_argument('--save-baseline', default=False, action='store_true', help='Store the results in benchmark/baseline.json.')
+    parser.add_argument('--output', metavar='', type=str, default=None, help='Also write the results to this JSON file.')
+    parser.add_argument('--child', type=str, default=None, help=SUPPRESS)
+    return parser.parse_args(args)
+
+
+def run_child(ktg_args: List[str]) -> None:
+    """
+    Runs KTG in this process with every phase timed, and prints the measurements as JSON.
+    """
+    import resource
+    from KattisToGithub import KattisToGithub
+    sys.argv = ['KattisToGithub.py'] + ktg_args
+    ktg = KattisToGithub()
+    ktg.get_run_details_from_sys_argv()
+    phases: Dict[str, float] = {}
+    for name in PHASES:
+        setattr(ktg, name, timed(getattr(ktg, name), name, phases))
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        ktg.run()
+    wall_time = time.perf_counter() - start
+    print(json.dumps({
+        'wall_time': round(wall_time, 3),
+        'phases': {name: round(seconds, 3) for name, seconds in phases.items()},
+        'peak_memory_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'solution_files': len(ktg.solution_writer.changed_paths)
+    }))
+
+
+def timed(method, name: str, phases: Dict[str, float]):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def run_ktg(stand_in: KattisStandIn, directory: str, options) -> Dict:
+    """
+    Runs KTG once in a child process against the stand-in, and adds the stand-in's request counts to the measurements.
+    """
+    ktg_args = ['-u', USER, '-p', PASSWORD, '-d', directory, '--base-url', stand_in.base_url] + options.extra_args.split()
+    if options.workers is not None:
+        ktg_args += ['--workers', str(options.workers)]
+    stand_in.stats.reset()
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmark.run_benchmark', '--child', json.dumps(ktg_args)],
+        cwd=Path(__file__).parent.parent, stdout=subprocess.PIPE, text=True, check=True
+    )
+    measurements = json.loads(result.stdout.strip().splitlines()[-1])
+    measurements['requests'] = stand_in.stats.total_requests
+    measurements['requests_by_page'] = dict(sorted(stand_in.stats.requests.items()))
+    measurements['bytes'] = stand_in.stats.bytes_sent
+    measurements['server_errors'] = stand_in.stats.errors
+    return measurements
+
+
+def run_scenario(size: int, options) -> Dict[str, Dict]:
+    account = SyntheticAccount(USER, PASSWORD, size)
+    with KattisStandIn(account, latency=options.latency, error_rate=options.error_rate, compress=not options.no_compression) as stand_in, TemporaryDirectory() as directory:
+        for git_args in (['init', '-q'], ['config', 'user.email', 'benchmark@localhost'], ['config', 'user.name', 'Benchmark']):
+            subprocess.run(['git'] + git_args, cwd=directory, check=True)
+        cold = run_ktg(stand_in, directory, options)
+        for problem in list(account.problems[-WARM_RUN_NEW_SUBMISSIONS:]):
+            account.add_submission(problem.slug, 'Python 3', f'print("{problem.slug} revisited")')
+        warm = run_ktg(stand_in, directory, options)
+    return {'cold': cold, 'warm': warm}
+
+
+def measure_import_time() -> float:
+    """
+    Returns the fastest of IMPORT_TIME_RUNS imports of KattisToGithub in a new interpreter, in seconds, as reported by -X importtime.
+    """
+    import_times = []
+    for _ in range(IMPORT_TIME_RUNS):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import KattisToGithub'],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True
+        )
+        line = next(line for line in result.stderr.splitlines() if line.rstrip().endswith('| KattisToGithub'))
+        import_times += [int(line.split('|')[1]) / 1e6]
+    return round(min(import_times), 3)
+
+
+def compare_to_baseline(results: Dict, baseline: Dict) -> List[str]:
+    """
+    Returns a line for every metric which grew by more than REGRESSION_THRESHOLD compared to the baseline.
+    """
+    regressions = []
+    for scenario, runs in results.items():
+        for run, measurements in runs.items():
+            previous = baseline.get('results', {}).get(scenario, {}).get(run)
+            if previous is None:
+                continue
+            for metric in COMPARED_METRICS:
+                if previous[metric] > 0 and measurements[metric] / previous[metric] > REGRESSION_THRESHOLD:
+                    regressions += [f'{scenario} {run} {metric}: {previous[metric]} -> {measurements[metric]}']
+    return regressions
+
+
+def print_results(results: Dict) -> None:
+    print(f'{"scenario":<16}{"run":<6}{"wall s":>9}{"requests":>10}{"MB sent":>9}{"peak MB":>9}  slowest phases')
+    for scenario, runs in results.items():
+        for run, m in runs.items():
+            slowest = ', '.join(f'{name} {seconds:.2f}s' for name, seconds in sorted(m['phases'].items(), key=lambda item: -item[1])[:3])
+            print(
+                f'{scenario:<16}{run:<6}{m["wall_time"]:>9.2f}{m["requests"]:>10}{m["bytes"] / 2 ** 20:>9.1f}'
+                f'{m["peak_memory_kb"] / 1024:>9.1f}  {slowest}'
+            )
+
+
+def main(args: List[str]) -> int:
+    options = parse_arguments(args)
+    if options.child is not None:
+        run_child(json.loads(options.child))
+        return 0
+    results = {f'{size}_problems': run_scenario(size, options) for size in options.sizes}
+    print_results(results)
+    import_time = measure_import_time()
+    print(f'import KattisToGithub: {import_time:.3f}s (budget {IMPORT_TIME_BUDGET}s)')
+    report = {
+        'python': platform.python_version(),
+        'latency': options.latency,
+        'error_rate': options.error_rate,
+        'import_time': import_time,
+        'results': results
+    }
+    if options.output is not None:
+        with open(options.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if options.save_baseline:
+        with open(BASELINE_PATH, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'Baseline saved to {BASELINE_PATH}')
+        return 0
+    regressions = [f'import_time: {import_time} exceeds the budget of {IMPORT_TIME_BUDGET}'] if import_time > IMPORT_TIME_BUDGET else []
+    if BASELINE_PATH.exists():
+        with open(BASELINE_PATH, 'r') as file:
+            regressions += compare_to_baseline(results, json.load(file))
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,336 @@
+import re
+import gzip
+import time
+import random
+import secrets
+import threading
+from html import escape
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+PROBLEMS_PER_PAGE = 100
+SUBMISSIONS_PER_PAGE = 50
+LANGUAGES = [('Python 3', 'py'), ('C++', 'cpp'), ('Java', 'java'), ('Go', 'go')]
+DIFFICULTIES = [('easy', 1.0, 3.0), ('medium', 3.0, 6.0), ('hard', 6.0, 9.5)]
+SESSION_COOKIE = 'EduSiteCookie'
+
+
+@dataclass
+class Submission:
+    id: int
+    language: str
+    accepted: bool
+    filename: str
+    code: str
+
+
+@dataclass
+class Problem:
+    slug: str
+    name: str
+    difficulty: str
+    points: str
+    submissions: List[Submission] = field(default_factory=list)
+
+
+class SyntheticAccount:
+    """
+    SyntheticAccount generates a deterministic Kattis account with the given number of solved problems.
+    Each problem has one to four submissions, newest first, at least one of them accepted.
+
+    Parameters:
+    - user: Username of the account.
+    - password: Password of the account.
+    - problems: Number of solved problems.
+    - seed: Seed of the generator.
+    """
+    def __init__(self, user: str, password: str, problems: int, seed: int = 0) -> None:
+        self.user = user
+        self.password = password
+        self.problems: List[Problem] = []
+        self.submissions: Dict[int, Submission] = {}
+        rng = random.Random(seed)
+        next_id = 1000000
+        for i in range(problems):
+            difficulty, low, high = rng.choice(DIFFICULTIES)
+            problem = Problem(slug=f'problem{i:05d}', name=f'Problem {i}', difficulty=difficulty, points=f'{rng.uniform(low, high):.1f}')
+            for _ in range(rng.randint(1, 4)):
+                language, extension = rng.choice(LANGUAGES)
+                code = '\n'.join(f'line_{n} = {rng.randint(0, 10 ** 6)}' for n in range(rng.randint(10, 80)))
+                submission = Submission(next_id, language, rng.random() < 0.7, f'{problem.slug}.{extension}', code)
+                problem.submissions.insert(0, submission)
+                self.submissions[next_id] = submission
+                next_id += 1
+            problem.submissions[0].accepted = True
+            self.problems.append(problem)
+        self.__by_slug = {problem.slug: problem for problem in self.problems}
+
+    def get_problem(self, slug: str) -> Problem:
+        return self.__by_slug.get(slug)
+
+    def add_submission(self, slug: str, language: str, code: str) -> Submission:
+        """
+        Adds a new accepted submission to a problem and moves the problem to the top of the recent activity.
+        """
+        problem = self.__by_slug[slug]
+        extension = dict(LANGUAGES)[language] if language in dict(LANGUAGES) else 'txt'
+        submission = Submission(max(self.submissions) + 1, language, True, f'{slug}.{extension}', code)
+        problem.submissions.insert(0, submission)
+        self.submissions[submission.id] = submission
+        self.problems.remove(problem)
+        self.problems.insert(0, problem)
+        return submission
+
+
+class StandInStats:
+    """
+    Counts the requests and bytes served by the stand-in, per kind of page.
+    """
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.errors = 0
+
+    def count(self, kind: str, size: int, error: bool = False) -> None:
+        with self.__lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            self.bytes_sent += size
+            self.errors += error
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.requests, self.bytes_sent, self.errors = {}, 0, 0
+
+
+class KattisStandIn:
+    """
+    KattisStandIn serves a SyntheticAccount on localhost with the page layout KTG reads from Kattis:
+    the login form, the front page, the problems tab, the submissions tab of the user and of each problem, and the submission pages.
+
+    Parameters:
+    - account: The account to serve.
+    - latency: Seconds every response is delayed by.
+    - error_rate: Share of requests answered with 503 and Retry-After: 0.
+    - seed: Seed for choosing the failing requests.
+    - compress: If True, responses are gzipped for clients which accept it, like Kattis does.
+    """
+    def __init__(self, account: SyntheticAccount, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0, compress: bool = True) -> None:
+        self.account = account
+        self.latency = latency
+        self.error_rate = error_rate
+        self.compress = compress
+        self.stats = StandInStats()
+        self.__rng = random.Random(seed)
+        self.__rng_lock = threading.Lock()
+        self.__sessions = set()
+        self.__csrf_tokens = set()
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), self.__handler_class())
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.__server.server_address[1]}'
+
+    def __enter__(self) -> 'KattisStandIn':
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def should_fail(self) -> bool:
+        with self.__rng_lock:
+            return self.__rng.random() < self.error_rate
+
+    def new_csrf_token(self) -> str:
+        token = secrets.token_hex(8)
+        self.__csrf_tokens.add(token)
+        return token
+
+    def log_in(self, form: Dict[str, List[str]]) -> str:
+        """
+        Returns a new session id if the form has a valid CSRF token and the account's credentials; None otherwise.
+        """
+        token = form.get('csrf_token', [None])[0]
+        if token not in self.__csrf_tokens:
+            return None
+        self.__csrf_tokens.discard(token)
+        if form.get('user', [None])[0] != self.account.user or form.get('password', [None])[0] != self.account.password:
+            return None
+        session_id = secrets.token_hex(16)
+        self.__sessions.add(session_id)
+        return session_id
+
+    def is_logged_in(self, cookie_header: str) -> bool:
+        match = re.search(rf'{SESSION_COOKIE}=([0-9a-f]+)', cookie_header or '')
+        return match is not None and match.group(1) in self.__sessions
+
+    def __handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self.__handle(lambda: render_get(stand_in, self.path, self.headers.get('Cookie')))
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                self.__handle(lambda: render_post(stand_in, self.path, body))
+
+            def __handle(self, render) -> None:
+                if stand_in.latency > 0:
+                    time.sleep(stand_in.latency)
+                if stand_in.should_fail():
+                    self.__respond('error', 503, {'Retry-After': '0'}, b'Service Unavailable')
+                    return
+                kind, status, headers, text = render()
+                self.__respond(kind, status, headers, text.encode('utf-8'))
+
+            def __respond(self, kind: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+                if stand_in.compress and len(body) > 0 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=6)
+                    headers = {**headers, 'Content-Encoding': 'gzip'}
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in {'Content-Type': 'text/html; charset=utf-8', **headers}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                stand_in.stats.count(kind, len(body), error=status >= 500)
+
+        return Handler
+
+
+def render_get(stand_in: KattisStandIn, path: str, cookie_header: str) -> Tuple[str, int, Dict[str, str], str]:
+    url = urlsplit(path)
+    query = {key: values[0] for key, values in parse_qs(url.query).items()}
+    if url.path == '/login/email':
+        return 'login', 200, {}, login_page(stand_in.new_csrf_token())
+    logged_in = stand_in.is_logged_in(cookie_header)
+    if url.path == '/':
+        return 'front', 200, {}, page('Kattis', '<p>Welcome</p>', logged_in)
+    if not logged_in:
+        return 'redirect', 302, {'Location': '/login/email'}, ''
+    if url.path == f'/users/{stand_in.account.user}':
+        if query.get('tab') == 'submissions' and 'problem' not in query:
+            return 'all_submissions', 200, {}, all_submissions_page(stand_in.account, int(query.get('page', 1)))
+        if query.get('tab') == 'submissions':
+            problem = stand_in.account.get_problem(query.get('problem'))
+            if problem is None:
+                return 'missing', 404, {}, page('Not found', '', True)
+            return 'submissions', 200, {}, submissions_page(problem)
+        return 'problems', 200, {}, problems_page(stand_in.account, int(query.get('page', 1)), query.get('order'))
+    match = re.fullmatch(r'/submissions/(\d+)', url.path)
+    if match and int(match.group(1)) in stand_in.account.submissions:
+        return 'submission', 200, {}, submission_page(stand_in.account.submissions[int(match.group(1))])
+    match = re.fullmatch(r'/submissions/(\d+)/source/([^/]+)', url.path)
+    if match and int(match.group(1)) in stand_in.account.submissions:
+        submission = stand_in.account.submissions[int(match.group(1))]
+        if unquote(match.group(2)) == submission.filename:
+            return 'source', 200, {'Content-Type': 'text/plain; charset=utf-8'}, submission.code
+    return 'missing', 404, {}, page('Not found', '', True)
+
+
+def render_post(stand_in: KattisStandIn, path: str, body: str) -> Tuple[str, int, Dict[str, str], str]:
+    if urlsplit(path).path != '/login/email':
+        return 'missing', 404, {}, page('Not found', '', False)
+    session_id = stand_in.log_in(parse_qs(body))
+    if session_id is None:
+        return 'login', 200, {}, login_page(stand_in.new_csrf_token())
+    return 'login', 302, {'Location': '/', 'Set-Cookie': f'{SESSION_COOKIE}={session_id}; Path=/; HttpOnly'}, ''
+
+
+def page(title: str, content: str, logged_in: bool) -> str:
+    account_link = '<a href="/logout">Log out</a>' if logged_in else '<a href="/login">Log in</a>'
+    return (
+        f'<!DOCTYPE html>\n<html lang="en">\n<head><meta charset="utf-8"><title>{escape(title)}</title>'
+        f'<link rel="stylesheet" href="/css/app.css"></head>\n<body>\n'
+        f'<header><nav><a href="/problems">Problems</a><a href="/contests">Contests</a>{account_link}</nav></header>\n'
+        f'<main>\n{content}\n</main>\n<footer><a href="/help">Help</a></footer>\n</body>\n</html>\n'
+    )
+
+
+def login_page(csrf_token: str) -> str:
+    return page('Log in', (
+        '<form method="post" action="/login/email">'
+        f'<input type="hidden" name="csrf_token" value="{csrf_token}">'
+        '<input type="text" name="user"><input type="password" name="password"><input type="submit" value="Log in"></form>'
+    ), False)
+
+
+def problems_page(account: SyntheticAccount, page_number: int, order: str) -> str:
+    problems = account.problems if order == '-date' else sorted(account.problems, key=lambda problem: problem.slug)
+    last_page = max(1, -(-len(problems) // PROBLEMS_PER_PAGE))
+    rows = ''.join(
+        f'<tr><td><a href="/problems/{problem.slug}">{escape(problem.name)}</a></td><td>0.01 s</td><td>2024-01-01</td>'
+        f'<td>{escape(problem.submissions[0].language)}</td>'
+        f'<td><span class="difficulty_number difficulty_{problem.difficulty}">{problem.points}</span></td></tr>\n'
+        for problem in problems[(page_number - 1) * PROBLEMS_PER_PAGE:page_number * PROBLEMS_PER_PAGE]
+    )
+    prefix = f'?order={order}&amp;' if order else '?'
+    buttons = ''.join(
+        f'<a role="button" href="{prefix}page={n}">{n}</a>'
+        for n in sorted({1, max(1, page_number - 1), page_number, min(last_page, page_number + 1), last_page})
+    )
+    return page(f'{account.user} - Kattis', (
+        '<div id="profile-summary"><table><tbody><tr><td>Rank</td><td>1234</td></tr></tbody></table></div>\n'
+        '<div id="problems-tab"><table class="table2"><thead><tr><th>Name</th><th>Runtime</th><th>Date</th><th>Language</th>'
+        f'<th>Difficulty</th></tr></thead>\n<tbody>\n{rows}</tbody></table>\n<div class="pagination">{buttons}</div></div>'
+    ), True)
+
+
+def submissions_page(problem: Problem) -> str:
+    return page('Submissions', submissions_tab([(problem, submission) for submission in problem.submissions], ''), True)
+
+
+def all_submissions_page(account: SyntheticAccount, page_number: int) -> str:
+    submissions = sorted(
+        ((problem, submission) for problem in account.problems for submission in problem.submissions),
+        key=lambda pair: pair[1].id, reverse=True
+    )
+    last_page = max(1, -(-len(submissions) // SUBMISSIONS_PER_PAGE))
+    buttons = ''.join(
+        f'<a role="button" href="?tab=submissions&amp;page={n}">{n}</a>'
+        for n in sorted({1, max(1, page_number - 1), page_number, min(last_page, page_number + 1), last_page})
+    )
+    return page('Submissions', submissions_tab(
+        submissions[(page_number - 1) * SUBMISSIONS_PER_PAGE:page_number * SUBMISSIONS_PER_PAGE],
+        f'<div class="pagination">{buttons}</div>'
+    ), True)
+
+
+def submissions_tab(submissions: List[Tuple[Problem, Submission]], pagination: str) -> str:
+    rows = ''.join(
+        '<tr><td><div class="status is-status-{0}"><span>{1}</span></div></td>'
+        '<td data-type="problem"><a href="/problems/{2}">{3}</a></td><td data-type="lang">{4}</td>'
+        '<td data-type="actions"><a href="/submissions/{5}">View details</a></td></tr>\n'.format(
+            'accepted' if submission.accepted else 'rejected', 'Accepted' if submission.accepted else 'Wrong Answer',
+            problem.slug, escape(problem.name), escape(submission.language), submission.id
+        )
+        for problem, submission in submissions
+    )
+    return (
+        '<div id="submissions-tab"><table class="table2"><thead><tr><th>Status</th><th>Problem</th><th>Language</th><th></th></tr></thead>\n'
+        f'<tbody>\n{rows}</tbody></table>{pagination}</div>'
+    )
+
+
+def submission_page(submission: Submission) -> str:
+    return page(f'Submission {submission.id}', (
+        f'<div class="submission-info"><table><tbody><tr><td>{submission.id}</td></tr></tbody></table></div>\n'
+        f'<div class="file_source-content-test" data-filename="{escape(submission.filename)}">'
+        f'<div class="source-highlight w-full"><pre><code>{escape(submission.code)}</code></pre></div></div>'
+    ), True)
@@ -1,5 +1,6 @@
 from typing import List
 from argparse import ArgumentParser
+from src.constants import BASE_URL, DEFAULT_WORKERS, WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL, PARSER_BACKENDS, STATE_BACKENDS, TRANSPORTS, OFFLINE_COMMANDS
 
 
 def parse_arguments(args: List[str]):
@@ -12,11 +13,56 @@ def parse_arguments(args: List[str]):
     Returns:
     - ArgumentParser
     """
-    parser = ArgumentParser()
-    parser.add_argument('-u', '--user', metavar='', type=str, required=True, help='Kattis username or email.')
-    parser.add_argument('-p', '--password', metavar='', type=str, required=True, help='Kattis password.')
-    parser.add_argument('-d', '--directory', metavar='', type=str, required=True, help='Directory to which Kattis solution are downloaded to.')
+    parser = ArgumentParser(usage='%(prog)s [-h] -u  -p  -d  [options]\n       %(prog)s [-h] --batch CONFIG')
+    parser.add_argument('-u', '--user', metavar='', type=str, required=False, help='Kattis username or email.')
+    parser.add_argument('-p', '--password', metavar='', type=str, required=False, help='Kattis password.')
+    parser.add_argument('-d', '--directory', metavar='', type=str, required=False, help='Directory to which Kattis solution are downloaded to.')
     parser.add_argument('--no-git', required=False, default=False, action='store_true', help='If this argument is given, Git add and commit will not be used on any files.')
     parser.add_argument('--no-readme', required=False, default=False, action='store_true', help='If this argument is given, KTG will not modify the repository\'s README.md in any way.')
     parser.add_argument('--py-main-only', required=False, default=False, action='store_true', help='If this argument is given, KTG only downloads Python 3 files that include the substring "def main()".')
+    parser.add_argument('--commit-each', required=False, default=False, action='store_true', help='If this argument is given, each solved problem gets its own commit, even when more than 5 problems have new solutions.')
+    parser.add_argument('--workers', metavar='', type=int, required=False, default=DEFAULT_WORKERS, help=f'Number of solved problems whose codes are downloaded in parallel. Default is {DEFAULT_WORKERS}.')
+    parser.add_argument('--full', required=False, default=False, action='store_true', help='If this argument is given, every page of the solved problems tab is checked instead of stopping at already known problems.')
+    parser.add_argument('--no-cache', required=False, default=False, action='store_true', help='If this argument is given, KTG will not read or write its on-disk HTTP response cache.')
+    parser.add_argument('--html-parser', metavar='', type=str, required=False, default=PARSER_BACKENDS[0], choices=PARSER_BACKENDS, help=f'HTML parser backend, one of {", ".join(PARSER_BACKENDS)}. Falls back to html.parser if lxml is not installed.')
+    parser.add_argument('--state', metavar='', type=str, required=False, default=STATE_BACKENDS[0], choices=STATE_BACKENDS, help='Where KTG stores the state of solved problems: csv (status.csv) or sqlite (status.db). An existing status.csv is migrated to status.db on first use.')
+    parser.add_argument('--transport', metavar='', type=str, required=False, default=TRANSPORTS[0], choices=TRANSPORTS, help='HTTP version used for requests: http1, or http2 to multiplex every request over one connection. http2 requires httpx[http2].')
+    parser.add_argument('--base-url', metavar='', type=str, required=False, default=BASE_URL, help=f'Address of the Kattis instance to use. Default is {BASE_URL}.')
+    parser.add_argument('--profile', metavar='', type=str, required=False, default=None, help='Writes a JSON report of the time, CPU time, requests and bytes of each phase of the run to the given file.')
+    parser.add_argument('--cprofile', required=False, default=False, action='store_true', help='If this argument is given together with --profile, cProfile statistics of all threads are also written next to the report, with the suffix .prof.')
+    parser.add_argument('--batch', metavar='', type=str, required=False, default=None, help='Syncs every account listed in the given JSON config file in one process, instead of the account given with -u, -p and -d.')
+    parser.add_argument('--discover', required=False, default=False, action='store_true', help='If this argument is given, new accepted submissions are found from the user\'s submissions tab, newest first, instead of checking each recently active problem separately.')
+    parser.add_argument('--async', dest='async_engine', required=False, default=False, action='store_true', help='If this argument is given, codes are downloaded with asyncio instead of threads, and --workers is the number of concurrent requests. Requires aiohttp.')
+    parser.add_argument('--watch', required=False, default=False, action='store_true', help='If this argument is given, KTG keeps running and syncs again whenever new activity appears on Kattis. Stop it with Ctrl+C.')
+    parser.add_argument('--poll-interval', metavar='', type=int, required=False, default=WATCH_MIN_INTERVAL, help=f'Seconds between checks for new activity in --watch mode. The interval doubles while there is no activity, up to {WATCH_MAX_INTERVAL} seconds. Default is {WATCH_MIN_INTERVAL}.')
+    parsed_args = parser.parse_args(args)
+    if parsed_args.batch is None and None in (parsed_args.user, parsed_args.password, parsed_args.directory):
+        parser.error('the following arguments are required: -u/--user, -p/--password, -d/--directory')
+    if parsed_args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if parsed_args.poll_interval < 1:
+        parser.error('--poll-interval must be at least 1')
+    if parsed_args.watch and parsed_args.batch is not None:
+        parser.error('--watch can not be used with --batch')
+    if parsed_args.cprofile and parsed_args.profile is None:
+        parser.error('--cprofile requires --profile')
+    return parsed_args
+
+
+def parse_offline_arguments(args: List[str]):
+    """
+    Reads one of the OFFLINE_COMMANDS and the directory whose saved state it reads.
+
+    Parameters:
+    - args: sys.argv[1:], starting with the command
+
+    Returns:
+    - ArgumentParser
+    """
+    parser = ArgumentParser(description='Commands which only read the saved state, without connecting to Kattis.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, help in OFFLINE_COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=help, description=help)
+        subparser.add_argument('-d', '--directory', metavar='', type=str, required=True, help='Directory to which Kattis solution are downloaded to.')
+        subparser.add_argument('--state', metavar='', type=str, choices=STATE_BACKENDS, default=STATE_BACKENDS[0], help='Where KTG stores the state of solved problems: csv (status.csv) or sqlite (status.db).')
     return parser.parse_args(args)
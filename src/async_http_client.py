@@ -0,0 +1,123 @@
+from __future__ import annotations
+import time
+import asyncio
+from dataclasses import dataclass, field
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Tuple
+from src.http_client import HttpClient, FetchError, ErrorBudgetExhausted, RETRYABLE_STATUS_CODES, transferred_bytes
+from src.constants import CONNECT_TIMEOUT, READ_TIMEOUT
+
+if TYPE_CHECKING:
+    import requests
+
+
+@dataclass
+class AsyncResponse:
+    """
+    The parts of a response used by KTG, named like the attributes of requests.Response.
+    num_bytes_downloaded is the size of the body before decompression, if known.
+    """
+    status_code: int
+    text: str
+    content: bytes = b''
+    headers: Dict[str, str] = field(default_factory=dict)
+    num_bytes_downloaded: int = None
+
+
+Fetch = Callable[[str, Dict[str, str]], Awaitable[AsyncResponse]]
+
+
+class AsyncHttpClient:
+    """
+    AsyncHttpClient makes the GET requests of the --async engine. Each attempt is made by the fetch coroutine function,
+    while retries, backoff, Retry-After, the error budget, rate limiting and profiling are shared with the HttpClient of the run.
+
+    Parameters:
+    - http_client: The HttpClient of the run.
+    - fetch: Coroutine function making one GET request with the given headers, such as the one yielded by aiohttp_fetch.
+    - retryable_exceptions: Exceptions raised by fetch which are retried.
+    - sleep: Coroutine function used for waiting between attempts.
+    """
+    def __init__(
+        self, http_client: HttpClient, fetch: Fetch, retryable_exceptions: Tuple[type, ...] = (OSError, asyncio.TimeoutError),
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ) -> None:
+        self.http_client = http_client
+        self.__fetch = fetch
+        self.__retryable_exceptions = retryable_exceptions
+        self.__sleep = sleep
+
+    async def get(self, url: str, headers: Dict = None) -> AsyncResponse:
+        """
+        GETs the given URL.
+
+        Returns:
+        - AsyncResponse: A response with the status code 200 or 304
+
+        Raises:
+        - FetchError: If the request did not succeed
+        """
+        client = self.http_client
+        for attempt in range(client.max_retries + 1):
+            if client.errors_left <= 0:
+                raise ErrorBudgetExhausted(f'Error budget exhausted, not requesting {url}')
+            retry_after = None
+            if client.rate_limiter is not None:
+                await asyncio.get_running_loop().run_in_executor(None, client.rate_limiter.acquire)
+            start = time.perf_counter()
+            try:
+                response = await self.__fetch(url, headers or {})
+            except self.__retryable_exceptions as e:
+                client.profiler.count_request(0, failed=True, elapsed=time.perf_counter() - start)
+                error = f'{type(e).__name__} for {url}'
+            else:
+                client.profiler.count_request(
+                    len(response.content), failed=response.status_code not in (200, 304),
+                    bytes_transferred=transferred_bytes(response), elapsed=time.perf_counter() - start
+                )
+                if response.status_code in (200, 304):
+                    return response
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise FetchError(f'GET {url} returned {response.status_code}')
+                error = f'GET {url} returned {response.status_code}'
+                retry_after = client._parse_retry_after(response.headers.get('Retry-After'))
+            client._use_error_budget()
+            if attempt == client.max_retries:
+                break
+            await self.__sleep(retry_after if retry_after is not None else client._backoff(attempt))
+        raise FetchError(f'{error}, gave up after {client.max_retries + 1} attempts')
+
+
+@asynccontextmanager
+async def aiohttp_fetch(session: requests.Session, connections: int) -> AsyncIterator[Fetch]:
+    """
+    Yields a fetch coroutine function which makes its requests through one aiohttp.ClientSession, so that at most
+    the given number of connections are opened and kept alive for reuse. The headers and cookies of the logged in
+    requests session are copied to it. aiohttp errors are raised as ConnectionError, so AsyncHttpClient retries them.
+
+    Raises:
+    - ImportError: If aiohttp is not installed
+    """
+    import aiohttp
+    client = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=connections),
+        timeout=aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT),
+        cookie_jar=aiohttp.CookieJar(unsafe=True),
+        headers=dict(session.headers),
+        cookies={cookie.name: cookie.value for cookie in session.cookies}
+    )
+
+    async def fetch(url: str, headers: Dict[str, str]) -> AsyncResponse:
+        try:
+            async with client.get(url, headers=headers) as response:
+                content = await response.read()
+                compressed_size = response.headers.get('Content-Length') if 'Content-Encoding' in response.headers else None
+                return AsyncResponse(
+                    response.status, await response.text(errors='replace'), content, dict(response.headers),
+                    int(compressed_size) if compressed_size is not None and compressed_size.isdigit() else None
+                )
+        except aiohttp.ClientError as e:
+            raise ConnectionError(f'{type(e).__name__}: {e}') from e
+
+    async with client:
+        yield fetch
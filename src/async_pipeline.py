@@ -0,0 +1,162 @@
+from __future__ import annotations
+import asyncio
+from functools import partial
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Tuple
+from src.constants import ASYNC_QUEUE_SIZE, JOURNAL_COMPACTION_INTERVAL
+from src.http_cache import CacheEntry
+from src.http_client import FetchError
+from src.async_http_client import AsyncHttpClient
+from src.html_parser import SUBMISSIONS_PAGE, SUBMISSION_PAGE
+from src.solved_problem import SolvedProblem
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup as Soup
+    from KattisToGithub import KattisToGithub
+
+DONE = object()
+WRITE = 'write'
+FINISH = 'finish'
+
+
+class AsyncPipeline:
+    """
+    AsyncPipeline downloads the codes of SolvedProblems for --async. The work is split into stages connected by bounded queues:
+    1. listing: gets the accepted submissions of each SolvedProblem, from its submissions page or from discovery
+    2. fetching: downloads the unseen submissions of a SolvedProblem, newest first, until each language has code
+    3. writing: writes the codes to disk one at a time and records finished SolvedProblems in the journal
+    Requests are awaited on the event loop, while parsing, cache and disk access run in the executor, so network, parsing
+    and disk overlap without a thread for every SolvedProblem in flight. A full queue makes the stage before it wait,
+    which bounds the number of downloaded codes held in memory.
+    The extraction and bookkeeping of KattisToGithub are reused, so both engines download and record the same solutions.
+
+    Parameters:
+    - ktg: The KattisToGithub whose state, cache and extraction logic are used.
+    - http_client: AsyncHttpClient making the requests.
+    - executor: Executor used for the blocking work.
+    - consumers: Number of tasks in each of the listing and fetching stages.
+    """
+    def __init__(self, ktg: KattisToGithub, http_client: AsyncHttpClient, executor: Executor, consumers: int) -> None:
+        self.ktg = ktg
+        self.http_client = http_client
+        self.executor = executor
+        self.consumers = consumers
+        self.checked = 0
+
+    async def run(self, solved_problems: List[SolvedProblem]) -> None:
+        problems, candidates, writes = (asyncio.Queue(ASYNC_QUEUE_SIZE) for _ in range(3))
+        await asyncio.gather(
+            self.__produce(solved_problems, problems),
+            self.__stage(problems, partial(self.__list_submissions, candidates=candidates), self.consumers, candidates, self.consumers),
+            self.__stage(candidates, partial(self.__fetch_submissions, writes=writes), self.consumers, writes, 1),
+            self.__stage(writes, self.__write, 1)
+        )
+
+    async def __produce(self, solved_problems: List[SolvedProblem], outbox: asyncio.Queue) -> None:
+        for solved_problem in solved_problems:
+            await outbox.put(solved_problem)
+        for _ in range(self.consumers):
+            await outbox.put(DONE)
+
+    async def __stage(
+        self, inbox: asyncio.Queue, handle: Callable[[Any], Awaitable[None]], consumers: int, outbox: asyncio.Queue = None, next_consumers: int = 0
+    ) -> None:
+        """
+        Runs consumers tasks which handle the items of the inbox until each gets DONE, after which the next stage is told to stop.
+        """
+        async def consume() -> None:
+            while (item := await inbox.get()) is not DONE:
+                await handle(item)
+        await asyncio.gather(*(consume() for _ in range(consumers)))
+        for _ in range(next_consumers):
+            await outbox.put(DONE)
+
+    async def __list_submissions(self, solved_problem: SolvedProblem, candidates: asyncio.Queue) -> None:
+        ktg = self.ktg
+        try:
+            if ktg._submissions_were_discovered(solved_problem):
+                submissions = ktg.discovered_submissions[solved_problem.submissions_link]
+            else:
+                submissions = await self.__get_page_data(solved_problem.submissions_link, ktg._extract_submission_links, SUBMISSIONS_PAGE)
+        except Exception as e:
+            await self.__skip(solved_problem, e)
+            return
+        await candidates.put((solved_problem, submissions))
+
+    async def __fetch_submissions(self, item: Tuple[SolvedProblem, List[List[str]]], writes: asyncio.Queue) -> None:
+        """
+        Picks the submissions to download like KattisToGithub._get_code_for_solved_problem. An older submission of a language
+        is only fetched if the newer ones were not acceptable, so the submissions of one SolvedProblem are fetched in order.
+        """
+        ktg = self.ktg
+        solved_problem, submissions = item
+        added_languages, added_filenames = set(), set()
+        try:
+            for link, language in ktg._get_unseen_submissions(solved_problem, submissions):
+                if language in added_languages:
+                    continue
+                submission = await self.__get_submission(solved_problem, link, language)
+                if submission['filename'] in added_filenames:
+                    continue
+                if ktg._submission_is_acceptable(solved_problem, submission, language):
+                    added_languages.add(language)
+                    added_filenames.add(submission['filename'])
+                    await writes.put((WRITE, solved_problem, submission, language))
+        except Exception as e:
+            await self.__skip(solved_problem, e)
+            return
+        await writes.put((FINISH, solved_problem, submissions))
+
+    async def __write(self, item: Tuple) -> None:
+        if item[0] == WRITE:
+            await self.__in_executor(self.ktg._add_submission, *item[1:])
+        else:
+            await self.__in_executor(self.ktg._finish_solved_problem, *item[1:])
+            await self.__count_checked()
+
+    async def __skip(self, solved_problem: SolvedProblem, error: Exception) -> None:
+        self.ktg._skip_solved_problem(solved_problem, error)
+        await self.__count_checked()
+
+    async def __count_checked(self) -> None:
+        self.checked += 1
+        if self.checked % 59 == 0:
+            print(f'#: Checked {self.checked} solved problems...')
+        journal = self.ktg.journal
+        if journal is not None and journal.records_since_compaction >= JOURNAL_COMPACTION_INTERVAL:
+            await self.__in_executor(self.ktg._compact_journal)
+
+    async def __get_submission(self, solved_problem: SolvedProblem, link: str, language: str) -> Dict:
+        """
+        Works like KattisToGithub._get_submission, preferring the raw source file over the submission page.
+        """
+        ktg = self.ktg
+        filename = ktg._get_known_filename(solved_problem, language)
+        if filename is not None:
+            try:
+                code = ktg._read_raw_source(await self.http_client.get(ktg._submission_source_url(link, filename)))
+            except FetchError:
+                code = None
+            if code is not None:
+                return {'filename': filename, 'code': code}
+        return await self.__get_page_data(link, ktg._extract_submission, SUBMISSION_PAGE, permanent=True)
+
+    async def __get_page_data(self, url: str, extract: Callable[[Soup], Any], page: str, permanent: bool = False) -> Any:
+        entry, unchanged = await self.__fetch_page(url, permanent)
+        return await self.__in_executor(self.ktg._extract_page_data, entry, unchanged, extract, page)
+
+    async def __fetch_page(self, url: str, permanent: bool) -> Tuple[CacheEntry, bool]:
+        """
+        Works like KattisToGithub._fetch_page, with the request awaited and the cache accessed in the executor.
+        """
+        http_cache = self.ktg.http_cache
+        if http_cache is None:
+            return CacheEntry(url=url, body=(await self.http_client.get(url)).text, content_hash=None), False
+        entry = await self.__in_executor(http_cache.get, url)
+        if entry is not None and entry.permanent and entry.parsed:
+            return entry, True
+        response = await self.http_client.get(url, headers=entry.conditional_headers if entry is not None else {})
+        return await self.__in_executor(self.ktg._cache_response, url, entry, response, permanent)
+
+    async def __in_executor(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args))
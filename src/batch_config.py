@@ -0,0 +1,100 @@
+import os
+import json
+from pathlib import Path
+from argparse import Namespace
+from dataclasses import dataclass, field
+from typing import Dict, List
+from src.constants import DEFAULT_WORKERS
+from src.argument_parser import parse_arguments
+
+BATCH_SETTINGS = ['workers', 'requests_per_second', 'parallel_accounts', 'defaults', 'accounts']
+
+
+@dataclass
+class AccountConfig:
+    arguments: Namespace
+
+
+@dataclass
+class BatchConfig:
+    """
+    Settings of a batch run, read from a JSON file such as:
+
+    {
+        "workers": 8,
+        "requests_per_second": 5,
+        "parallel_accounts": 2,
+        "defaults": {"no_readme": true},
+        "accounts": [
+            {"user": "alice", "password_env": "KATTIS_PASSWORD_ALICE", "directory": "alice-solutions"},
+            {"user": "bob", "password": "secret", "directory": "/srv/bob-solutions", "state": "sqlite"}
+        ]
+    }
+
+    Every key of an account, or of defaults, is a command line argument without the leading dashes, with _ in place of -.
+    Relative directories are relative to the config file.
+    """
+    accounts: List[AccountConfig] = field(default_factory=list)
+    workers: int = DEFAULT_WORKERS
+    requests_per_second: float = None
+    parallel_accounts: int = 1
+
+
+def load_batch_config(filepath: Path) -> BatchConfig:
+    """
+    Reads and validates a batch config. The options of every account are checked with src/argument_parser.
+
+    Returns:
+    - BatchConfig
+
+    Raises:
+    - ValueError: If the file can not be read or contains invalid settings
+    """
+    try:
+        with open(filepath, 'r') as file:
+            settings = json.load(file)
+    except (OSError, ValueError) as e:
+        raise ValueError(f'Could not read batch config {filepath}: {e}')
+    if not isinstance(settings, dict) or not isinstance(settings.get('accounts'), list) or len(settings['accounts']) == 0:
+        raise ValueError(f'Batch config {filepath} must contain a non-empty list of accounts')
+    unknown = set(settings) - set(BATCH_SETTINGS)
+    if unknown:
+        raise ValueError(f'Unknown settings in batch config: {", ".join(sorted(unknown))}')
+    config = BatchConfig(
+        workers=settings.get('workers', DEFAULT_WORKERS),
+        requests_per_second=settings.get('requests_per_second'),
+        parallel_accounts=settings.get('parallel_accounts', 1)
+    )
+    if config.workers < 1 or config.parallel_accounts < 1 or (config.requests_per_second is not None and config.requests_per_second <= 0):
+        raise ValueError('workers and parallel_accounts must be at least 1, and requests_per_second positive')
+    for n, account in enumerate(settings['accounts'], start=1):
+        options = {**settings.get('defaults', {}), **account}
+        config.accounts += [AccountConfig(arguments=_parse_account(n, options, filepath.resolve().parent))]
+    return config
+
+
+def _parse_account(n: int, options: Dict, config_directory: Path) -> Namespace:
+    options = dict(options)
+    password_env = options.pop('password_env', None)
+    if password_env is not None:
+        if password_env not in os.environ:
+            raise ValueError(f'Account {n}: environment variable {password_env} is not set')
+        options['password'] = os.environ[password_env]
+    if 'directory' in options:
+        options['directory'] = str(config_directory / options['directory'])
+    args = []
+    for key, value in options.items():
+        flag = '--' + key.replace('_', '-')
+        if value is True:
+            args += [flag]
+        elif value is not False and value is not None:
+            args += [flag, str(value)]
+    try:
+        arguments = parse_arguments(args)
+    except SystemExit:
+        raise ValueError(f'Account {n} has invalid options, see the message above')
+    if arguments.batch is not None:
+        raise ValueError(f'Account {n}: batch can not be nested')
+    if arguments.watch:
+        raise ValueError(f'Account {n}: watch can not be used in a batch')
+    return arguments
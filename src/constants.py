@@ -1,10 +1,39 @@
 BASE_URL = 'https://open.kattis.com'
-LOGIN_URL = 'https://open.kattis.com/login/email'
-CSV_FIELD_NAMES = ['Name', 'Difficulty', 'Status', 'ProblemLink', 'SubmissionsLink', 'Solutions']
+LOGIN_PATH = '/login/email'
+LOGIN_URL = BASE_URL + LOGIN_PATH
+DEFAULT_WORKERS = 4
+ONE_BY_ONE_COMMIT_LIMIT = 5
+JOURNAL_COMPACTION_INTERVAL = 200
+ASYNC_QUEUE_SIZE = 100
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60
+RETRY_AFTER_MAX = 300
+ERROR_BUDGET = 25
+SESSION_FILE = '.ktg_session'
+WATCH_MIN_INTERVAL = 60
+WATCH_MAX_INTERVAL = 30 * 60
+LOGGED_IN_MARKER = 'href="/logout"'
+PARSER_BACKENDS = ['lxml', 'html.parser']
+FALLBACK_PARSER_BACKEND = 'html.parser'
+STATE_BACKENDS = ['csv', 'sqlite']
+TRANSPORTS = ['http1', 'http2']
+OFFLINE_COMMANDS = {
+    'readme': 'Regenerates README.md from the saved state. The file is not committed.',
+    'status': 'Shows how many solved problems there are by status, difficulty and language.',
+    'pending': 'Lists the solved problems whose code has not been downloaded yet.'
+}
+CSV_FIELD_NAMES = ['Name', 'Difficulty', 'Status', 'ProblemLink', 'SubmissionsLink', 'Solutions', 'Points', 'LastSubmissionId', 'SolutionHashes', 'Activity', 'ActivityRank']
+RECENT_ACTIVITY_QUERY = 'order=-date'
 
 README_LIST_TITLE = '## Solved Problems\n'
 KTG_AD = '<sub><i>Created with [KattisToGithub](https://github.com/Zabrakk/KattisToGithub)</i></sub>\n'
 SEPARATOR = '\n'
 README_NUM_SOLVED = lambda n: f'Number of problems solved: **{n}**\n'
 README_LIST_COLUMN_TITLES = '|Problem|Difficulty|Solutions|\n'
-README_LIST_POSITIONING = '|:-|:-|:-|\n'
\ No newline at end of file
+README_LIST_POSITIONING = '|:-|:-|:-|\n'
+HTTP_CACHE_DIRECTORY = '.ktg_cache'
+HTTP_CACHE_MAX_SIZE = 200 * 1024 * 1024
+HTTP_CACHE_MAX_AGE = 30 * 24 * 60 * 60
@@ -1,9 +1,11 @@
 import os
 import csv
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, List, Dict
 from src.constants import CSV_FIELD_NAMES
-from src.solved_problem import SolvedProblem, ProblemStatus
+from src.solved_problem import SolvedProblem, ProblemStatus, intern_language
+from src.problem_registry import ProblemRegistry
+from src.gitignore import add_to_gitignore
 
 
 class CsvHandler:
@@ -24,19 +26,7 @@ class CsvHandler:
         Returns:
         - bool: True if .gitignore was updated; False otherwise
         """
-        gitignore_filepath = self.__filepath.parent / '.gitignore'
-        if not gitignore_filepath.exists():
-            with open(gitignore_filepath, 'w') as file:
-                print('#: Adding status.csv to .gitignore')
-                file.write('status.csv\n')
-                return True
-        with open(gitignore_filepath, 'r+') as file:
-            ignored_files = list(map(str.strip, file.readlines()))
-            if 'status.csv' in ignored_files or '*.csv' in ignored_files:
-                return False
-            print('#: Adding status.csv to .gitignore')
-            file.write('\nstatus.csv\n')
-        return True
+        return add_to_gitignore(self.__filepath.parent, 'status.csv', ('*.csv',))
 
     def load_solved_problems(self) -> List[SolvedProblem]:
         """
@@ -45,20 +35,29 @@ class CsvHandler:
         Returns:
         - List[SolvedProblems]: SolvedProblems read from the csv file
         """
+        return self.load_registry().solved_problems
+
+    def load_registry(self) -> ProblemRegistry:
+        """
+        Loads SolvedProblems from <directory>/status.csv into a ProblemRegistry. Duplicate rows are merged.
+
+        Returns:
+        - ProblemRegistry: Registry of the SolvedProblems read from the csv file
+        """
+        registry = ProblemRegistry()
         if not os.path.exists(self.__filepath):
-            return []
-        solved_problems = []
+            return registry
         try:
             with open(self.__filepath, 'r') as csv_file:
                 reader = csv.DictReader(csv_file, fieldnames=CSV_FIELD_NAMES)
                 reader.__next__()
                 for row in reader:
-                    solved_problems += [self.__load_solved_problem_from_csv_row(row)]
+                    registry.upsert(self.__load_solved_problem_from_csv_row(row))
         except StopIteration:
             print('#: Status.csv was empty')
         except ValueError as e:
             print(f'#: Incorrect entry in status.csv\n{e}')
-        return solved_problems
+        return registry
 
     def __load_solved_problem_from_csv_row(self, row: Dict) -> SolvedProblem:
        return SolvedProblem(
@@ -67,7 +66,12 @@ class CsvHandler:
             status=ProblemStatus(int(self.__ensure_not_None(row['Status']))),
             problem_link=self.__ensure_not_None(row['ProblemLink']),
             submissions_link=self.__ensure_not_None(row['SubmissionsLink']),
-            filename_language_dict=self.__build_filename_language_dict_from_str(row['Solutions'])
+            filename_language_dict=self.__build_filename_language_dict_from_str(row['Solutions']),
+            points=row['Points'] or None,
+            last_submission_id=row['LastSubmissionId'] or None,
+            filename_hash_dict=self.__build_filename_hash_dict_from_str(row['SolutionHashes'] or ''),
+            activity=row['Activity'] or None,
+            activity_rank=int(row['ActivityRank']) if row['ActivityRank'] else None
         )
 
     def __build_filename_language_dict_from_str(self, val: str) -> Dict:
@@ -75,25 +79,39 @@ class CsvHandler:
         try:
             for entry in val.split('#'):
                 language, filename = entry.split('|')
-                filename_language_dict[filename] = language
+                filename_language_dict[filename] = intern_language(language)
         except ValueError as e:
             pass
         return filename_language_dict
 
+    def __build_filename_hash_dict_from_str(self, val: str) -> Dict:
+        filename_hash_dict = {}
+        for entry in filter(None, val.split('#')):
+            filename, _, content_hash = entry.rpartition('|')
+            if filename:
+                filename_hash_dict[filename] = content_hash
+        return filename_hash_dict
+
     def __ensure_not_None(self, val: any) -> any:
         if val is not None:
             return val
         raise ValueError('None value in csv')
 
-    def write_solved_problems_to_csv(self, solved_problems: List[SolvedProblem]) -> None:
+    def write_solved_problems_to_csv(self, solved_problems: Iterable[SolvedProblem]) -> None:
         """
-        Writes a given list of SolvedProblems into <directory>/status.csv
+        Writes the given SolvedProblems into <directory>/status.csv
 
         Parameters:
-        - solved_problems: A list of SolvedProblems
+        - solved_problems: A list or ProblemRegistry of SolvedProblems
         """
         with open(self.__filepath, 'w', newline='') as csv_file:
             writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELD_NAMES)
             writer.writeheader()
             for solved_problem in solved_problems:
                 writer.writerow(solved_problem.to_dict())
+
+    def save(self, solved_problems: Iterable[SolvedProblem]) -> None:
+        """
+        Saves the state of the given SolvedProblems. Rewrites the whole status.csv.
+        """
+        self.write_solved_problems_to_csv(solved_problems)
@@ -0,0 +1,106 @@
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+
+class GitBackend:
+    """
+    GitBackend runs git in the solutions repository.
+    Any number of paths is staged or committed with a single git call, as the paths are passed through stdin instead of as arguments.
+    Failing git calls are reported instead of ignored.
+
+    Parameters:
+    - directory: A Path object pointing to the repository.
+    """
+    def __init__(self, directory: Path) -> None:
+        self.__directory = directory
+        self.__commit_made = False
+
+    @property
+    def commit_made(self) -> bool:
+        """
+        True if at least one commit was made, i.e. the user should push.
+        """
+        return self.__commit_made
+
+    def add(self, paths: List[str]) -> bool:
+        """
+        Stages the given paths with one git add call.
+
+        Returns:
+        - bool: True if git add succeeded; False otherwise
+        """
+        if len(paths) == 0:
+            return True
+        return self.__run(['add', '--pathspec-from-file=-', '--pathspec-file-nul'], paths) is not None
+
+    def commit(self, message: str, paths: List[str]) -> bool:
+        """
+        Commits the given, already staged, paths. Other staged changes are left out of the commit.
+        Paths without staged changes are taken as already committed, e.g. by a run which was interrupted before saving its state.
+
+        Returns:
+        - bool: True if the paths are committed; False otherwise
+        """
+        if len(paths) == 0:
+            return True
+        staged_paths = self.__staged_paths()
+        return staged_paths is not None and self.__commit(message, paths, staged_paths)
+
+    def add_and_commit(self, message: str, paths: List[str]) -> bool:
+        return self.add(paths) and self.commit(message, paths)
+
+    def commit_solutions(self, solutions: List[Tuple[str, List[str]]], commit_one_by_one: bool) -> bool:
+        """
+        Stages the paths of all solutions with one git add call, and commits them either per problem or all at once.
+
+        Parameters:
+        - solutions: (problem name, paths) pairs.
+        - commit_one_by_one: If True, each problem gets its own commit message; otherwise one commit is made.
+
+        Returns:
+        - bool: True if every git call succeeded; False otherwise
+        """
+        all_paths = [path for _, paths in solutions for path in paths]
+        if not self.add(all_paths):
+            return False
+        staged_paths = self.__staged_paths()
+        if staged_paths is None:
+            return False
+        if not commit_one_by_one:
+            return self.__commit('Added new solutions', all_paths, staged_paths)
+        results = [self.__commit(f'Solution for {name}', paths, staged_paths) for name, paths in solutions]
+        return all(results)
+
+    def __staged_paths(self) -> Optional[Set[str]]:
+        staged = self.__run(['diff', '--cached', '--name-only', '--no-renames', '--relative', '-z'], [])
+        return set(staged.split('\0')) if staged is not None else None
+
+    def __commit(self, message: str, paths: List[str], staged_paths: Set[str]) -> bool:
+        paths = [path for path in paths if path in staged_paths]
+        if len(paths) == 0:
+            return True
+        if self.__run(['commit', '-m', message, '--pathspec-from-file=-', '--pathspec-file-nul'], paths) is None:
+            return False
+        self.__commit_made = True
+        return True
+
+    def __run(self, args: List[str], paths: List[str]) -> Optional[str]:
+        """
+        Runs git with the given paths on stdin.
+
+        Returns:
+        - str: The output of git; None if git failed, in which case its output is printed
+        """
+        try:
+            result = subprocess.run(
+                ['git'] + args, cwd=self.__directory, input='\0'.join(paths), capture_output=True, text=True
+            )
+        except OSError as e:
+            print(f'#: Could not run git {args[0]}: {e}')
+            return None
+        if result.returncode != 0:
+            output = '\n'.join(text.strip() for text in [result.stdout, result.stderr] if text.strip() != '')
+            print(f'#: git {args[0]} failed: {output}')
+            return None
+        return result.stdout
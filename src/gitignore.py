@@ -0,0 +1,29 @@
+from pathlib import Path
+from typing import Tuple
+
+
+def add_to_gitignore(directory: Path, pattern: str, covering_patterns: Tuple[str, ...] = ()) -> bool:
+    """
+    Adds a pattern to <directory>/.gitignore. If .gitignore does not exists, it will be created.
+
+    Parameters:
+    - directory: A Path object pointing to the repository.
+    - pattern: The pattern to add.
+    - covering_patterns: Other patterns which already ignore the same files.
+
+    Returns:
+    - bool: True if .gitignore was updated; False otherwise
+    """
+    gitignore_filepath = directory / '.gitignore'
+    if not gitignore_filepath.exists():
+        with open(gitignore_filepath, 'w') as file:
+            print(f'#: Adding {pattern} to .gitignore')
+            file.write(f'{pattern}\n')
+            return True
+    with open(gitignore_filepath, 'r+') as file:
+        ignored_files = list(map(str.strip, file.readlines()))
+        if pattern in ignored_files or any(covering in ignored_files for covering in covering_patterns):
+            return False
+        print(f'#: Adding {pattern} to .gitignore')
+        file.write(f'\n{pattern}\n')
+    return True
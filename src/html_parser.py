@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
+from src.constants import PARSER_BACKENDS, FALLBACK_PARSER_BACKEND
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup as Soup, SoupStrainer
+
+PROBLEMS_PAGE = 'problems'
+SUBMISSIONS_PAGE = 'submissions'
+SUBMISSION_PAGE = 'submission'
+LOGIN_PAGE = 'login'
+
+PAGE_SUBTREES: Dict[str, List[Tuple[str, Dict]]] = {
+    PROBLEMS_PAGE: [('div', {'id': 'problems-tab'}), ('a', {'role': 'button'})],
+    SUBMISSIONS_PAGE: [('div', {'id': 'submissions-tab'})],
+    SUBMISSION_PAGE: [('div', {'class': ['horizontal_link_list', 'file_source-content-test', 'source-highlight']})],
+    LOGIN_PAGE: [('input', {'name': 'csrf_token'})],
+}
+
+
+def starts_subtree(subtrees: List[Tuple[str, Dict]], name: str, attrs: Dict[str, Union[str, List[str]]]) -> bool:
+    """
+    Checks whether a tag is the root of one of the subtrees. A list of classes matches a tag which has any of them.
+
+    Parameters:
+    - subtrees: (name, attrs) pairs, see PAGE_SUBTREES.
+    - name: Name of the tag.
+    - attrs: Attributes of the tag, as given by the tree builder.
+    """
+    for subtree_name, subtree_attrs in subtrees:
+        if name != subtree_name:
+            continue
+        matches = True
+        for key, expected in subtree_attrs.items():
+            value = (attrs or {}).get(key)
+            if isinstance(expected, list):
+                classes = value.split() if isinstance(value, str) else value or []
+                matches &= any(cls in classes for cls in expected)
+            else:
+                matches &= value == expected
+        if matches:
+            return True
+    return False
+
+
+def create_subtree_strainer(subtrees: List[Tuple[str, Dict]]) -> SoupStrainer:
+    """
+    Creates a SoupStrainer which keeps every one of the subtrees, so that a page is tokenized only once however many subtrees are read from it.
+    A plain SoupStrainer can only match one name and set of attributes.
+    """
+    from bs4 import SoupStrainer
+
+    class SubtreeStrainer(SoupStrainer):
+        def allow_tag_creation(self, nsprefix: str, name: str, attrs: Dict) -> bool:
+            return starts_subtree(subtrees, name, attrs)
+
+        def allow_string_creation(self, string: str) -> bool:
+            return False
+
+        def search_tag(self, markup_name=None, markup_attrs={}):
+            # Used while parsing by BeautifulSoup versions before 4.13, which have no allow_tag_creation
+            if isinstance(markup_name, str):
+                return starts_subtree(subtrees, markup_name, markup_attrs)
+            return super().search_tag(markup_name, markup_attrs)
+
+    return SubtreeStrainer()
+
+
+class HtmlParser:
+    """
+    HtmlParser turns downloaded pages into BeautifulSoup objects.
+    With partial parsing only the subtrees KTG reads from each kind of page are built, which skips most of the document.
+
+    Parameters:
+    - backend: Name of the BeautifulSoup tree builder to use. Falls back to html.parser if the backend is not installed.
+    - partial: If True, pages are parsed with SoupStrainers limited to PAGE_SUBTREES.
+    """
+    def __init__(self, backend: str = PARSER_BACKENDS[0], partial: bool = True) -> None:
+        from bs4.builder import builder_registry
+        self.__backend = backend if builder_registry.lookup(backend) is not None else FALLBACK_PARSER_BACKEND
+        self.__partial = partial
+        self.__strainers = {page: create_subtree_strainer(subtrees) for page, subtrees in PAGE_SUBTREES.items()} if partial else {}
+
+    @property
+    def backend(self) -> str:
+        return self.__backend
+
+    @property
+    def partial(self) -> bool:
+        return self.__partial
+
+    def parse(self, text: str, page: str = None) -> Soup:
+        """
+        Parses a page.
+
+        Parameters:
+        - text: The page's HTML.
+        - page: One of the keys of PAGE_SUBTREES. If None, or partial parsing is off, the whole page is parsed.
+          Otherwise every subtree of the page is built in a single pass.
+
+        Returns:
+        - Soup: The parsed page
+        """
+        from bs4 import BeautifulSoup as Soup
+        if not self.__partial or page is None:
+            return Soup(text, self.__backend)
+        return Soup(text, self.__backend, parse_only=self.__strainers[page])
+
+    @staticmethod
+    def decompose(soup: Soup) -> None:
+        """
+        Destroys a parsed page once the data needed from it has been extracted, so that its tree is freed right away
+        instead of waiting for the garbage collector. BeautifulSoup.decompose alone only clears the root of the tree.
+        Top-level strings, such as the doctype, can only be extracted: before BeautifulSoup 4.13 they have no decompose.
+        """
+        from bs4 import Tag
+        for element in list(soup.contents):
+            if isinstance(element, Tag):
+                element.decompose()
+            else:
+                element.extract()
+        soup.decompose()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import importlib.util
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+
+def http2_is_available() -> bool:
+    """
+    Returns:
+    - bool: True if httpx and h2, which --transport http2 needs, are installed; False otherwise
+    """
+    return importlib.util.find_spec('httpx') is not None and importlib.util.find_spec('h2') is not None
+
+
+class Http2Session:
+    """
+    Http2Session replaces the requests.Session of a run with --transport http2. Its requests are made by one httpx.Client
+    with HTTP/2 enabled, so the concurrent requests of all workers are multiplexed over a single connection to Kattis,
+    instead of each worker keeping a connection of its own. It offers the parts of requests.Session used by KTG,
+    shares the cookie jar of the session it replaces and raises the exceptions of requests, so that HttpClient,
+    SessionStore and logging in work unchanged. Responses are decompressed like with requests.
+
+    Parameters:
+    - session: The requests.Session whose headers and cookies are taken over.
+
+    Raises:
+    - ImportError: If httpx or h2 is not installed
+    """
+    def __init__(self, session: requests.Session) -> None:
+        import httpx
+        self.cookies = session.cookies
+        self.__client = httpx.Client(
+            http2=True, follow_redirects=True, cookies=session.cookies,
+            headers={name: value for name, value in session.headers.items() if name.lower() != 'connection'}
+        )
+        self.headers = self.__client.headers
+
+    def get(self, url: str, timeout: Tuple[float, float], **kwargs) -> httpx.Response:
+        return self.__request('GET', url, timeout, **kwargs)
+
+    def post(self, url: str, timeout: Tuple[float, float], **kwargs) -> httpx.Response:
+        return self.__request('POST', url, timeout, **kwargs)
+
+    def close(self) -> None:
+        self.__client.close()
+
+    def __request(self, method: str, url: str, timeout: Tuple[float, float], **kwargs) -> httpx.Response:
+        import httpx
+        import requests
+        connect_timeout, read_timeout = timeout
+        try:
+            return self.__client.request(method, url, timeout=httpx.Timeout(read_timeout, connect=connect_timeout), **kwargs)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from dataclasses import dataclass, field, asdict
+from src.constants import HTTP_CACHE_DIRECTORY, HTTP_CACHE_MAX_SIZE, HTTP_CACHE_MAX_AGE
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    content_hash: str
+    etag: str = None
+    last_modified: str = None
+    stored_at: float = 0.0
+    permanent: bool = False
+    parsed: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Headers which make the server answer 304 Not Modified if the cached body is still valid.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    HttpCache stores HTTP response bodies, and data parsed from them, on disk next to status.csv. Permanent entries keep only the parsed data.
+    Each URL is stored in its own JSON file, so entries can be read and written from several threads.
+
+    Parameters:
+    - directory: A Path object pointing to the location where status.csv is stored.
+    - max_size: Total size in bytes the non-permanent entries may use before the least recently stored ones are evicted.
+    - max_age: Age in seconds after which non-permanent entries are evicted.
+    """
+    def __init__(self, directory: Path, max_size: int = HTTP_CACHE_MAX_SIZE, max_age: float = HTTP_CACHE_MAX_AGE) -> None:
+        self.__cache_dir = directory / HTTP_CACHE_DIRECTORY
+        self.max_size = max_size
+        self.max_age = max_age
+        self.__create_cache_dir()
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.__cache_dir
+
+    def __create_cache_dir(self) -> None:
+        """
+        Creates the cache folder with its own .gitignore, so that the cache never ends up in the solutions repository.
+        """
+        if not self.__cache_dir.exists():
+            os.makedirs(self.__cache_dir)
+            with open(self.__cache_dir / '.gitignore', 'w') as file:
+                file.write('*\n')
+
+    def __entry_path(self, url: str) -> Path:
+        return self.__cache_dir / (hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    @staticmethod
+    def content_hash(body: str) -> str:
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Returns the cached entry for the given URL.
+
+        Returns:
+        - CacheEntry: The cached entry; None if the URL is not cached or the entry is unreadable
+        """
+        try:
+            with open(self.__entry_path(url), 'r', encoding='utf-8') as file:
+                return CacheEntry(**json.load(file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def store(self, url: str, body: str, etag: str = None, last_modified: str = None, permanent: bool = False) -> CacheEntry:
+        """
+        Stores a response body. Parsed data from an earlier body is kept only if the body did not change.
+
+        Returns:
+        - CacheEntry: The stored entry
+        """
+        content_hash = self.content_hash(body)
+        previous = self.get(url)
+        parsed = previous.parsed if previous is not None and previous.content_hash == content_hash else {}
+        entry = CacheEntry(
+            url=url, body=body, content_hash=content_hash, etag=etag, last_modified=last_modified,
+            stored_at=time.time(), permanent=permanent, parsed=parsed
+        )
+        self.__save(entry)
+        return entry
+
+    def touch(self, entry: CacheEntry) -> None:
+        """
+        Marks an entry as revalidated, so that age based eviction starts over.
+        """
+        entry.stored_at = time.time()
+        self.__save(entry)
+
+    def store_parsed(self, entry: CacheEntry, key: str, value: Any) -> None:
+        """
+        Stores JSON serializable data parsed from the entry's body under the given key.
+        The body of a permanent entry is dropped, as it is neither requested nor parsed again, and permanent entries are never evicted.
+        """
+        entry.parsed[key] = value
+        if entry.permanent:
+            entry.body = ''
+        self.__save(entry)
+
+    def __save(self, entry: CacheEntry) -> None:
+        path = self.__entry_path(entry.url)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(asdict(entry), file)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        Removes non-permanent entries older than max_age, and then the least recently stored ones until max_size is no longer exceeded.
+
+        Returns:
+        - int: Number of evicted entries
+        """
+        now = time.time()
+        evictable = []
+        for path in self.__cache_dir.glob('*.json'):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    entry = json.load(file)
+            except (OSError, ValueError):
+                evictable += [(0.0, 0, path)]
+                continue
+            if not entry.get('permanent'):
+                evictable += [(entry.get('stored_at', 0.0), path.stat().st_size, path)]
+        evictable.sort(key=lambda e: e[0])
+        total_size = sum(size for _, size, _ in evictable)
+        evicted = 0
+        for stored_at, size, path in evictable:
+            if now - stored_at <= self.max_age and total_size <= self.max_size:
+                break
+            os.remove(path)
+            total_size -= size
+            evicted += 1
+        return evicted
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
+from src.run_profiler import RunProfiler
+from src.rate_limiter import RateLimiter
+from src.constants import CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX, RETRY_AFTER_MAX, ERROR_BUDGET
+
+if TYPE_CHECKING:
+    import requests
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def transferred_bytes(response) -> int:
+    """
+    Returns the size of a response body as it was transferred, before decompression. httpx and AsyncResponse report it
+    as num_bytes_downloaded, while for requests it is the position of the underlying urllib3 stream.
+    The decoded size is returned if neither is known.
+    """
+    num_bytes = getattr(response, 'num_bytes_downloaded', None)
+    if not isinstance(num_bytes, int):
+        tell = getattr(getattr(response, 'raw', None), 'tell', None)
+        num_bytes = tell() if callable(tell) else None
+    return num_bytes if isinstance(num_bytes, int) and num_bytes > 0 else len(response.content)
+
+
+class FetchError(Exception):
+    """
+    Raised when a request did not succeed, even after retrying.
+    """
+
+
+class ErrorBudgetExhausted(FetchError):
+    """
+    Raised for every request made after the run's error budget has been used up.
+    """
+
+
+class HttpClient:
+    """
+    HttpClient makes every request of a run through the given session.
+    Requests have connect and read timeouts. Connection errors, timeouts, 429 and 5xx responses are retried with
+    jittered exponential backoff, and a Retry-After header is honored. Each failed attempt uses up the run's error budget,
+    after which requests fail immediately instead of hammering an unresponsive server.
+
+    Parameters:
+    - session: The requests.Session used for the requests.
+    - error_budget: Number of failed attempts allowed during the run, or during each sync and poll of --watch.
+    - sleep: Function used for waiting between attempts.
+    - profiler: RunProfiler counting the requests and bytes received.
+    - rate_limiter: RateLimiter shared with other clients, or None for no limit.
+    """
+    def __init__(
+        self, session: requests.Session, error_budget: int = ERROR_BUDGET, sleep: Callable[[float], None] = time.sleep,
+        profiler: RunProfiler = None, rate_limiter: RateLimiter = None
+    ) -> None:
+        self.session = session
+        self.profiler = profiler if profiler is not None else RunProfiler()
+        self.rate_limiter = rate_limiter
+        self.timeout: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.max_retries = MAX_RETRIES
+        self.__sleep = sleep
+        self.__error_budget = error_budget
+        self.__errors_left = error_budget
+        self.__lock = threading.Lock()
+
+    @property
+    def errors_left(self) -> int:
+        return self.__errors_left
+
+    def reset_error_budget(self) -> None:
+        """
+        Restores the full error budget. Used by --watch, which makes a new sync or poll long after the previous failures.
+        """
+        with self.__lock:
+            self.__errors_left = self.__error_budget
+
+    def get(self, url: str, headers: Dict = None) -> requests.Response:
+        """
+        GETs the given URL.
+
+        Returns:
+        - requests.Response: A response with the status code 200 or 304
+
+        Raises:
+        - FetchError: If the request did not succeed
+        """
+        return self.__request('GET', url, (200, 304), headers=headers or {})
+
+    def post(self, url: str, data: Dict) -> requests.Response:
+        """
+        POSTs the given data to the URL.
+
+        Returns:
+        - requests.Response: A response with the status code 200
+
+        Raises:
+        - FetchError: If the request did not succeed
+        """
+        return self.__request('POST', url, (200,), data=data)
+
+    def __request(self, method: str, url: str, ok_status_codes: Tuple[int, ...], **kwargs) -> requests.Response:
+        import requests
+        retryable_exceptions = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+        for attempt in range(self.max_retries + 1):
+            if self.__errors_left <= 0:
+                raise ErrorBudgetExhausted(f'Error budget exhausted, not requesting {url}')
+            retry_after = None
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                send = self.session.get if method == 'GET' else self.session.post
+                response = send(url, timeout=self.timeout, **kwargs)
+            except retryable_exceptions as e:
+                self.profiler.count_request(0, failed=True, elapsed=time.perf_counter() - start)
+                error = f'{type(e).__name__} for {url}'
+            else:
+                for redirect in response.history:
+                    self.profiler.count_request(len(redirect.content), bytes_transferred=transferred_bytes(redirect))
+                self.profiler.count_request(
+                    len(response.content), failed=response.status_code not in ok_status_codes,
+                    bytes_transferred=transferred_bytes(response), elapsed=time.perf_counter() - start
+                )
+                if response.status_code in ok_status_codes:
+                    return response
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise FetchError(f'{method} {url} returned {response.status_code}')
+                error = f'{method} {url} returned {response.status_code}'
+                retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+            self._use_error_budget()
+            if attempt == self.max_retries:
+                break
+            self.__sleep(retry_after if retry_after is not None else self._backoff(attempt))
+        raise FetchError(f'{error}, gave up after {self.max_retries + 1} attempts')
+
+    def _use_error_budget(self) -> None:
+        with self.__lock:
+            self.__errors_left -= 1
+            if self.__errors_left == 0:
+                print('#: Too many failed requests, no more requests are made during this run')
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Full jitter: a random delay between zero and the exponentially growing cap.
+        """
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> float:
+        """
+        Parses a Retry-After header given either in seconds or as an HTTP date. Long waits are capped to RETRY_AFTER_MAX.
+        """
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0), RETRY_AFTER_MAX)
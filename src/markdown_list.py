@@ -1,9 +1,29 @@
 import os
-from typing import List
 from pathlib import Path
-from copy import deepcopy
+from typing import Iterable, List, NamedTuple, Tuple
 from src.constants import *
-from src.solved_problem import SolvedProblem, ProblemStatus
+from src.solved_problem import SolvedProblem, ProblemStatus, Difficulty
+
+
+class ProblemRow(NamedTuple):
+    """
+    Read-only view of the SolvedProblem metadata shown in README.md. Codes of the SolvedProblem are not referenced.
+    """
+    name: str
+    problem_link: str
+    difficulty: Difficulty
+    solutions: Tuple[Tuple[str, str], ...]
+    sort_key: int
+
+    @classmethod
+    def from_solved_problem(cls, solved_problem: SolvedProblem) -> 'ProblemRow':
+        return cls(
+            name=solved_problem.name,
+            problem_link=solved_problem.problem_link,
+            difficulty=solved_problem.difficulty,
+            solutions=tuple(solved_problem.filename_language_dict.items()),
+            sort_key=int(solved_problem.difficulty if solved_problem.difficulty is not None else Difficulty.UNKNOWN)
+        )
 
 
 class MarkdownList:
@@ -12,15 +32,16 @@ class MarkdownList:
 
     Parameters:
     - directory: A Path object pointing to the location where the README.md file should be created.
-    - solved_problems: A list of SolvedProblem objects. The list is created based on these.
+    - solved_problems: A list or ProblemRegistry of SolvedProblem objects. The list is created based on these.
     """
-    def __init__(self, directory: Path, solved_problems: List[SolvedProblem]) -> None:
+    def __init__(self, directory: Path, solved_problems: Iterable[SolvedProblem]) -> None:
         self.__filepath = directory / 'README.md'
-        self.__solved_problems = deepcopy(solved_problems)
-        self.__trim_solved_problems()
+        self.__solved_problems = [
+            ProblemRow.from_solved_problem(sp) for sp in solved_problems if sp.status != ProblemStatus.CODE_NOT_FOUND
+        ]
 
     @property
-    def solved_problems(self) -> List[SolvedProblem]:
+    def solved_problems(self) -> List[ProblemRow]:
         return self.__solved_problems
 
     @property
@@ -42,11 +63,6 @@ class MarkdownList:
     def filename(self) -> Path:
         return 'README.md'
 
-    def __trim_solved_problems(self):
-        self.__solved_problems = [
-            sp for sp in self.__solved_problems if sp.status != ProblemStatus.CODE_NOT_FOUND
-        ]
-
     def _load_existing_README_contents(self) -> None:
         """
         Loads the contents of a README.md which might already exist.
@@ -64,7 +80,8 @@ class MarkdownList:
 
     def __parse_loaded_README(self, contents: List[str]) -> List[str]:
         try:
-            new_contents = contents[:contents.index(README_LIST_TITLE)]
+            list_start = contents.index(README_LIST_TITLE)
+            new_contents = contents[:list_start]
         except ValueError:
             new_contents = contents + ['\n']
         new_contents += [README_LIST_TITLE, KTG_AD, SEPARATOR, README_NUM_SOLVED(len(self.__solved_problems)), README_LIST_COLUMN_TITLES, README_LIST_POSITIONING]
@@ -78,8 +95,7 @@ class MarkdownList:
         Returns:
         - None
         """
-        order = ['Hard', 'Medium', 'Easy']
-        self.__solved_problems.sort(key=lambda sp: order.index(sp.difficulty))
+        self.__solved_problems.sort(key=lambda row: row.sort_key)
 
     def _create_solved_problem_list(self) -> List[str]:
         """
@@ -89,13 +105,13 @@ class MarkdownList:
         Returns:
         - List[str]: Markdown list of SolvedProblems
         """
-        return [
-            f'|[{sp.name}]({sp.problem_link})|{sp.difficulty}|' + self.__create_solutions_tab_content_for_solved_problem(sp) + '\n' \
-            for sp in self.__solved_problems
-        ]
+        rows = []
+        for row in self.__solved_problems:
+            rows += [f'|[{row.name}]({row.problem_link})|{row.difficulty}|' + self.__create_solutions_tab_content_for_solved_problem(row) + '\n']
+        return rows
 
-    def __create_solutions_tab_content_for_solved_problem(self, solved_problem: SolvedProblem) -> str:
-        return ', '.join([f'[{language}](Solutions/{filename})' for filename, language in solved_problem.filename_language_dict.items()])
+    def __create_solutions_tab_content_for_solved_problem(self, row: ProblemRow) -> str:
+        return ', '.join([f'[{language}](Solutions/{filename})' for filename, language in row.solutions])
 
     def _save_contents_to_README(self, contents: List[str]) -> None:
         """
@@ -112,7 +128,7 @@ class MarkdownList:
 
     def create(self) -> None:
         """
-        Creates and saves the README.md made by KattisToGithub
+        Creates the README.md made by KattisToGithub. The file is only written if its contents changed.
 
         Returns:
         - None
@@ -120,4 +136,5 @@ class MarkdownList:
         self._load_existing_README_contents()
         self._sort_solved_problems_by_difficulty()
         self.__new_contents += self._create_solved_problem_list()
-        self._save_contents_to_README(self.__new_contents)
+        if self.should_add_and_commit:
+            self._save_contents_to_README(self.__new_contents)
@@ -0,0 +1,99 @@
+from pathlib import Path
+from argparse import Namespace
+from collections import Counter
+from typing import List, Set, Tuple
+from src.csv_handler import CsvHandler
+from src.sqlite_state import SqliteStateStore
+from src.markdown_list import MarkdownList
+from src.progress_journal import ProgressJournal
+from src.problem_registry import ProblemRegistry
+from src.solved_problem import SolvedProblem, ProblemStatus
+
+
+def run_offline_command(arguments: Namespace, directory: Path) -> bool:
+    """
+    Runs one of the OFFLINE_COMMANDS parsed by src/argument_parser.parse_offline_arguments.
+    The commands only read the saved state of the directory, and never connect to Kattis.
+
+    Parameters:
+    - arguments: The parsed command and its options.
+    - directory: Path of the repository.
+
+    Returns:
+    - bool: True if the command succeeded; False otherwise
+    """
+    registry, unfinished_links = _load_state(directory, arguments.state, pending_only=arguments.command == 'pending')
+    if registry is None:
+        print(f'#: No solved problems have been saved to {directory} yet')
+        return False
+    if arguments.command == 'readme':
+        return regenerate_readme(directory, registry)
+    if arguments.command == 'status':
+        return print_status(registry, unfinished_links)
+    return print_pending(registry, unfinished_links)
+
+
+def _load_state(directory: Path, state_backend: str, pending_only: bool = False) -> Tuple[ProblemRegistry, Set[str]]:
+    """
+    Loads the saved SolvedProblems, including the progress an interrupted run left in the journal. Nothing is written back:
+    status.db is opened read-only, and status.csv is read while no status.db has been created from it.
+
+    Parameters:
+    - directory: Path of the repository.
+    - state_backend: csv or sqlite, see --state.
+    - pending_only: If True, only the SolvedProblems without code are read from status.db, through its status index.
+
+    Returns:
+    - Tuple[ProblemRegistry, Set[str]]: The SolvedProblems, None if none have been saved, and the submissions links of problems left unfinished
+    """
+    if state_backend == 'sqlite' and (directory / 'status.db').exists():
+        state_store = SqliteStateStore(directory, read_only=True)
+        try:
+            if state_store.count() == 0:
+                return None, set()
+            registry = ProblemRegistry(state_store.pending_solved_problems()) if pending_only else state_store.load_registry()
+        finally:
+            state_store.close()
+    else:
+        registry = CsvHandler(directory).load_registry()
+        if len(registry) == 0:
+            return None, set()
+    return registry, ProgressJournal(directory).replay(registry)
+
+
+def regenerate_readme(directory: Path, registry: ProblemRegistry) -> bool:
+    md_list = MarkdownList(directory=directory, solved_problems=registry)
+    md_list.create()
+    print(f'#: {md_list.filename} was updated' if md_list.should_add_and_commit else f'#: {md_list.filename} is already up to date')
+    return True
+
+
+def print_status(registry: ProblemRegistry, unfinished_links: Set[str]) -> bool:
+    solved_problems = registry.solved_problems
+    statuses = Counter(sp.status for sp in solved_problems)
+    difficulties = Counter(sp.difficulty for sp in solved_problems)
+    languages = Counter(language for sp in solved_problems for language in sp.filename_language_dict.values())
+    print(f'#: {len(solved_problems)} solved problems')
+    for status in ProblemStatus:
+        print(f'#:   {status.name}: {statuses[status]}')
+    print('#: By difficulty: ' + ', '.join(f'{difficulty} {count}' for difficulty, count in difficulties.most_common()))
+    print('#: Solutions by language: ' + ', '.join(f'{language} {count}' for language, count in languages.most_common()))
+    if len(unfinished_links) > 0:
+        print(f'#: {len(unfinished_links)} solved problems were left unfinished by an interrupted run')
+    return True
+
+
+def print_pending(registry: ProblemRegistry, unfinished_links: Set[str]) -> bool:
+    pending = _get_pending_solved_problems(registry, unfinished_links)
+    print(f'#: {len(pending)} solved problems are waiting for their code to be downloaded')
+    for sp in pending:
+        state = 'UNFINISHED' if sp.submissions_link in unfinished_links else sp.status.name
+        print(f'{sp.name} ({state}) {sp.problem_link}')
+    return True
+
+
+def _get_pending_solved_problems(registry: ProblemRegistry, unfinished_links: Set[str]) -> List[SolvedProblem]:
+    return sorted(
+        (sp for sp in registry if sp.status != ProblemStatus.CODE_FOUND or sp.submissions_link in unfinished_links),
+        key=lambda sp: sp.name
+    )
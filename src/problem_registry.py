@@ -0,0 +1,62 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.solved_problem import SolvedProblem
+
+
+class ProblemRegistry:
+    """
+    ProblemRegistry holds SolvedProblems in insertion order and indexes them by submissions link and problem slug,
+    so that looking up or merging a SolvedProblem takes constant time.
+
+    Parameters:
+    - solved_problems: SolvedProblems the registry is created with. Later duplicates are merged into earlier ones.
+    """
+    def __init__(self, solved_problems: Iterable[SolvedProblem] = ()) -> None:
+        self.__solved_problems: List[SolvedProblem] = []
+        self.__by_submissions_link: Dict[str, SolvedProblem] = {}
+        self.__by_slug: Dict[str, SolvedProblem] = {}
+        for solved_problem in solved_problems:
+            self.upsert(solved_problem)
+
+    @property
+    def solved_problems(self) -> List[SolvedProblem]:
+        """
+        The registered SolvedProblems. The list may be reordered, but SolvedProblems must be added with upsert.
+        """
+        return self.__solved_problems
+
+    def __len__(self) -> int:
+        return len(self.__solved_problems)
+
+    def __iter__(self) -> Iterator[SolvedProblem]:
+        return iter(self.__solved_problems)
+
+    def __contains__(self, submissions_link: str) -> bool:
+        return submissions_link in self.__by_submissions_link
+
+    def get(self, submissions_link: str) -> Optional[SolvedProblem]:
+        return self.__by_submissions_link.get(submissions_link)
+
+    def get_by_slug(self, slug: str) -> Optional[SolvedProblem]:
+        return self.__by_slug.get(slug)
+
+    def upsert(self, solved_problem: SolvedProblem) -> bool:
+        """
+        Adds a SolvedProblem, or merges the scraped points and difficulty of an already registered one into it.
+
+        Parameters:
+        - solved_problem: The SolvedProblem to add or merge.
+
+        Returns:
+        - bool: True if the SolvedProblem was new or its points or difficulty changed; False otherwise
+        """
+        known = self.__by_submissions_link.get(solved_problem.submissions_link)
+        if known is None:
+            self.__solved_problems += [solved_problem]
+            self.__by_submissions_link[solved_problem.submissions_link] = solved_problem
+            if solved_problem.slug is not None:
+                self.__by_slug[solved_problem.slug] = solved_problem
+            return True
+        if known.points == solved_problem.points and known.difficulty == solved_problem.difficulty:
+            return False
+        known.points, known.difficulty = solved_problem.points, solved_problem.difficulty
+        return True
@@ -0,0 +1,146 @@
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Set
+from src.problem_registry import ProblemRegistry
+from src.gitignore import add_to_gitignore
+from src.solved_problem import SolvedProblem, ProblemStatus, intern_language
+
+
+class ProgressJournal:
+    """
+    ProgressJournal appends the state of SolvedProblems to <directory>/status.journal while codes are being downloaded.
+    If a run is interrupted before the state is saved, the next run replays the journal and continues where the previous run stopped.
+
+    Parameters:
+    - directory: A Path object pointing to the location where status.csv is stored.
+    """
+    def __init__(self, directory: Path) -> None:
+        self.__filepath = directory / 'status.journal'
+        self.__lock = threading.Lock()
+        self.__file = None
+        self.__records_since_compaction = 0
+
+    @property
+    def records_since_compaction(self) -> int:
+        return self.__records_since_compaction
+
+    @property
+    def should_add_to_gitignore(self) -> bool:
+        """
+        Adds status.journal and the temporary file used while compacting it to .gitignore. If .gitignore does not exists, it will be created.
+
+        Returns:
+        - bool: True if .gitignore was updated; False otherwise
+        """
+        return add_to_gitignore(self.__filepath.parent, 'status.journal*')
+
+    def record(self, solved_problem: SolvedProblem, finished: bool) -> None:
+        """
+        Appends the current state of a SolvedProblem to the journal and flushes it to disk.
+
+        Parameters:
+        - solved_problem: The SolvedProblem to record.
+        - finished: True once all codes of the SolvedProblem have been downloaded during this run.
+        """
+        line = self.__to_line(solved_problem, finished)
+        with self.__lock:
+            if self.__file is None:
+                self.__file = open(self.__filepath, 'a', encoding='utf-8')
+            self.__file.write(line)
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+            self.__records_since_compaction += 1
+
+    def __to_line(self, solved_problem: SolvedProblem, finished: bool) -> str:
+        return json.dumps({
+            'submissions_link': solved_problem.submissions_link,
+            'problem_link': solved_problem.problem_link,
+            'name': solved_problem.name,
+            'points': solved_problem.points,
+            'difficulty': str(solved_problem.difficulty) if solved_problem.difficulty is not None else None,
+            'status': int(solved_problem.status),
+            'last_submission_id': solved_problem.last_submission_id,
+            'filename_language_dict': solved_problem.filename_language_dict,
+            'filename_hash_dict': solved_problem.filename_hash_dict,
+            'changed_filenames': solved_problem.changed_filenames,
+            'finished': finished
+        }) + '\n'
+
+    def compact(self, pending_solved_problems: Iterable[SolvedProblem]) -> None:
+        """
+        Replaces the journal with one finished record per given SolvedProblem. Called once the rest of the journal
+        has been saved into the state file. The new journal is written with one fsync and swapped in atomically.
+
+        Parameters:
+        - pending_solved_problems: SolvedProblems whose state is not fully saved yet, e.g. ones with uncommitted files.
+        """
+        lines = ''.join(self.__to_line(solved_problem, finished=True) for solved_problem in pending_solved_problems)
+        tmp_filepath = self.__filepath.with_name(f'{self.__filepath.name}.tmp')
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+            with open(tmp_filepath, 'w', encoding='utf-8') as file:
+                file.write(lines)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_filepath, self.__filepath)
+            self.__records_since_compaction = 0
+
+    def replay(self, registry: ProblemRegistry) -> Set[str]:
+        """
+        Applies the journal left behind by an interrupted run to the given registry.
+        A truncated last line, written while the run was interrupted, is ignored.
+
+        Parameters:
+        - registry: The registry loaded from the state file. Updated inside this function.
+
+        Returns:
+        - Set[str]: Submissions links of the SolvedProblems which were not finished
+        """
+        if not self.__filepath.exists():
+            return set()
+        records: Dict[str, Dict] = {}
+        with open(self.__filepath, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                records[record['submissions_link']] = record
+        if len(records) > 0:
+            print(f'#: Resuming an interrupted run, {len(records)} solved problems were restored from status.journal')
+        for record in records.values():
+            self.__apply(registry, record)
+        return {link for link, record in records.items() if not record['finished']}
+
+    def __apply(self, registry: ProblemRegistry, record: Dict) -> None:
+        solved_problem = registry.get(record['submissions_link'])
+        if solved_problem is None:
+            solved_problem = SolvedProblem(
+                problem_link=record['problem_link'], submissions_link=record['submissions_link'],
+                name=record['name'], points=record['points'], difficulty=record['difficulty']
+            )
+            registry.upsert(solved_problem)
+        solved_problem.status = ProblemStatus(record['status'])
+        solved_problem.last_submission_id = record['last_submission_id']
+        for filename, language in record['filename_language_dict'].items():
+            solved_problem.filename_language_dict[filename] = intern_language(language)
+        solved_problem.filename_hash_dict.update(record['filename_hash_dict'])
+        for filename in record['changed_filenames']:
+            if filename not in solved_problem.changed_filenames:
+                solved_problem.changed_filenames += [filename]
+
+    def clear(self) -> None:
+        """
+        Removes the journal. Called once its contents have been compacted into the state file.
+        """
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+            if self.__filepath.exists():
+                os.remove(self.__filepath)
+            self.__records_since_compaction = 0
@@ -0,0 +1,33 @@
+import time
+import threading
+from typing import Callable
+
+
+class RateLimiter:
+    """
+    RateLimiter spaces out requests made from any number of threads, so that at most requests_per_second are started per second.
+
+    Parameters:
+    - requests_per_second: Maximum rate of requests.
+    - sleep: Function used for waiting.
+    - clock: Monotonic clock returning seconds.
+    """
+    def __init__(self, requests_per_second: float, sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic) -> None:
+        if requests_per_second <= 0:
+            raise ValueError('requests_per_second must be positive')
+        self.__interval = 1 / requests_per_second
+        self.__sleep = sleep
+        self.__clock = clock
+        self.__next_slot = 0.0
+        self.__lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Reserves the next free slot and waits until it starts.
+        """
+        with self.__lock:
+            now = self.__clock()
+            slot = max(now, self.__next_slot)
+            self.__next_slot = slot + self.__interval
+        if slot > now:
+            self.__sleep(slot - now)
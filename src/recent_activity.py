@@ -0,0 +1,70 @@
+from typing import Dict, List
+from src.problem_registry import ProblemRegistry
+from src.solved_problem import SolvedProblem
+
+
+class RecentActivity:
+    """
+    RecentActivity follows the rows of the problems tab sorted by most recent activity, to tell which SolvedProblems had
+    new activity since the last run. Each SolvedProblem remembers its row, i.e. the runtime, date, language and points shown for it,
+    and its rank in the order of activity. A SolvedProblem had new activity if it is new, if its row changed or if it moved
+    ahead of a SolvedProblem which was ahead of it on the last run. SolvedProblems pushed down by active ones keep their rows
+    and their order among each other, so they are not re-checked. Their ranks are kept too: the SolvedProblems which moved ahead
+    are ranked before all others, so a run only changes the state of the SolvedProblems with new activity.
+
+    Parameters:
+    - registry: The ProblemRegistry of the run, into which the SolvedProblems of the rows are upserted.
+    """
+    def __init__(self, registry: ProblemRegistry) -> None:
+        self.__registry = registry
+        self.__ranked = sorted((sp for sp in registry if sp.activity_rank is not None), key=lambda sp: sp.activity_rank)
+        self.__next_ranked = 0
+        self.__observed: Dict[str, SolvedProblem] = {}
+        self.__moved_ahead: Dict[str, SolvedProblem] = {}
+        self.__changed: Dict[str, SolvedProblem] = {}
+
+    def observe(self, solved_problem: SolvedProblem, unrecorded_is_active: bool = False) -> bool:
+        """
+        Upserts the SolvedProblem of the next row of the tab and records its row.
+
+        Parameters:
+        - solved_problem: The SolvedProblem parsed from the row.
+        - unrecorded_is_active: If True, a known SolvedProblem whose row was never recorded counts as active.
+
+        Returns:
+        - bool: True if the SolvedProblem had new activity; False otherwise
+        """
+        link = solved_problem.submissions_link
+        known = self.__registry.get(link)
+        self.__registry.upsert(solved_problem)
+        if known is None:
+            self.__observed[link] = self.__moved_ahead[link] = self.__changed[link] = solved_problem
+            return True
+        self.__observed[link] = known
+        if known.activity_rank is None or known.activity_rank > self.__lowest_unobserved_rank():
+            self.__moved_ahead[link] = self.__changed[link] = known
+        if known.activity == solved_problem.activity:
+            return link in self.__moved_ahead and known.activity_rank is not None
+        self.__changed[link] = known
+        unrecorded = known.activity is None
+        known.activity = solved_problem.activity
+        return unrecorded_is_active if unrecorded else True
+
+    def __lowest_unobserved_rank(self) -> float:
+        while self.__next_ranked < len(self.__ranked) and self.__ranked[self.__next_ranked].submissions_link in self.__observed:
+            self.__next_ranked += 1
+        if self.__next_ranked == len(self.__ranked):
+            return float('inf')
+        return self.__ranked[self.__next_ranked].activity_rank
+
+    def finish(self) -> List[SolvedProblem]:
+        """
+        Ranks the SolvedProblems which moved ahead, in the order of their rows, before all other SolvedProblems.
+
+        Returns:
+        - List[SolvedProblem]: The SolvedProblems whose recorded row or rank changed
+        """
+        first_rank = min((sp.activity_rank for sp in self.__ranked), default=0) - len(self.__moved_ahead)
+        for rank, solved_problem in enumerate(self.__moved_ahead.values(), start=first_rank):
+            solved_problem.activity_rank = rank
+        return list(self.__changed.values())
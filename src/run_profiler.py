@@ -0,0 +1,184 @@
+import sys
+import json
+import time
+import cProfile
+import pstats
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Dict, Generator, List
+
+# Before Python 3.12 a cProfile.Profile only sees the thread which enabled it. Since 3.12 it uses sys.monitoring,
+# which sees every thread but allows only one active profiler per process.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class RunProfiler:
+    """
+    RunProfiler measures where the time of a run is spent.
+    Phases are timed in wall and CPU time, and the requests and bytes received during each phase are counted.
+    Bytes are counted both as decoded and as transferred, before decompression, which shows what compression saves.
+    Timers, such as parsing and file writing, sum up the time spent in them across all worker threads.
+    Optionally every thread is also profiled with cProfile, and the combined statistics are dumped next to the report.
+    Before Python 3.12 each worker thread gets a profiler of its own, since 3.12 the profiler of the main thread sees them all.
+
+    Parameters:
+    - cprofile: If True, cProfile statistics are collected.
+    """
+    def __init__(self, cprofile: bool = False) -> None:
+        self.__lock = threading.Lock()
+        self.__started_wall = time.perf_counter()
+        self.__started_cpu = time.process_time()
+        self.__phases: Dict[str, Dict[str, float]] = {}
+        self.__timers: Dict[str, Dict[str, float]] = {}
+        self.__requests = 0
+        self.__bytes_received = 0
+        self.__bytes_transferred = 0
+        self.__request_time = 0.0
+        self.__failed_requests = 0
+        self.cprofile = cprofile
+        self.__profiles: List[cProfile.Profile] = []
+        self.__thread_profiles = threading.local()
+
+    @property
+    def requests(self) -> int:
+        return self.__requests
+
+    @property
+    def bytes_received(self) -> int:
+        return self.__bytes_received
+
+    @property
+    def bytes_transferred(self) -> int:
+        return self.__bytes_transferred
+
+    def count_request(self, bytes_received: int, failed: bool = False, bytes_transferred: int = None, elapsed: float = 0.0) -> None:
+        """
+        Counts a request.
+
+        Parameters:
+        - bytes_received: Size of the decoded response body.
+        - failed: True if the request did not succeed.
+        - bytes_transferred: Size of the body as transferred, before decompression; bytes_received if not known.
+        - elapsed: Seconds the request took.
+        """
+        with self.__lock:
+            self.__requests += 1
+            self.__bytes_received += bytes_received
+            self.__bytes_transferred += bytes_transferred if bytes_transferred is not None else bytes_received
+            self.__request_time += elapsed
+            self.__failed_requests += failed
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        """
+        Times a phase of the run. A phase entered more than once accumulates its measurements.
+        """
+        wall, cpu, requests = time.perf_counter(), time.process_time(), self.__requests
+        bytes_received, bytes_transferred = self.__bytes_received, self.__bytes_transferred
+        try:
+            with self.__profiled():
+                yield
+        finally:
+            phase = self.__phases.setdefault(name, {'wall_time': 0.0, 'cpu_time': 0.0, 'requests': 0, 'bytes_received': 0, 'bytes_transferred': 0})
+            phase['wall_time'] += time.perf_counter() - wall
+            phase['cpu_time'] += time.process_time() - cpu
+            phase['requests'] += self.__requests - requests
+            phase['bytes_received'] += self.__bytes_received - bytes_received
+            phase['bytes_transferred'] += self.__bytes_transferred - bytes_transferred
+
+    @contextmanager
+    def timer(self, name: str) -> Generator[None, None, None]:
+        """
+        Adds the time spent inside the block to the timer called name. Safe to use from worker threads.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.__lock:
+                timer = self.__timers.setdefault(name, {'time': 0.0, 'count': 0})
+                timer['time'] += elapsed
+                timer['count'] += 1
+
+    def profiled(self, function: Callable) -> Callable:
+        """
+        Wraps a function run by a worker thread, so that cProfile also sees the worker threads.
+        Not needed since Python 3.12, where a second active profiler would raise a ValueError.
+        """
+        if not self.cprofile or not PER_THREAD_PROFILES:
+            return function
+        def wrapper(*args, **kwargs):
+            with self.__profiled():
+                return function(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def __profiled(self) -> Generator[None, None, None]:
+        if not self.cprofile or getattr(self.__thread_profiles, 'active', False):
+            yield
+            return
+        profile = getattr(self.__thread_profiles, 'profile', None)
+        if profile is None:
+            profile = self.__thread_profiles.profile = cProfile.Profile()
+            with self.__lock:
+                self.__profiles += [profile]
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Since Python 3.12 only one profiler can be active, e.g. not one for each account of a batch run at once
+            print(f'#: Not profiling with cProfile: {e}')
+            yield
+            return
+        self.__thread_profiles.active = True
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.__thread_profiles.active = False
+
+    def report(self) -> Dict:
+        """
+        Returns the measurements of the run so far.
+        """
+        return {
+            'wall_time': round(time.perf_counter() - self.__started_wall, 3),
+            'cpu_time': round(time.process_time() - self.__started_cpu, 3),
+            'requests': self.__requests,
+            'failed_requests': self.__failed_requests,
+            'bytes_received': self.__bytes_received,
+            'bytes_transferred': self.__bytes_transferred,
+            'request_time': round(self.__request_time, 3),
+            'phases': {
+                name: {key: round(value, 3) if isinstance(value, float) else value for key, value in phase.items()}
+                for name, phase in self.__phases.items()
+            },
+            'timers': {name: {'time': round(timer['time'], 3), 'count': timer['count']} for name, timer in self.__timers.items()}
+        }
+
+    def summary(self) -> str:
+        """
+        Returns a line summarizing the requests of the run: the bytes received, how much of them compression saved,
+        and the average time of a request, which shows the latency saved by reusing connections.
+        """
+        saved = 1 - self.__bytes_transferred / self.__bytes_received if self.__bytes_received > 0 else 0
+        latency = self.__request_time / self.__requests if self.__requests > 0 else 0
+        return (
+            f'{self.__requests} requests, {self.__bytes_received / 2 ** 20:.1f} MB received as {self.__bytes_transferred / 2 ** 20:.1f} MB '
+            f'({saved:.0%} saved by compression), {latency * 1000:.0f} ms per request'
+        )
+
+    def write(self, filepath: Path) -> None:
+        """
+        Writes the report as JSON to filepath. With cProfile enabled, the statistics are dumped to filepath with the suffix .prof.
+        """
+        with open(filepath, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+        print(f'#: Wrote the profile report to {filepath}')
+        if self.cprofile and len(self.__profiles) > 0:
+            stats = pstats.Stats(self.__profiles[0])
+            for profile in self.__profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(filepath.with_suffix('.prof'))
+            print(f'#: Wrote the cProfile statistics to {filepath.with_suffix(".prof")}')
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import os
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from src.constants import SESSION_FILE
+from src.gitignore import add_to_gitignore
+
+if TYPE_CHECKING:
+    from requests import Session
+
+
+class SessionStore:
+    """
+    SessionStore saves the cookies of a logged in session to <directory>/.ktg_session, readable only by the current user,
+    so that later runs can skip logging in while the session is still valid.
+
+    Parameters:
+    - directory: A Path object pointing to the repository.
+    """
+    def __init__(self, directory: Path) -> None:
+        self.__filepath = directory / SESSION_FILE
+
+    @property
+    def should_add_to_gitignore(self) -> bool:
+        """
+        Adds .ktg_session to .gitignore. If .gitignore does not exists, it will be created.
+
+        Returns:
+        - bool: True if .gitignore was updated; False otherwise
+        """
+        return add_to_gitignore(self.__filepath.parent, SESSION_FILE)
+
+    def load(self, session: Session, user: str) -> bool:
+        """
+        Restores the saved cookies of the given user into the session. Expired cookies are left out.
+
+        Returns:
+        - bool: True if cookies were restored; False otherwise
+        """
+        try:
+            with open(self.__filepath, 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if saved.get('user') != user:
+            return False
+        now = time.time()
+        cookies = [cookie for cookie in saved.get('cookies', []) if cookie['expires'] is None or cookie['expires'] > now]
+        for cookie in cookies:
+            session.cookies.set(
+                cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'],
+                expires=cookie['expires'], secure=cookie['secure']
+            )
+        return len(cookies) > 0
+
+    def save(self, session: Session, user: str) -> None:
+        """
+        Writes the cookies of the session to .ktg_session with the permissions 0600.
+        """
+        cookies = [{
+            'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+            'expires': cookie.expires, 'secure': cookie.secure
+        } for cookie in session.cookies]
+        tmp_filepath = self.__filepath.with_name(f'{SESSION_FILE}.{os.getpid()}.tmp')
+        fd = os.open(tmp_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump({'user': user, 'cookies': cookies}, file)
+        os.replace(tmp_filepath, self.__filepath)
+
+    def clear(self) -> None:
+        if self.__filepath.exists():
+            os.remove(self.__filepath)
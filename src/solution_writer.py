@@ -0,0 +1,75 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import List
+from src.solved_problem import SolvedProblem
+
+
+class SolutionWriter:
+    """
+    SolutionWriter saves downloaded codes into the Solutions folder.
+    A file is only written if its content hash differs from the one stored for it, and writes are atomic (temp file + rename),
+    so an interrupted run never leaves a half written solution behind.
+
+    Parameters:
+    - directory: A Path object pointing to the repository, which contains the Solutions folder.
+    - state_lock: Lock held while the hashes and changed files of a SolvedProblem are updated. Files are written without it.
+    """
+    def __init__(self, directory: Path, state_lock: threading.Lock = None) -> None:
+        self.__solutions_dir = directory / 'Solutions'
+        self.__changed_paths: List[str] = []
+        self.__lock = threading.Lock()
+        self.__state_lock = state_lock if state_lock is not None else threading.Lock()
+
+    @property
+    def changed_paths(self) -> List[str]:
+        """
+        Paths, relative to the repository, of the files which were actually written during this run.
+        """
+        return list(self.__changed_paths)
+
+    @staticmethod
+    def content_hash(code: str) -> str:
+        return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+    def write(self, solved_problem: SolvedProblem, filename: str, code: str) -> bool:
+        """
+        Writes a code of a SolvedProblem, unless the file already has the same contents.
+        The new content hash is stored to the SolvedProblem and the filename is added to its changed_filenames.
+
+        Parameters:
+        - solved_problem: The SolvedProblem the code belongs to.
+        - filename: Name of the file inside the Solutions folder.
+        - code: The code to write.
+
+        Returns:
+        - bool: True if the file was written; False if it was unchanged
+        """
+        content_hash = self.content_hash(code)
+        filepath = self.__solutions_dir / filename
+        if self.__is_unchanged(filepath, solved_problem.filename_hash_dict.get(filename), content_hash):
+            with self.__state_lock:
+                solved_problem.filename_hash_dict[filename] = content_hash
+            return False
+        tmp_filepath = filepath.with_name(f'.{filename}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_filepath, 'w', encoding='utf-8') as file:
+            file.write(code)
+        os.replace(tmp_filepath, filepath)
+        with self.__state_lock:
+            solved_problem.filename_hash_dict[filename] = content_hash
+            solved_problem.changed_filenames += [filename]
+        with self.__lock:
+            self.__changed_paths += [f'Solutions/{filename}']
+        return True
+
+    def __is_unchanged(self, filepath: Path, stored_hash: str, content_hash: str) -> bool:
+        """
+        Compares against the stored hash. Files written before hashes were stored are compared by reading them.
+        """
+        if not filepath.exists():
+            return False
+        if stored_hash is not None:
+            return stored_hash == content_hash
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as file:
+            return self.content_hash(file.read()) == content_hash
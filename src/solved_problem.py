@@ -1,5 +1,5 @@
-from typing import Dict
-from pathlib import Path
+import sys
+from typing import Dict, List, Union
 from enum import IntEnum
 from dataclasses import dataclass, field
 
@@ -10,26 +10,93 @@ class ProblemStatus(IntEnum):
     CODE_NOT_FOUND = -1
 
 
-@dataclass
+class Difficulty(IntEnum):
+    """
+    Difficulty class of a problem. The values are the order of README.md, hardest problems first.
+    Printed and stored in status.csv by name, e.g. Easy.
+    """
+    HARD = 0
+    MEDIUM = 1
+    EASY = 2
+    UNKNOWN = 3
+
+    def __str__(self) -> str:
+        return self.name.capitalize()
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+    @classmethod
+    def parse(cls, value: Union[str, 'Difficulty']) -> 'Difficulty':
+        """
+        Parses a difficulty such as Easy or easy. Of older values such as 1.2 Easy the last word is used.
+
+        Returns:
+        - Difficulty: The parsed Difficulty; UNKNOWN if the value is not recognized, None if value is None or empty
+        """
+        if value is None or isinstance(value, cls):
+            return value
+        words = value.split()
+        if len(words) == 0:
+            return None
+        return cls.__members__.get(words[-1].upper(), cls.UNKNOWN)
+
+
+def parse_points(value: Union[str, float]) -> float:
+    """
+    Returns:
+    - float: The points of a problem; None if value is None, empty or not a number
+    """
+    if value is None or isinstance(value, float):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def intern_language(language: str) -> str:
+    """
+    Languages repeat across every SolvedProblem, so each distinct name is kept in memory only once.
+    """
+    return sys.intern(language) if language is not None else None
+
+
+@dataclass(slots=True)
 class SolvedProblem:
     problem_link: str = None
     submissions_link: str = None
     name: str = None
-    points: str = None
-    difficulty: str = None
+    points: float = None
+    difficulty: Difficulty = None
     status: int = ProblemStatus.CODE_NOT_FOUND
-    filename_code_dict: Dict[str, str] = field(default_factory=dict)
+    last_submission_id: str = None
     filename_language_dict: Dict[str, str] = field(default_factory=dict)
+    filename_hash_dict: Dict[str, str] = field(default_factory=dict)
+    activity: str = None
+    activity_rank: int = None
+    changed_filenames: List[str] = field(default_factory=list, compare=False)
+
+    def __post_init__(self) -> None:
+        self.points = parse_points(self.points)
+        self.difficulty = Difficulty.parse(self.difficulty)
 
-    def write_to_file(self, directory: Path) -> None:
-        for filename in self.filename_code_dict:
-            with open(directory / 'Solutions' / filename, 'w') as file:
-                file.write(self.filename_code_dict[filename])
+    @property
+    def slug(self) -> str:
+        """
+        The problem's identifier on Kattis, i.e. the last part of its problem link.
+        """
+        if self.problem_link is None:
+            return None
+        return self.problem_link.rstrip('/').split('/')[-1]
 
     def to_dict(self) -> Dict:
         solutions = '#'.join(['|'.join([language, filename]) for filename, language in self.filename_language_dict.items()])
-        return {'Name': self.name, 'Difficulty': self.difficulty, 'Status': self.status.value,
-                'ProblemLink': self.problem_link, 'SubmissionsLink': self.submissions_link, 'Solutions': solutions
+        solution_hashes = '#'.join(['|'.join([filename, content_hash]) for filename, content_hash in self.filename_hash_dict.items()])
+        return {'Name': self.name, 'Difficulty': str(self.difficulty) if self.difficulty is not None else None, 'Status': self.status.value,
+                'ProblemLink': self.problem_link, 'SubmissionsLink': self.submissions_link, 'Solutions': solutions,
+                'Points': self.points, 'LastSubmissionId': self.last_submission_id,
+                'SolutionHashes': solution_hashes, 'Activity': self.activity, 'ActivityRank': self.activity_rank
         }
 
     def __repr__(self) -> str:
@@ -39,4 +106,4 @@ Link {self.submissions_link}
 Points {self.points}
 Difficulty {self.difficulty}
 Status {self.status._name_}
-{self.filename_code_dict}'''
+{self.filename_language_dict}'''
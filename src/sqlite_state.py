@@ -0,0 +1,243 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from src.csv_handler import CsvHandler
+from src.gitignore import add_to_gitignore
+from src.problem_registry import ProblemRegistry
+from src.solved_problem import SolvedProblem, ProblemStatus, intern_language
+
+PROBLEMS_COLUMNS = '''
+    submissions_link TEXT PRIMARY KEY,
+    slug TEXT,
+    name TEXT NOT NULL,
+    difficulty TEXT,
+    points TEXT,
+    status INTEGER NOT NULL,
+    problem_link TEXT NOT NULL,
+    last_submission_id TEXT,
+    activity TEXT,
+    activity_rank INTEGER
+'''
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS problems ({PROBLEMS_COLUMNS});
+CREATE INDEX IF NOT EXISTS problems_slug ON problems (slug);
+CREATE INDEX IF NOT EXISTS problems_status ON problems (status);
+CREATE TABLE IF NOT EXISTS solutions (
+    submissions_link TEXT NOT NULL REFERENCES problems (submissions_link) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    language TEXT NOT NULL,
+    content_hash TEXT,
+    PRIMARY KEY (submissions_link, filename)
+);
+'''
+
+
+class SqliteStateStore:
+    """
+    SqliteStateStore keeps the state of SolvedProblems in <directory>/status.db, as an alternative to status.csv.
+    The sync upserts SolvedProblems one by one as their state changes. save() writes only the SolvedProblems which changed since
+    they were loaded or last saved, and is used when migrating status.csv.
+    On first use an existing status.csv is migrated into the database. status.csv itself is left untouched.
+
+    Parameters:
+    - directory: A Path object pointing to the location where status.db file should be created.
+    - read_only: If True, an existing status.db is opened read-only, as it is. Nothing is created, upgraded or migrated.
+    """
+    def __init__(self, directory: Path, read_only: bool = False) -> None:
+        self.__filepath = directory / 'status.db'
+        self.__lock = threading.Lock()
+        self.__saved_rows: Dict[str, Tuple] = {}
+        if read_only:
+            self.__connection = sqlite3.connect(f'{self.__filepath.resolve().as_uri()}?mode=ro', uri=True, check_same_thread=False)
+            self.__connection.row_factory = sqlite3.Row
+            return
+        should_migrate = not self.__filepath.exists()
+        self.__connection = sqlite3.connect(self.__filepath, check_same_thread=False, isolation_level=None)
+        self.__connection.row_factory = sqlite3.Row
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.executescript(SCHEMA)
+        self.__upgrade_problems_table()
+        self.__connection.execute('PRAGMA foreign_keys=ON')
+        if should_migrate:
+            self.__migrate_from_csv(directory)
+
+    @property
+    def should_add_to_gitignore(self) -> bool:
+        """
+        Adds status.db and its WAL files to .gitignore. If .gitignore does not exists, it will be created.
+
+        Returns:
+        - bool: True if .gitignore was updated; False otherwise
+        """
+        return add_to_gitignore(self.__filepath.parent, 'status.db*')
+
+    def __upgrade_problems_table(self) -> None:
+        """
+        Rebuilds the problems table of a status.db created by an earlier version, whose columns differ from PROBLEMS_COLUMNS.
+        SQLite cannot change the constraints of a column, so the rows are copied into a new table. Runs before foreign keys
+        are turned on, so that dropping the old table keeps the solutions.
+        """
+        expected = [(line.split()[0], int('NOT NULL' in line)) for line in PROBLEMS_COLUMNS.strip().split(',\n')]
+        existing = [(row[1], row[3]) for row in self.__connection.execute('PRAGMA table_info(problems)')]
+        if existing == expected:
+            return
+        copied = ', '.join(name for name, _ in expected if name in dict(existing))
+        self.__connection.executescript(f'''
+            BEGIN;
+            CREATE TABLE problems_upgraded ({PROBLEMS_COLUMNS});
+            INSERT INTO problems_upgraded ({copied}) SELECT {copied} FROM problems;
+            DROP TABLE problems;
+            ALTER TABLE problems_upgraded RENAME TO problems;
+            {SCHEMA}
+            COMMIT;
+        ''')
+
+    def __migrate_from_csv(self, directory: Path) -> None:
+        if not (directory / 'status.csv').exists():
+            return
+        solved_problems = CsvHandler(directory).load_solved_problems()
+        print(f'#: Migrating {len(solved_problems)} solved problems from status.csv to status.db')
+        self.save(solved_problems)
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def load_solved_problems(self) -> List[SolvedProblem]:
+        return self.load_registry().solved_problems
+
+    def load_registry(self) -> ProblemRegistry:
+        """
+        Loads all SolvedProblems from status.db into a ProblemRegistry, ordered by name.
+
+        Returns:
+        - ProblemRegistry: Registry of the stored SolvedProblems
+        """
+        registry = ProblemRegistry(self.__query('SELECT * FROM problems ORDER BY name', all_problems=True))
+        for solved_problem in registry:
+            self.__saved_rows[solved_problem.submissions_link] = self.__to_row(solved_problem)
+        return registry
+
+    def pending_solved_problems(self) -> List[SolvedProblem]:
+        """
+        Returns the SolvedProblems whose status is not CODE_FOUND, using the status index.
+        """
+        pending = [int(status) for status in ProblemStatus if status != ProblemStatus.CODE_FOUND]
+        return self.__query(f'SELECT * FROM problems WHERE status IN ({", ".join("?" * len(pending))}) ORDER BY name', tuple(pending))
+
+    def count(self) -> int:
+        with self.__lock:
+            return self.__connection.execute('SELECT COUNT(*) FROM problems').fetchone()[0]
+
+    def get_by_slug(self, slug: str) -> SolvedProblem:
+        solved_problems = self.__query('SELECT * FROM problems WHERE slug = ?', (slug,))
+        return solved_problems[0] if solved_problems else None
+
+    def __query(self, sql: str, params: Tuple = (), all_problems: bool = False) -> List[SolvedProblem]:
+        """
+        Runs a query on the problems table and attaches the solutions of the returned problems.
+        Solutions are read in one scan if all problems are queried, otherwise per problem through the primary key.
+        """
+        with self.__lock:
+            problem_rows = self.__connection.execute(sql, params).fetchall()
+            if all_problems:
+                solution_rows = self.__connection.execute(
+                    'SELECT submissions_link, filename, language, content_hash FROM solutions ORDER BY rowid'
+                ).fetchall()
+            else:
+                solution_rows = [
+                    solution_row for row in problem_rows for solution_row in self.__connection.execute(
+                        'SELECT submissions_link, filename, language, content_hash FROM solutions WHERE submissions_link = ? ORDER BY rowid',
+                        (row[0],)
+                    ).fetchall()
+                ]
+        solutions: Dict[str, List[Tuple]] = {}
+        for submissions_link, filename, language, content_hash in solution_rows:
+            solutions.setdefault(submissions_link, []).append((filename, language, content_hash))
+        return [self.__from_row(row, solutions.get(row[0], [])) for row in problem_rows]
+
+    def __from_row(self, row: sqlite3.Row, solutions: List[Tuple]) -> SolvedProblem:
+        """
+        Columns are read by name, as a status.db opened read-only may have the columns of an earlier version.
+        """
+        columns = row.keys()
+        return SolvedProblem(
+            name=row['name'],
+            difficulty=row['difficulty'],
+            status=ProblemStatus(row['status']),
+            problem_link=row['problem_link'],
+            submissions_link=row['submissions_link'],
+            points=row['points'],
+            last_submission_id=row['last_submission_id'],
+            activity=row['activity'] if 'activity' in columns else None,
+            activity_rank=row['activity_rank'] if 'activity_rank' in columns else None,
+            filename_language_dict={filename: intern_language(language) for filename, language, _ in solutions},
+            filename_hash_dict={filename: content_hash for filename, _, content_hash in solutions if content_hash is not None}
+        )
+
+    def __to_row(self, solved_problem: SolvedProblem) -> Tuple:
+        return (
+            solved_problem.submissions_link, solved_problem.slug, solved_problem.name,
+            str(solved_problem.difficulty) if solved_problem.difficulty is not None else None,
+            solved_problem.points, int(solved_problem.status), solved_problem.problem_link, solved_problem.last_submission_id,
+            solved_problem.activity, solved_problem.activity_rank,
+            tuple(solved_problem.filename_language_dict.items()), tuple(solved_problem.filename_hash_dict.items())
+        )
+
+    def upsert(self, solved_problem: SolvedProblem) -> bool:
+        """
+        Inserts or updates a single SolvedProblem and its solutions in one transaction.
+
+        Returns:
+        - bool: True if the stored row changed; False if it was already up to date
+        """
+        row = self.__to_row(solved_problem)
+        if self.__saved_rows.get(solved_problem.submissions_link) == row:
+            return False
+        with self.__lock:
+            self.__connection.execute('BEGIN')
+            try:
+                self.__write_row(row, solved_problem)
+                self.__connection.execute('COMMIT')
+            except BaseException:
+                self.__connection.execute('ROLLBACK')
+                raise
+            self.__saved_rows[solved_problem.submissions_link] = row
+        return True
+
+    def __write_row(self, row: Tuple, solved_problem: SolvedProblem) -> None:
+        self.__connection.execute(
+            '''INSERT INTO problems VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (submissions_link) DO UPDATE SET slug = excluded.slug, name = excluded.name, difficulty = excluded.difficulty,
+            points = excluded.points, status = excluded.status, problem_link = excluded.problem_link,
+            last_submission_id = excluded.last_submission_id, activity = excluded.activity, activity_rank = excluded.activity_rank''',
+            row[:10]
+        )
+        self.__connection.execute('DELETE FROM solutions WHERE submissions_link = ?', (solved_problem.submissions_link,))
+        self.__connection.executemany(
+            'INSERT INTO solutions VALUES (?, ?, ?, ?)',
+            [
+                (solved_problem.submissions_link, filename, language, solved_problem.filename_hash_dict.get(filename))
+                for filename, language in solved_problem.filename_language_dict.items()
+            ]
+        )
+
+    def save(self, solved_problems: Iterable[SolvedProblem]) -> None:
+        """
+        Saves the SolvedProblems which changed since they were loaded or last saved, in a single transaction.
+        """
+        changed = [(self.__to_row(sp), sp) for sp in solved_problems]
+        changed = [(row, sp) for row, sp in changed if self.__saved_rows.get(sp.submissions_link) != row]
+        if len(changed) == 0:
+            return
+        with self.__lock:
+            self.__connection.execute('BEGIN')
+            try:
+                for row, solved_problem in changed:
+                    self.__write_row(row, solved_problem)
+                self.__connection.execute('COMMIT')
+            except BaseException:
+                self.__connection.execute('ROLLBACK')
+                raise
+            for row, solved_problem in changed:
+                self.__saved_rows[solved_problem.submissions_link] = row
@@ -1,14 +1,20 @@
+import io
 import os
 import re
 import csv
 from pathlib import Path
 from typing import List
 import unittest
+import shutil
 import subprocess
 from unittest import TestCase, mock
+from contextlib import redirect_stdout
 from bs4 import BeautifulSoup as Soup
 from src.constants import *
-from src.solved_problem import SolvedProblem, ProblemStatus
+from src.solved_problem import SolvedProblem, ProblemStatus, Difficulty
+from src.http_cache import HttpCache
+from src.progress_journal import ProgressJournal
+from src.http_client import FetchError
 from KattisToGithub import KattisToGithub
 
 CSRF_TOKEN = '12345'
@@ -53,33 +59,35 @@ class MockSoup:
 
     @property
     def contents(self) -> List:
-        return [MockSoup.SolvedProblemTr(), None, None, None, MockSoup.SolvedProblemTr()]
+        return [
+            MockSoup.SolvedProblemTr(), MockSoup.SolvedProblemTr('0.01 s'), MockSoup.SolvedProblemTr('2024-01-01'),
+            MockSoup.SolvedProblemTr('Python 3'), MockSoup.SolvedProblemTr('3.0')
+        ]
 
     def find_all(*args, **kwargs) -> List:
         return [MockSoup.NextPageHref(page_num=i) for i in range(1, 4)]
 
 
 class MockSubprocess:
-    def __init__(self, path: Path):
-        self.ctr = 0
+    """
+    Records the git add and commit calls. git diff lists the paths staged by the recorded git add calls.
+    """
+    def __init__(self, path: Path, returncode: int = 0):
+        self.calls = []
+        self.staged = []
         self.path = path
+        self.returncode = returncode
 
-    def Popen(self, *args, **kwargs):
+    def run(self, *args, **kwargs):
         args = args[0]
         assert Path(kwargs['cwd']) == self.path
-        assert kwargs['stdout'] == subprocess.DEVNULL
+        assert kwargs['capture_output'] is True
+        if args[1] == 'diff':
+            return subprocess.CompletedProcess(args, 0, stdout='\0'.join(self.staged + ['']), stderr='')
+        self.calls += [(args[1], args[3] if args[1] == 'commit' else None, kwargs['input'].split('\0'))]
         if args[1] == 'add':
-            assert args[2] == 'Solutions/test.py'
-            self.ctr += 1
-        elif args[1] == 'commit' and self.ctr > 5:
-            assert args[2] == '-m Added new solutions'
-        elif args[1] == 'commit':
-            assert args[2] == '-m Solution for TestSP'
-        return self.MockWait()
-
-    class MockWait:
-        def wait(self):
-            pass
+            self.staged += kwargs['input'].split('\0')
+        return subprocess.CompletedProcess(args, self.returncode, stdout='', stderr='error')
 
 
 class TestKattisToGithub(TestCase):
@@ -107,6 +115,15 @@ class TestKattisToGithub(TestCase):
         assert self.KTG.directory == Path(__file__).parent
         assert self.KTG.no_git is False
         assert self.KTG.py_main_only is False
+        assert self.KTG.commit_each is False
+        assert self.KTG.workers == DEFAULT_WORKERS
+        assert self.KTG.full_sync is False
+        assert self.KTG.no_cache is False
+
+    def test_connection_pool_is_sized_to_workers(self):
+        self.KTG.workers = 12
+        self.KTG._size_connection_pool()
+        assert self.KTG.session.get_adapter(BASE_URL)._pool_maxsize == 12
 
     def test_create_folders_for_solutions(self):
         self.KTG.create_folders_for_solutions()
@@ -123,13 +140,35 @@ class TestKattisToGithub(TestCase):
         assert len(self.KTG.solved_problems) == 1
         sp = self.KTG.solved_problems[0]
         assert sp.name == 'Test'
-        assert sp.difficulty == 'Easy'
+        assert sp.difficulty == Difficulty.EASY
         assert sp.status == 1
         assert sp.problem_link == 'problem_link'
         assert sp.submissions_link == 'submissions-link'
         assert sp.filename_language_dict == {'test.py': 'Python 3', 'test.cpp': 'C++'}
         os.remove('test/status.csv')
 
+    def test_solved_problems_setter_builds_registry(self):
+        self.KTG.solved_problems = [SolvedProblem(submissions_link='a'), SolvedProblem(submissions_link='a')]
+        assert len(self.KTG.solved_problems) == 1
+        assert 'a' in self.KTG.registry
+
+    def test_finished_problem_is_upserted_to_sqlite(self):
+        self.KTG.no_git = True
+        self.KTG.state_backend = 'sqlite'
+        sp = SolvedProblem(name='A', problem_link='B', submissions_link='C', difficulty='Easy', filename_language_dict={'D': 'E'})
+        self.KTG.solved_problems = [sp]
+        self.KTG._finish_solved_problem(sp, [['https://open.kattis.com/submissions/5', 'E']])
+        with mock.patch.object(self.KTG.state_store, 'save') as save:
+            self.KTG.update_status_to_csv()
+        save.assert_not_called()
+        self.KTG.load_solved_problem_status_csv()
+        assert self.KTG.solved_problems[0].filename_language_dict == {'D': 'E'}
+        assert self.KTG.solved_problems[0].last_submission_id == '5'
+        self.KTG.state_store.close()
+        for filename in ['status.db', 'status.db-wal', 'status.db-shm', '.gitignore']:
+            if os.path.exists(f'test/{filename}'):
+                os.remove(f'test/{filename}')
+
     def test_load_solved_problem_status_csv_no_status_csv(self):
         self.KTG.load_solved_problem_status_csv()
         assert self.KTG.solved_problems == []
@@ -158,6 +197,28 @@ class TestKattisToGithub(TestCase):
     def test_login_fail(self):
         assert not self.KTG.login()
 
+    def test_login_reuses_saved_session(self):
+        self.KTG.session.cookies.set('EduSiteCookie', 'abc', domain='open.kattis.com', path='/')
+        self.KTG.session_store.save(self.KTG.session, USER)
+        response = mock.Mock(status_code=200, history=[], text='<a href="/logout">Log out</a>', content=b'<a href="/logout">Log out</a>')
+        with mock.patch.object(self.KTG.session, 'get', return_value=response) as get, mock.patch.object(self.KTG.session, 'post') as post:
+            assert self.KTG.login() is True
+        get.assert_called_once()
+        post.assert_not_called()
+        self.KTG.session_store.clear()
+
+    def test_login_with_expired_session(self):
+        self.KTG.session.cookies.set('EduSiteCookie', 'abc', domain='open.kattis.com', path='/')
+        self.KTG.session_store.save(self.KTG.session, USER)
+        response = mock.Mock(status_code=200, history=[], text='<a href="/login">Log in</a>', content=b'<a href="/login">Log in</a>')
+        with mock.patch.object(self.KTG.session, 'get', return_value=response), \
+            mock.patch.object(self.KTG, '_get_CSRF_token', return_value=CSRF_TOKEN), \
+            mock.patch.object(self.KTG.session, 'post', return_value=mock.Mock(status_code=200, history=[], url=LOGIN_URL, content=b'')) as post:
+            assert self.KTG.login() is False
+        post.assert_called_once()
+        assert len(self.KTG.session.cookies) == 0
+        self.KTG.session_store.clear()
+
     @use_test_credentials
     def test_login_success(self):
         assert self.KTG.login()
@@ -168,20 +229,92 @@ class TestKattisToGithub(TestCase):
         assert self.KTG.get_solved_problems() is None
         assert len(self.KTG.solved_problems) > 0
 
-    def test_get_links_to_next_pages(self):
-        pages = []
-        self.KTG._get_links_to_next_pages(MockSoup(), pages=pages)
-        assert pages == ['?page=2', '?page=3']
-        # Check that duplicates are not added
-        self.KTG._get_links_to_next_pages(MockSoup(), pages=pages)
-        assert pages == ['?page=2', '?page=3']
+    def test_get_last_page_number(self):
+        assert self.KTG._get_last_page_number(MockSoup()) == 3
+        assert self.KTG._get_last_page_number(Soup('<div></div>', 'html.parser')) == 1
+
+    def test_get_solved_problems_fetches_each_page_once(self):
+        first_page = Soup('<a role="button" href="?order=-date&page=2">2</a><a role="button" href="?order=-date&page=3">3</a>', 'html.parser')
+        fetched_urls = []
+        def get_html(url, page=None):
+            fetched_urls.append(url)
+            if url == self.KTG._recent_solved_problems_url:
+                return first_page
+            return Soup(f'<p>{url[-1]}</p>', 'html.parser')
+        def find_solved_problems(html):
+            return [html.text]
+        def parse_solved_problem(text):
+            return SolvedProblem(name=text, submissions_link=text)
+        with mock.patch.object(self.KTG, '_get_html', side_effect=get_html), \
+             mock.patch.object(self.KTG, '_find_solved_problems_from_html', side_effect=find_solved_problems), \
+             mock.patch.object(self.KTG, '_parse_solved_problem', side_effect=parse_solved_problem):
+            self.KTG.get_solved_problems()
+        assert sorted(fetched_urls) == sorted([self.KTG._recent_solved_problems_url + p for p in ['', '&page=2', '&page=3']])
+        assert [sp.name for sp in self.KTG.solved_problems] == ['23', '2', '3']
+        assert [sp.activity_rank for sp in self.KTG.solved_problems] == [-3, -2, -1]
+
+    def test_get_all_solved_problems_marks_changed_rows(self):
+        self.KTG.solved_problems = [
+            SolvedProblem(submissions_link=link, status=ProblemStatus.CODE_FOUND, activity=link, activity_rank=rank)
+            for rank, link in enumerate(['a', 'b', 'c'])
+        ]
+        rows = [SolvedProblem(submissions_link='a', activity='a'), SolvedProblem(submissions_link='b', activity='b2'),
+                SolvedProblem(submissions_link='c', activity='c')]
+        with mock.patch.object(self.KTG, '_get_html', return_value=Soup('', 'html.parser')), \
+             mock.patch.object(self.KTG, '_find_solved_problems_from_html', return_value=rows), \
+             mock.patch.object(self.KTG, '_parse_solved_problem', side_effect=lambda sp: sp):
+            self.KTG._get_all_solved_problems()
+        assert self.KTG.recently_active_links == {'b'}
+        assert self.KTG.solved_problems[1].activity == 'b2'
+
+    def test_get_solved_problems_full_sync(self):
+        self.KTG.solved_problems = [SolvedProblem(submissions_link='known')]
+        self.KTG.full_sync = True
+        with mock.patch.object(self.KTG, '_get_all_solved_problems') as get_all, \
+             mock.patch.object(self.KTG, '_get_recently_solved_problems') as get_recent:
+            self.KTG.get_solved_problems()
+        get_all.assert_called_once()
+        get_recent.assert_not_called()
+
+    def test_get_solved_problems_without_status_csv_is_full(self):
+        with mock.patch.object(self.KTG, '_get_all_solved_problems') as get_all:
+            self.KTG.get_solved_problems()
+        get_all.assert_called_once()
+
+    def test_get_recently_solved_problems_stops_at_known_page(self):
+        self.KTG.solved_problems = [
+            SolvedProblem(submissions_link=link, activity=link, activity_rank=rank) for rank, link in enumerate(['c', 'd', 'e', 'f'])
+        ]
+        pages = {
+            self.KTG._recent_solved_problems_url: (['a', 'c'], 3),
+            self.KTG._recent_solved_problems_url + '&page=2': (['d', 'e'], 3),
+            self.KTG._recent_solved_problems_url + '&page=3': (['f'], 3),
+        }
+        fetched_urls = []
+        def get_html(url, page=None):
+            fetched_urls.append(url)
+            return mock.MagicMock(url=url)
+        with mock.patch.object(self.KTG, '_get_html', side_effect=get_html), \
+             mock.patch.object(self.KTG, '_find_solved_problems_from_html', side_effect=lambda html: pages[html.url][0]), \
+             mock.patch.object(self.KTG, '_get_last_page_number', side_effect=lambda html: pages[html.url][1]), \
+             mock.patch.object(self.KTG, '_parse_solved_problem', side_effect=lambda link: SolvedProblem(submissions_link=link, activity=link)):
+            self.KTG._get_recently_solved_problems()
+        assert fetched_urls == list(pages)[:2]
+        assert [sp.submissions_link for sp in self.KTG.solved_problems] == ['c', 'd', 'e', 'f', 'a']
+        assert self.KTG.recently_active_links == {'a'}
+        assert [sp.activity_rank for sp in self.KTG.solved_problems] == [0, 1, 2, 3, -1]
+
+    def test_get_last_page_number_with_query(self):
+        html = Soup('<a role="button" href="?order=-date&page=4">4</a>', 'html.parser')
+        assert self.KTG._get_last_page_number(html) == 4
 
     def test_parse_solved_problem(self):
         sp = self.KTG._parse_solved_problem(MockSoup())
         assert sp.submissions_link == f'https://open.kattis.com/users/{USER}?tab=submissions&problem=CorrectLink'
         assert sp.name == 'ProblemName'
-        assert sp.points == '3.0'
-        assert sp.difficulty == 'Medium'
+        assert sp.points == 3.0
+        assert sp.difficulty == Difficulty.MEDIUM
+        assert sp.activity == '0.01 s|2024-01-01|Python 3|3.0'
 
     def test_should_look_for_code(self):
         sp = SolvedProblem(status=ProblemStatus.UPDATE)
@@ -191,6 +324,117 @@ class TestKattisToGithub(TestCase):
         sp.status = ProblemStatus.CODE_FOUND
         assert self.KTG._should_look_for_code(sp) is False
 
+    def test_should_look_for_recently_active_problem(self):
+        sp = SolvedProblem(submissions_link='link', status=ProblemStatus.CODE_FOUND)
+        self.KTG.recently_active_links.add('link')
+        assert self.KTG._should_look_for_code(sp) is True
+
+    def test_should_look_for_unfinished_problem(self):
+        sp = SolvedProblem(submissions_link='link', status=ProblemStatus.CODE_FOUND)
+        self.KTG.unfinished_links.add('link')
+        assert self.KTG._should_look_for_code(sp) is True
+
+    def test_should_look_for_discovered_problem(self):
+        sp = SolvedProblem(submissions_link='link', status=ProblemStatus.CODE_FOUND, last_submission_id='2')
+        self.KTG.recently_active_links.add('link')
+        self.KTG.discovered_submissions = {}
+        assert self.KTG._should_look_for_code(sp) is False
+        self.KTG.discovered_submissions = {'link': [['/submissions/3', 'Go']]}
+        assert self.KTG._should_look_for_code(sp) is True
+
+    def test_discover_new_submissions_falls_back_if_last_seen_not_reached(self):
+        self.KTG.discover = True
+        self.KTG.solved_problems = [SolvedProblem(submissions_link='link', last_submission_id='2')]
+        tab = {'submissions': [['/submissions/4', 'Go', '/problems/hello', True]], 'last_page': 1}
+        with mock.patch.object(self.KTG, '_get_page_data', return_value=tab) as get_page_data:
+            self.KTG.discover_new_submissions()
+            assert self.KTG.discovered_submissions is None
+            tab['submissions'] += [['/submissions/2', 'Go', '/problems/hello', True]]
+            self.KTG.discover_new_submissions()
+        assert get_page_data.call_count == 2
+        assert self.KTG.discovered_submissions == {self.KTG._solved_problem_submission_url + 'hello': [['/submissions/4', 'Go']]}
+
+    def test_load_solved_problem_status_csv_resumes_from_journal(self):
+        journal = ProgressJournal(Path(DIRECTORY))
+        journal.record(SolvedProblem(
+            name='Test', problem_link='problem_link', submissions_link='submissions-link', status=ProblemStatus.CODE_FOUND,
+            filename_language_dict={'test.py': 'Python 3'}, changed_filenames=['test.py']
+        ), finished=False)
+        self.KTG.load_solved_problem_status_csv()
+        sp = self.KTG.registry.get('submissions-link')
+        assert sp.changed_filenames == ['test.py']
+        assert self.KTG.unfinished_links == {'submissions-link'}
+        self.KTG.no_git = True
+        self.KTG.update_status_to_csv()
+        assert not os.path.exists('test/status.journal')
+        os.remove('test/status.csv')
+
+    def test_get_unseen_submissions_without_last_submission_id(self):
+        sp = SolvedProblem(status=ProblemStatus.CODE_FOUND, filename_language_dict={'a.py': 'Python 3'})
+        submissions = [['/submissions/3', 'Python 3'], ['/submissions/2', 'Go']]
+        assert self.KTG._get_unseen_submissions(sp, submissions) == [['/submissions/2', 'Go']]
+
+    def test_get_unseen_submissions_stops_at_last_submission_id(self):
+        sp = SolvedProblem(status=ProblemStatus.CODE_FOUND, last_submission_id='2', filename_language_dict={'a.py': 'Python 3'})
+        submissions = [['/submissions/4', 'Python 3'], ['/submissions/3', 'Go'], ['/submissions/2', 'Python 3'], ['/submissions/1', 'C']]
+        assert self.KTG._get_unseen_submissions(sp, submissions) == submissions[:2]
+
+    def test_get_unseen_submissions_update_status(self):
+        sp = SolvedProblem(status=ProblemStatus.UPDATE, last_submission_id='2', filename_language_dict={'a.py': 'Python 3'})
+        submissions = [['/submissions/2', 'Python 3'], ['/submissions/1', 'Python 3']]
+        assert self.KTG._get_unseen_submissions(sp, submissions) == submissions
+
+    def test_get_code_for_solved_problem_fetches_only_new_submissions(self):
+        sp = SolvedProblem(status=ProblemStatus.CODE_FOUND, last_submission_id='2', filename_language_dict={'a.py': 'Python 3'})
+        pages = {
+            'list': [['/submissions/5', 'Python 3'], ['/submissions/4', 'Python 3'], ['/submissions/2', 'Python 3']],
+            '/submissions/5': {'filename': 'a.py', 'code': 'print(5)'},
+        }
+        with mock.patch.object(self.KTG, '_get_page_data', side_effect=lambda url, *args, **kwargs: pages[url]) as get_page_data, \
+             mock.patch.object(self.KTG.http_client, 'get', side_effect=FetchError('404')), \
+             mock.patch('src.solution_writer.SolutionWriter.write', return_value=True):
+            sp.submissions_link = 'list'
+            self.KTG._get_code_for_solved_problem(sp)
+        assert get_page_data.call_count == 2
+        assert sp.filename_language_dict == {'a.py': 'Python 3'}
+        assert sp.last_submission_id == '5'
+
+    def test_get_submission_downloads_raw_source_of_known_filename(self):
+        sp = SolvedProblem(filename_language_dict={'a.py': 'Python 3', 'a b.cpp': 'C++'})
+        response = mock.Mock(headers={'Content-Type': 'text/plain; charset=utf-8'}, content='// ä'.encode('utf-8'))
+        with mock.patch.object(self.KTG.http_client, 'get', return_value=response) as get, \
+             mock.patch.object(self.KTG, '_get_page_data') as get_page_data:
+            assert self.KTG._get_submission(sp, 'https://open.kattis.com/submissions/5', 'C++') == {'filename': 'a b.cpp', 'code': '// ä'}
+        get.assert_called_once_with('https://open.kattis.com/submissions/5/source/a%20b.cpp')
+        get_page_data.assert_not_called()
+
+    def test_get_submission_falls_back_to_submission_page(self):
+        sp = SolvedProblem(filename_language_dict={'a.py': 'Python 3'})
+        submission = {'filename': 'b.py', 'code': 'print()'}
+        login_page = mock.Mock(headers={'Content-Type': 'text/html; charset=utf-8'}, content=b'<html></html>')
+        for get in [mock.Mock(side_effect=FetchError('404')), mock.Mock(return_value=login_page)]:
+            with mock.patch.object(self.KTG.http_client, 'get', get), \
+                 mock.patch.object(self.KTG, '_get_page_data', return_value=submission) as get_page_data:
+                assert self.KTG._get_submission(sp, 'link', 'Python 3') == submission
+            get_page_data.assert_called_once()
+        with mock.patch.object(self.KTG.http_client, 'get') as get, \
+             mock.patch.object(self.KTG, '_get_page_data', return_value=submission):
+            assert self.KTG._get_submission(sp, 'link', 'Go') == submission
+        get.assert_not_called()
+
+    def test_get_code_for_solved_problem_keeps_newest_submission_of_filename(self):
+        sp = SolvedProblem(submissions_link='list')
+        pages = {
+            'list': [['/submissions/2', 'Python 3'], ['/submissions/1', 'Python 2']],
+            '/submissions/2': {'filename': 'a.py', 'code': 'print(2)'},
+            '/submissions/1': {'filename': 'a.py', 'code': 'print 1'},
+        }
+        with mock.patch.object(self.KTG, '_get_page_data', side_effect=lambda url, *args, **kwargs: pages[url]), \
+             mock.patch('src.solution_writer.SolutionWriter.write', return_value=True) as write:
+            self.KTG._get_code_for_solved_problem(sp)
+        write.assert_called_once_with(sp, 'a.py', 'print(2)')
+        assert sp.filename_language_dict == {'a.py': 'Python 3'}
+
     def test_python_3_code_is_acceptable(self):
         assert self.KTG._python_3_code_is_acceptable('print()') is True
         self.KTG.py_main_only = True
@@ -219,15 +463,48 @@ class TestKattisToGithub(TestCase):
         assert next(results) == ('https://open.kattis.com/submissions/123', 'Python 3')
         assert next(results) == ('https://open.kattis.com/submissions/124', 'Go')
 
+    def test_fetch_page_revalidates_cached_page(self):
+        self.KTG.http_cache = HttpCache(Path(DIRECTORY))
+        self.KTG.http_cache.store('url', 'cached body', etag='"1"')
+        response = mock.Mock(status_code=304, history=[], content=b'')
+        with mock.patch.object(self.KTG.session, 'get', return_value=response) as get:
+            entry, unchanged = self.KTG._fetch_page('url')
+        get.assert_called_once_with('url', headers={'If-None-Match': '"1"'}, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        assert unchanged is True
+        assert entry.body == 'cached body'
+        shutil.rmtree(self.KTG.http_cache.cache_dir)
+
+    def test_get_page_data_reuses_parsed_data_of_permanent_page(self):
+        self.KTG.http_cache = HttpCache(Path(DIRECTORY))
+        response = mock.Mock(status_code=200, history=[], text='<p>code</p>', content=b'<p>code</p>', headers={})
+        extract = mock.Mock(return_value={'code': 'code'}, __name__='extract')
+        with mock.patch.object(self.KTG.session, 'get', return_value=response) as get:
+            assert self.KTG._get_page_data('url', extract, permanent=True) == {'code': 'code'}
+            assert self.KTG._get_page_data('url', extract, permanent=True) == {'code': 'code'}
+        assert get.call_count == 1
+        assert extract.call_count == 1
+        shutil.rmtree(self.KTG.http_cache.cache_dir)
+
+    def test_get_page_data_skips_parsing_unchanged_page(self):
+        self.KTG.http_cache = HttpCache(Path(DIRECTORY))
+        response = mock.Mock(status_code=200, history=[], text='<p>list</p>', content=b'<p>list</p>', headers={})
+        extract = mock.Mock(return_value=[['link', 'Go']], __name__='extract')
+        with mock.patch.object(self.KTG.session, 'get', return_value=response) as get:
+            self.KTG._get_page_data('url', extract)
+            assert self.KTG._get_page_data('url', extract) == [['link', 'Go']]
+        assert get.call_count == 2
+        assert extract.call_count == 1
+        shutil.rmtree(self.KTG.http_cache.cache_dir)
+
+    def test_get_page_data_without_cache(self):
+        response = mock.Mock(status_code=200, history=[], text='<p>text</p>', content=b'<p>text</p>')
+        with mock.patch.object(self.KTG.session, 'get', return_value=response):
+            assert self.KTG._get_page_data('url', lambda html: html.text) == 'text'
+
     def test_parse_submission_more_than_one_file(self):
         html = Soup('<div class="horizontal_link_list ">', 'html.parser')
         assert self.KTG._parse_submission(SolvedProblem(), html, 'Python 3') is False
 
-    def test_parse_submission_same_file_already_found(self):
-        sp = SolvedProblem(filename_code_dict={'test.py': 'print()'})
-        html = Soup('<div class="file_source-content-test" data-filename="test.py">', 'html.parser')
-        assert self.KTG._parse_submission(sp, html, 'Python 3') is False
-
     def test_parse_submission_python3_accept_main_only(self):
         self.KTG.py_main_only = True
         html = """
@@ -244,53 +521,175 @@ class TestKattisToGithub(TestCase):
         """
         html = Soup(re.sub(r'\s\s+', ' ', html), 'html.parser')
         sp = SolvedProblem()
-        with mock.patch('src.solved_problem.SolvedProblem.write_to_file', return_value=None):
+        with mock.patch('src.solution_writer.SolutionWriter.write', return_value=True) as write:
             assert self.KTG._parse_submission(sp, html, 'Python 3') is True
-            assert sp.filename_code_dict == {'test.py': "print('Hello')"}
+            write.assert_called_once_with(sp, 'test.py', "print('Hello')")
             assert sp.filename_language_dict == {'test.py': 'Python 3'}
             assert sp.status == ProblemStatus.CODE_FOUND
 
+    def test_parse_submission_writes_outside_state_lock(self):
+        html = Soup('<div class="file_source-content-test" data-filename="test.py"><div class="source-highlight w-full">x</div></div>', 'html.parser')
+        lock_held = []
+        self.KTG.journal = mock.Mock()
+        self.KTG.journal.record.side_effect = lambda *args, **kwargs: lock_held.append(self.KTG.state_lock.locked())
+        with mock.patch('src.solution_writer.SolutionWriter.write', side_effect=lambda *args: lock_held.append(self.KTG.state_lock.locked())):
+            assert self.KTG._parse_submission(SolvedProblem(), html, 'Python 3') is True
+        assert lock_held == [False, False]
+
+    def test_get_codes_for_solved_problems_uses_worker_pool(self):
+        self.KTG.workers = 3
+        self.KTG.solved_problems = [
+            SolvedProblem(name=f'SP{i}', submissions_link=f'SP{i}', status=ProblemStatus.CODE_FOUND if i % 2 else ProblemStatus.CODE_NOT_FOUND)
+            for i in range(10)
+        ]
+        checked = []
+        def get_code(solved_problem):
+            checked.append(solved_problem.name)
+        with mock.patch.object(self.KTG, '_get_code_for_solved_problem', side_effect=get_code):
+            self.KTG.get_codes_for_solved_problems()
+        assert sorted(checked) == ['SP0', 'SP2', 'SP4', 'SP6', 'SP8']
+
+    def test_http2_transport(self):
+        self.KTG.transport = 'http2'
+        session = self.KTG.session
+        with mock.patch('KattisToGithub.http2_is_available', return_value=False):
+            self.KTG._size_connection_pool()
+        assert self.KTG.session is session
+        class Http2Session:
+            def __init__(self, session):
+                self.replaced = session
+        with mock.patch('KattisToGithub.http2_is_available', return_value=True), \
+             mock.patch('KattisToGithub.Http2Session', Http2Session):
+            self.KTG._size_connection_pool()
+            http2_session = self.KTG.session
+            self.KTG._size_connection_pool()
+        assert isinstance(http2_session, Http2Session) and http2_session.replaced is session
+        assert self.KTG.session is http2_session
+        assert self.KTG.http_client.session is http2_session
+
+    def test_async_engine_falls_back_to_threads_without_aiohttp(self):
+        self.KTG.async_engine = True
+        self.KTG.solved_problems = [SolvedProblem(name='SP', submissions_link='SP')]
+        with mock.patch('importlib.util.find_spec', return_value=None), \
+            mock.patch.object(self.KTG, '_get_code_for_solved_problem') as get_code, \
+            mock.patch.object(self.KTG, '_get_codes_asynchronously') as get_codes_asynchronously:
+            self.KTG.get_codes_for_solved_problems()
+        get_code.assert_called_once()
+        get_codes_asynchronously.assert_not_called()
+
+    def test_get_codes_for_solved_problems_keyboard_interrupt(self):
+        self.KTG.solved_problems = [SolvedProblem(name='SP', submissions_link='SP')]
+        with mock.patch.object(self.KTG, '_get_code_for_solved_problem', side_effect=KeyboardInterrupt):
+            assert self.KTG.get_codes_for_solved_problems() is None
+        assert self.KTG.failed_links == {'SP'}
+
+    def test_get_codes_for_solved_problems_skips_failing_problem(self):
+        self.KTG.no_git = True
+        self.KTG.solved_problems = [SolvedProblem(name='SP1', submissions_link='SP1'), SolvedProblem(name='SP2', submissions_link='SP2')]
+        self.KTG.journal = ProgressJournal(Path(DIRECTORY))
+        def get_code(solved_problem):
+            if solved_problem.name == 'SP1':
+                raise FetchError('503')
+        with mock.patch.object(self.KTG, '_get_code_for_solved_problem', side_effect=get_code):
+            self.KTG.get_codes_for_solved_problems()
+        assert self.KTG.failed_links == {'SP1'}
+        self.KTG.update_status_to_csv()
+        assert ProgressJournal(Path(DIRECTORY)).replay(self.KTG.registry) == {'SP1'}
+        self.KTG.journal.clear()
+        os.remove('test/status.csv')
+
+    def test_get_codes_for_solved_problems_skips_unreadable_page(self):
+        self.KTG.solved_problems = [SolvedProblem(name='SP1', submissions_link='SP1'), SolvedProblem(name='SP2', submissions_link='SP2')]
+        def get_code(solved_problem):
+            if solved_problem.name == 'SP1':
+                raise AttributeError("'NoneType' object has no attribute 'find_all'")
+            solved_problem.status = ProblemStatus.CODE_FOUND
+        output = io.StringIO()
+        with mock.patch.object(self.KTG, '_get_code_for_solved_problem', side_effect=get_code), redirect_stdout(output):
+            self.KTG.get_codes_for_solved_problems()
+        assert self.KTG.failed_links == {'SP1'}
+        assert self.KTG.solved_problems[1].status == ProblemStatus.CODE_FOUND
+        assert "Skipping SP1, it will be retried on the next run: AttributeError: 'NoneType'" in output.getvalue()
+
+    def test_get_solved_problems_skips_failing_page(self):
+        self.KTG.full_sync = True
+        with mock.patch.object(self.KTG, '_get_html', side_effect=FetchError('503')):
+            self.KTG.get_solved_problems()
+        assert self.KTG.solved_problems == []
+
     @use_test_credentials
     def test_get_codes_for_solved_problems(self):
         self.KTG.py_main_only = False
         self.KTG.login()
-        with mock.patch('KattisToGithub.KattisToGithub._get_links_to_next_pages', return_value=[]):
+        with mock.patch('KattisToGithub.KattisToGithub._get_last_page_number', return_value=1):
             self.KTG.get_solved_problems()
         self.KTG.solved_problems = self.KTG.solved_problems[:3]
-        with mock.patch('src.solved_problem.SolvedProblem.write_to_file', return_value=None):
+        with mock.patch('src.solution_writer.SolutionWriter.write', return_value=True):
             self.KTG.get_codes_for_solved_problems()
             for sp in self.KTG.solved_problems:
                 assert sp.status in [ProblemStatus.CODE_FOUND, ProblemStatus.CODE_NOT_FOUND]
                 if sp.status == ProblemStatus.CODE_FOUND:
-                    assert len(sp.filename_code_dict) > 0
                     assert len(sp.filename_language_dict) > 0
 
     def test_git_add_and_commit_solution_5_solutions(self):
         self.KTG.solved_problems = [SolvedProblem(
-            name='TestSP', filename_code_dict={'test.py': 'print("Hello")'}
-        )] * 5
+            name='TestSP', submissions_link=str(i), changed_filenames=[f'test{i}.py']
+        ) for i in range(5)]
         ms = MockSubprocess(self.KTG.directory)
-        with mock.patch('subprocess.Popen', ms.Popen):
+        with mock.patch('subprocess.run', ms.run):
             self.KTG.git_add_and_commit_solutions()
+        assert ms.calls[0] == ('add', None, [f'Solutions/test{i}.py' for i in range(5)])
+        assert ms.calls[1:] == [('commit', 'Solution for TestSP', [f'Solutions/test{i}.py']) for i in range(5)]
         assert self.KTG.user_should_git_push is True
 
     def test_git_add_and_commit_solution_mote_than_5_solutions(self):
         self.KTG.solved_problems = [SolvedProblem(
-            name='TestSP', filename_code_dict={'test.py': 'print("Hello")'}
-        )] * 6
+            name='TestSP', submissions_link=str(i), changed_filenames=[f'test{i}.py']
+        ) for i in range(6)]
+        ms = MockSubprocess(self.KTG.directory)
+        with mock.patch('subprocess.run', ms.run):
+            self.KTG.git_add_and_commit_solutions()
+        paths = [f'Solutions/test{i}.py' for i in range(6)]
+        assert ms.calls == [('add', None, paths), ('commit', 'Added new solutions', paths)]
+
+    def test_git_add_and_commit_solution_commit_each(self):
+        self.KTG.commit_each = True
+        self.KTG.solved_problems = [SolvedProblem(
+            name='TestSP', submissions_link=str(i), changed_filenames=[f'test{i}.py']
+        ) for i in range(6)]
+        ms = MockSubprocess(self.KTG.directory)
+        with mock.patch('subprocess.run', ms.run):
+            self.KTG.git_add_and_commit_solutions()
+        assert len(ms.calls) == 7
+
+    def test_git_add_and_commit_solution_git_fails(self):
+        self.KTG.solved_problems = [SolvedProblem(
+            name='TestSP', submissions_link='1', changed_filenames=['test.py']
+        )]
+        ms = MockSubprocess(self.KTG.directory, returncode=1)
+        with mock.patch('subprocess.run', ms.run):
+            self.KTG.git_add_and_commit_solutions()
+        assert len(ms.calls) == 1
+        assert self.KTG.user_should_git_push is False
+
+    def test_git_add_and_commit_solution_nothing_changed(self):
+        self.KTG.solved_problems = [SolvedProblem(
+            name='TestSP', submissions_link='1', filename_language_dict={'test.py': 'Python 3'}
+        )]
         ms = MockSubprocess(self.KTG.directory)
-        with mock.patch('subprocess.Popen', ms.Popen):
+        with mock.patch('subprocess.run', ms.run):
             self.KTG.git_add_and_commit_solutions()
+        assert ms.calls == []
 
     def test_git_add_and_commit_solution_no_git(self):
         self.KTG.no_git = True
         self.KTG.solved_problems = [SolvedProblem(
-            name='TestSP', filename_code_dict={'test.py': 'print("Hello")'}
-        )] * 5
+            name='TestSP', submissions_link=str(i), changed_filenames=['test.py']
+        ) for i in range(5)]
         ms = MockSubprocess(self.KTG.directory)
-        with mock.patch('subprocess.Popen', ms.Popen):
+        with mock.patch('subprocess.run', ms.run):
             self.KTG.git_add_and_commit_solutions()
-        assert ms.ctr == 0
+        assert ms.calls == []
 
     def test_create_markdown_table(self):
         self.KTG.no_git = True
@@ -1,4 +1,6 @@
-from src.argument_parser import parse_arguments
+import pytest
+from src.constants import BASE_URL, DEFAULT_WORKERS
+from src.argument_parser import parse_arguments, parse_offline_arguments
 
 
 def test_parse_short_arguments():
@@ -9,13 +11,86 @@ def test_parse_short_arguments():
     assert parser.no_git is False
     assert parser.no_readme is False
     assert parser.py_main_only is False
+    assert parser.workers == DEFAULT_WORKERS
+    assert parser.commit_each is False
+    assert parser.full is False
+    assert parser.no_cache is False
+    assert parser.html_parser == 'lxml'
+    assert parser.state == 'csv'
+    assert parser.base_url == BASE_URL
+    assert parser.profile is None
+    assert parser.cprofile is False
 
 
 def test_long_arguments():
-    parser = parse_arguments(['--user', 'my_username', '--password', 'my_password', '--directory', '../../Solutions', '--no-git', '--no-readme', '--py-main-only'])
+    parser = parse_arguments(['--user', 'my_username', '--password', 'my_password', '--directory', '../../Solutions', '--no-git', '--no-readme', '--py-main-only', '--workers', '8', '--commit-each', '--full', '--no-cache', '--html-parser', 'html.parser', '--state', 'sqlite', '--base-url', 'http://localhost:8000', '--profile', 'profile.json', '--cprofile'])
     assert parser.user == 'my_username'
     assert parser.password == 'my_password'
     assert parser.directory == '../../Solutions'
     assert parser.no_git is True
     assert parser.no_readme is True
     assert parser.py_main_only is True
+    assert parser.workers == 8
+    assert parser.commit_each is True
+    assert parser.full is True
+    assert parser.no_cache is True
+    assert parser.html_parser == 'html.parser'
+    assert parser.state == 'sqlite'
+    assert parser.base_url == 'http://localhost:8000'
+    assert parser.profile == 'profile.json'
+    assert parser.cprofile is True
+
+
+def test_workers_must_be_positive():
+    with pytest.raises(SystemExit):
+        parse_arguments(['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions', '--workers', '0'])
+
+
+def test_cprofile_requires_profile():
+    with pytest.raises(SystemExit):
+        parse_arguments(['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions', '--cprofile'])
+
+
+def test_account_arguments_are_required_without_batch():
+    with pytest.raises(SystemExit):
+        parse_arguments(['-u', 'my_username', '-p', 'my_password'])
+
+
+def test_batch():
+    parser = parse_arguments(['--batch', 'accounts.json'])
+    assert parser.batch == 'accounts.json'
+    assert parser.user is None
+
+
+def test_watch():
+    parser = parse_arguments(['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions', '--watch', '--poll-interval', '30', '--discover'])
+    assert parser.watch is True
+    assert parser.discover is True
+    assert parser.poll_interval == 30
+    for args in [['--poll-interval', '0'], ['--watch', '--batch', 'accounts.json']]:
+        with pytest.raises(SystemExit):
+            parse_arguments(['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions', *args])
+
+
+def test_async():
+    parser = parse_arguments(['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions', '--async', '--workers', '64'])
+    assert parser.async_engine is True
+    assert parser.workers == 64
+    assert parse_arguments(['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions']).async_engine is False
+
+
+def test_transport():
+    args = ['-u', 'my_username', '-p', 'my_password', '-d', '../../Solutions']
+    assert parse_arguments(args).transport == 'http1'
+    assert parse_arguments(args + ['--transport', 'http2']).transport == 'http2'
+    with pytest.raises(SystemExit):
+        parse_arguments(args + ['--transport', 'http3'])
+
+
+def test_parse_offline_arguments():
+    parser = parse_offline_arguments(['pending', '-d', '../../Solutions', '--state', 'sqlite'])
+    assert parser.command == 'pending'
+    assert parser.directory == '../../Solutions'
+    assert parser.state == 'sqlite'
+    with pytest.raises(SystemExit):
+        parse_offline_arguments(['readme'])
@@ -0,0 +1,66 @@
+import asyncio
+from unittest import TestCase, mock
+from src.constants import MAX_RETRIES
+from src.http_client import HttpClient, FetchError, ErrorBudgetExhausted
+from src.async_http_client import AsyncHttpClient, AsyncResponse
+
+
+def response(status_code: int, headers: dict = None) -> AsyncResponse:
+    return AsyncResponse(status_code, 'text', b'text', headers or {})
+
+
+class TestAsyncHttpClient(TestCase):
+    def setUp(self) -> None:
+        self.responses = []
+        self.requests = []
+        self.sleeps = []
+        self.http_client = HttpClient(mock.Mock(), error_budget=10)
+        self.client = AsyncHttpClient(self.http_client, self.fetch, sleep=self.sleep)
+        return super().setUp()
+
+    async def fetch(self, url, headers):
+        self.requests += [(url, headers)]
+        result = self.responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def sleep(self, seconds):
+        self.sleeps += [seconds]
+
+    def get(self, url: str = 'url', headers: dict = None) -> AsyncResponse:
+        return asyncio.run(self.client.get(url, headers))
+
+    def test_get(self):
+        self.responses = [response(304)]
+        assert self.get(headers={'If-None-Match': '"1"'}).status_code == 304
+        assert self.requests == [('url', {'If-None-Match': '"1"'})]
+        assert self.http_client.profiler.requests == 1
+
+    def test_retries_server_and_connection_errors(self):
+        self.responses = [response(429, {'Retry-After': '7'}), ConnectionError(), asyncio.TimeoutError(), response(200)]
+        assert self.get().status_code == 200
+        assert self.sleeps[0] == 7.0 and len(self.sleeps) == 3
+        assert self.http_client.errors_left == 7
+
+    def test_does_not_retry_client_errors(self):
+        self.responses = [response(404)]
+        with self.assertRaises(FetchError):
+            self.get()
+        assert self.sleeps == []
+
+    def test_gives_up(self):
+        self.responses = [response(503)] * (MAX_RETRIES + 1)
+        with self.assertRaises(FetchError):
+            self.get()
+        assert len(self.requests) == MAX_RETRIES + 1
+
+    def test_shares_error_budget_with_http_client(self):
+        self.http_client = HttpClient(mock.Mock(), error_budget=2)
+        self.client = AsyncHttpClient(self.http_client, self.fetch, sleep=self.sleep)
+        self.responses = [response(503)] * 2
+        with self.assertRaises(FetchError):
+            self.get()
+        with self.assertRaises(ErrorBudgetExhausted):
+            self.get()
+        assert len(self.requests) == 2
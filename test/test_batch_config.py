@@ -0,0 +1,74 @@
+import os
+import json
+from pathlib import Path
+from unittest import TestCase, mock
+from src.batch_config import load_batch_config
+from constants import TEST_DIR
+
+CONFIG_PATH = Path(TEST_DIR) / 'batch.json'
+
+
+class TestBatchConfig(TestCase):
+    def tearDown(self) -> None:
+        if CONFIG_PATH.exists():
+            os.remove(CONFIG_PATH)
+        return super().tearDown()
+
+    def __write(self, settings) -> None:
+        with open(CONFIG_PATH, 'w') as file:
+            json.dump(settings, file)
+
+    def test_load(self):
+        self.__write({
+            'workers': 6,
+            'requests_per_second': 2.5,
+            'defaults': {'no_readme': True, 'state': 'sqlite'},
+            'accounts': [
+                {'user': 'alice', 'password': 'a', 'directory': 'alice'},
+                {'user': 'bob', 'password': 'b', 'directory': '/srv/bob', 'state': 'csv', 'no_readme': False}
+            ]
+        })
+        config = load_batch_config(CONFIG_PATH)
+        assert config.workers == 6
+        assert config.requests_per_second == 2.5
+        assert config.parallel_accounts == 1
+        alice, bob = [account.arguments for account in config.accounts]
+        assert alice.user == 'alice'
+        assert alice.directory == str(Path(TEST_DIR).resolve() / 'alice')
+        assert alice.no_readme is True
+        assert alice.state == 'sqlite'
+        assert bob.directory == '/srv/bob'
+        assert bob.no_readme is False
+        assert bob.state == 'csv'
+
+    def test_password_from_environment(self):
+        self.__write({'accounts': [{'user': 'alice', 'password_env': 'KTG_TEST_PASSWORD', 'directory': 'alice'}]})
+        with mock.patch.dict(os.environ, {'KTG_TEST_PASSWORD': 'secret'}):
+            assert load_batch_config(CONFIG_PATH).accounts[0].arguments.password == 'secret'
+
+    def test_missing_environment_variable(self):
+        self.__write({'accounts': [{'user': 'alice', 'password_env': 'KTG_TEST_MISSING', 'directory': 'alice'}]})
+        with self.assertRaises(ValueError):
+            load_batch_config(CONFIG_PATH)
+
+    def test_invalid_account_options(self):
+        for account in [
+            {'user': 'alice', 'password': 'a'},
+            {'user': 'alice', 'password': 'a', 'directory': 'd', 'color': 'red'},
+            {'user': 'alice', 'password': 'a', 'directory': 'd', 'watch': True}
+        ]:
+            with self.subTest(account=account):
+                self.__write({'accounts': [account]})
+                with self.assertRaises(ValueError):
+                    load_batch_config(CONFIG_PATH)
+
+    def test_invalid_settings(self):
+        for settings in [{}, {'accounts': []}, {'accounts': [{}], 'unknown': 1}, {'accounts': [{}], 'workers': 0}]:
+            with self.subTest(settings=settings):
+                self.__write(settings)
+                with self.assertRaises(ValueError):
+                    load_batch_config(CONFIG_PATH)
+
+    def test_missing_file(self):
+        with self.assertRaises(ValueError):
+            load_batch_config(Path(TEST_DIR) / 'missing.json')
@@ -78,6 +78,29 @@ class TestCsvHandler(TestCase):
             writer.writerow(SOLVED_PROBLEMS[0].to_dict())
         assert self.csv_hadler.load_solved_problems() == [SOLVED_PROBLEMS[0]]
 
+    def test_load_solved_problems_without_points_column(self):
+        with open(TEST_FILE, 'w') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELD_NAMES[:CSV_FIELD_NAMES.index('Points')], extrasaction='ignore')
+            writer.writeheader()
+            writer.writerow(SOLVED_PROBLEMS[0].to_dict())
+        assert self.csv_hadler.load_solved_problems() == [SOLVED_PROBLEMS[0]]
+
+    def test_write_solved_problems_to_csv_keeps_points(self):
+        sp = SolvedProblem(name='A', difficulty='Easy', problem_link='B', submissions_link='C', points='1.5')
+        self.csv_hadler.write_solved_problems_to_csv([sp])
+        assert self.csv_hadler.load_solved_problems()[0].points == 1.5
+
+    def test_write_solved_problems_to_csv_keeps_last_submission_id(self):
+        sp = SolvedProblem(name='A', difficulty='Easy', problem_link='B', submissions_link='C', last_submission_id='1234')
+        self.csv_hadler.write_solved_problems_to_csv([sp])
+        assert self.csv_hadler.load_solved_problems()[0].last_submission_id == '1234'
+
+    def test_write_solved_problems_to_csv_keeps_solution_hashes(self):
+        sp = SolvedProblem(name='A', difficulty='Easy', problem_link='B', submissions_link='C',
+                           filename_hash_dict={'a.py': 'abc', 'b|c.py': 'def'})
+        self.csv_hadler.write_solved_problems_to_csv([sp])
+        assert self.csv_hadler.load_solved_problems()[0].filename_hash_dict == {'a.py': 'abc', 'b|c.py': 'def'}
+
     def test_write_solved_problems_to_csv(self):
         self.csv_hadler.write_solved_problems_to_csv(SOLVED_PROBLEMS)
         assert self.csv_hadler.load_solved_problems() == SOLVED_PROBLEMS
@@ -0,0 +1,90 @@
+import io
+import os
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from unittest import TestCase
+from contextlib import redirect_stdout
+from src.git_backend import GitBackend
+
+
+class TestGitBackend(TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        self.git(['init', '-q'])
+        self.git(['config', 'user.name', 'Test'])
+        self.git(['config', 'user.email', 'test@example.com'])
+        os.mkdir(self.directory / 'Solutions')
+        self.backend = GitBackend(self.directory)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+        return super().tearDown()
+
+    def git(self, args) -> str:
+        return subprocess.run(['git'] + args, cwd=self.directory, capture_output=True, text=True, check=True).stdout
+
+    def write(self, path: str) -> str:
+        with open(self.directory / path, 'w') as file:
+            file.write(path)
+        return path
+
+    def log(self):
+        return self.git(['log', '--format=%s']).splitlines()
+
+    def test_add_and_commit(self):
+        paths = [self.write('Solutions/a.py'), self.write('Solutions/b b.py')]
+        assert self.backend.add_and_commit('Updated', paths) is True
+        assert self.backend.commit_made is True
+        assert self.log() == ['Updated']
+        assert self.git(['status', '--porcelain']) == ''
+
+    def test_commit_leaves_out_other_staged_files(self):
+        self.write('other.txt')
+        self.git(['add', 'other.txt'])
+        assert self.backend.add_and_commit('Updated', [self.write('Solutions/a.py')]) is True
+        assert self.git(['status', '--porcelain']) == 'A  other.txt\n'
+
+    def test_commit_solutions_one_by_one(self):
+        solutions = [('A', [self.write('Solutions/a.py'), self.write('Solutions/a.cpp')]), ('B', [self.write('Solutions/b.py')])]
+        assert self.backend.commit_solutions(solutions, commit_one_by_one=True) is True
+        assert self.log() == ['Solution for B', 'Solution for A']
+        assert self.git(['show', '--name-only', '--format=', 'HEAD~1']).split() == ['Solutions/a.cpp', 'Solutions/a.py']
+
+    def test_commit_solutions_at_once(self):
+        solutions = [(str(i), [self.write(f'Solutions/{i}.py')]) for i in range(10)]
+        assert self.backend.commit_solutions(solutions, commit_one_by_one=False) is True
+        assert self.log() == ['Added new solutions']
+
+    def test_failure_is_reported(self):
+        assert self.backend.add(['Solutions/missing.py']) is False
+        assert self.backend.commit_made is False
+
+    def test_failure_output_is_reported(self):
+        with open(self.directory / '.git' / 'hooks' / 'pre-commit', 'w') as hook:
+            hook.write('#!/bin/sh\necho rejected by hook\nexit 1\n')
+        os.chmod(self.directory / '.git' / 'hooks' / 'pre-commit', 0o755)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert self.backend.add_and_commit('Updated', [self.write('Solutions/a.py')]) is False
+        assert 'git commit failed: rejected by hook' in output.getvalue()
+        assert self.backend.commit_made is False
+
+    def test_already_committed_paths(self):
+        paths = [self.write('Solutions/a.py'), self.write('Solutions/b.py')]
+        self.git(['add'] + paths)
+        self.git(['commit', '-q', '-m', 'Interrupted run'])
+        assert self.backend.add_and_commit('Updated', paths) is True
+        assert self.backend.commit_made is False
+        assert self.log() == ['Interrupted run']
+        with open(self.directory / paths[1], 'a') as file:
+            file.write('changed')
+        assert self.backend.add_and_commit('Updated', paths) is True
+        assert self.log() == ['Updated', 'Interrupted run']
+        assert self.git(['show', '--name-only', '--format=']).split() == ['Solutions/b.py']
+
+    def test_no_paths(self):
+        assert self.backend.add_and_commit('Nothing', []) is True
+        assert self.backend.commit_made is False
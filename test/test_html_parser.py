@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+from unittest import TestCase, mock
+from bs4.builder import builder_registry
+from src.constants import PARSER_BACKENDS, FALLBACK_PARSER_BACKEND
+from src.html_parser import HtmlParser, PROBLEMS_PAGE, SUBMISSIONS_PAGE, SUBMISSION_PAGE
+from src.solved_problem import SolvedProblem
+from KattisToGithub import KattisToGithub
+from constants import TEST_DIR
+
+GOLDEN_DIR = Path(TEST_DIR) / 'golden'
+SOLVED_PROBLEM_FIELDS = ['problem_link', 'submissions_link', 'name', 'points', 'difficulty']
+
+
+def read_golden_file(filename: str) -> str:
+    with open(GOLDEN_DIR / filename, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+class TestHtmlParser(TestCase):
+    def setUp(self) -> None:
+        self.expected = json.loads(read_golden_file('expected.json'))
+        self.KTG = KattisToGithub()
+        self.KTG.user = 'my_username'
+        return super().setUp()
+
+    def parsers(self):
+        for backend in PARSER_BACKENDS:
+            for partial in [False, True]:
+                with self.subTest(backend=backend, partial=partial):
+                    if builder_registry.lookup(backend) is None:
+                        continue
+                    self.KTG.html_parser = HtmlParser(backend=backend, partial=partial)
+                    yield self.KTG.html_parser
+
+    def test_unavailable_backend_falls_back(self):
+        with mock.patch('bs4.builder.builder_registry.lookup', return_value=None):
+            assert HtmlParser(backend='lxml').backend == FALLBACK_PARSER_BACKEND
+
+    def test_problems_page(self):
+        for parser in self.parsers():
+            html = parser.parse(read_golden_file('problems_page.html'), PROBLEMS_PAGE)
+            solved_problems = [self.KTG._parse_solved_problem(tr) for tr in self.KTG._find_solved_problems_from_html(html)]
+            expected = [SolvedProblem(**fields) for fields in self.expected['problems_page']['solved_problems']]
+            assert [{f: getattr(sp, f) for f in SOLVED_PROBLEM_FIELDS} for sp in solved_problems] == [{f: getattr(sp, f) for f in SOLVED_PROBLEM_FIELDS} for sp in expected]
+            assert self.KTG._get_last_page_number(html) == self.expected['problems_page']['last_page']
+
+    def test_submissions_page(self):
+        for parser in self.parsers():
+            html = parser.parse(read_golden_file('submissions_page.html'), SUBMISSIONS_PAGE)
+            assert self.KTG._extract_submission_links(html) == self.expected['submissions_page']
+
+    def test_submission_page(self):
+        for parser in self.parsers():
+            html = parser.parse(read_golden_file('submission_page.html'), SUBMISSION_PAGE)
+            assert self.KTG._extract_submission(html) == self.expected['submission_page']
+
+    def test_decompose_frees_whole_tree(self):
+        for parser in self.parsers():
+            html = parser.parse(read_golden_file('submission_page.html'), SUBMISSION_PAGE)
+            code = html.find('div', attrs={'class': 'source-highlight w-full'})
+            HtmlParser.decompose(html)
+            assert html.contents == []
+            assert code.decomposed is True
+
+    def test_decompose_page_with_doctype(self):
+        for parser in self.parsers():
+            html = parser.parse('<!DOCTYPE html>\n<html><body><p>text</p></body></html>\n')
+            paragraph = html.find('p')
+            HtmlParser.decompose(html)
+            assert html.contents == []
+            assert paragraph.decomposed is True
+
+    def test_login_page(self):
+        response = mock.Mock(status_code=200, history=[], text=read_golden_file('login_page.html'), content=b'')
+        for _ in self.parsers():
+            with mock.patch.object(self.KTG.session, 'get', return_value=response):
+                assert self.KTG._get_CSRF_token() == self.expected['login_page']
+
+    def test_partial_parse_tokenizes_page_once(self):
+        from bs4 import BeautifulSoup
+        parser = HtmlParser(backend=FALLBACK_PARSER_BACKEND)
+        with mock.patch('bs4.BeautifulSoup', wraps=BeautifulSoup) as soup:
+            html = parser.parse(read_golden_file('problems_page.html'), PROBLEMS_PAGE)
+        assert soup.call_count == 1
+        assert html.find('div', attrs={'id': 'problems-tab'}) is not None
+        assert len(html.find_all('a', attrs={'role': 'button'})) > 0
+
+    def test_partial_parse_skips_unrelated_markup(self):
+        html = HtmlParser(backend=FALLBACK_PARSER_BACKEND).parse(read_golden_file('submissions_page.html'), SUBMISSIONS_PAGE)
+        assert html.find('header') is None
+        assert html.find('div', attrs={'id': 'submissions-tab'}) is not None
@@ -0,0 +1,79 @@
+import os
+import time
+import shutil
+from pathlib import Path
+from unittest import TestCase
+from src.constants import HTTP_CACHE_DIRECTORY
+from src.http_cache import HttpCache, CacheEntry
+from constants import TEST_DIR
+
+TEST_CACHE_DIR = Path(TEST_DIR) / HTTP_CACHE_DIRECTORY
+URL = 'https://open.kattis.com/users/test'
+
+
+class TestHttpCache(TestCase):
+    def setUp(self) -> None:
+        self.cache = HttpCache(directory=Path(TEST_DIR))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        if os.path.exists(TEST_CACHE_DIR):
+            shutil.rmtree(TEST_CACHE_DIR)
+        return super().tearDown()
+
+    def test_cache_dir_ignores_itself(self):
+        with open(TEST_CACHE_DIR / '.gitignore', 'r') as ignore_file:
+            assert ignore_file.read() == '*\n'
+
+    def test_get_not_cached(self):
+        assert self.cache.get(URL) is None
+
+    def test_store_and_get(self):
+        self.cache.store(URL, '<html></html>', etag='"abc"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+        entry = self.cache.get(URL)
+        assert entry.body == '<html></html>'
+        assert entry.content_hash == HttpCache.content_hash('<html></html>')
+        assert entry.conditional_headers == {'If-None-Match': '"abc"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+    def test_conditional_headers_without_validators(self):
+        assert CacheEntry(url=URL, body='', content_hash='').conditional_headers == {}
+
+    def test_parsed_data_is_kept_while_body_is_unchanged(self):
+        entry = self.cache.store(URL, 'body')
+        self.cache.store_parsed(entry, 'links', [['a', 'b']])
+        assert self.cache.store(URL, 'body').parsed == {'links': [['a', 'b']]}
+        assert self.cache.store(URL, 'new body').parsed == {}
+
+    def test_evict_by_age(self):
+        self.cache.max_age = 10
+        old_entry = self.cache.store(URL, 'old')
+        old_entry.stored_at = time.time() - 60
+        self.cache.store_parsed(old_entry, 'key', 'value')
+        self.cache.store(URL + '/new', 'new')
+        assert self.cache.evict() == 1
+        assert self.cache.get(URL) is None
+        assert self.cache.get(URL + '/new') is not None
+
+    def test_evict_by_size_removes_oldest(self):
+        for i in range(3):
+            entry = self.cache.store(f'{URL}/{i}', 'x' * 100)
+            entry.stored_at = i
+            self.cache.store_parsed(entry, 'key', 'value')
+        self.cache.max_age = time.time()
+        self.cache.max_size = 2 * os.path.getsize(next(TEST_CACHE_DIR.glob('*.json')))
+        assert self.cache.evict() == 1
+        assert self.cache.get(f'{URL}/0') is None
+        assert self.cache.get(f'{URL}/2') is not None
+
+    def test_evict_keeps_permanent_entries(self):
+        self.cache.max_age = -1
+        self.cache.store(URL, 'source', permanent=True)
+        assert self.cache.evict() == 0
+        assert self.cache.get(URL).permanent is True
+
+    def test_permanent_entry_drops_body_once_parsed(self):
+        entry = self.cache.store(URL, 'source', permanent=True)
+        assert self.cache.get(URL).body == 'source'
+        self.cache.store_parsed(entry, 'key', 'value')
+        cached = self.cache.get(URL)
+        assert (cached.body, cached.parsed, cached.content_hash) == ('', {'key': 'value'}, HttpCache.content_hash('source'))
@@ -0,0 +1,104 @@
+import requests
+from unittest import TestCase, mock
+from src.constants import CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES, RETRY_AFTER_MAX
+from src.http_client import HttpClient, FetchError, ErrorBudgetExhausted, transferred_bytes
+
+
+def response(status_code: int, headers: dict = None) -> mock.Mock:
+    return mock.Mock(status_code=status_code, headers=headers or {}, content=b'', history=[])
+
+
+class TestHttpClient(TestCase):
+    def setUp(self) -> None:
+        self.session = mock.Mock()
+        self.sleeps = []
+        self.client = HttpClient(self.session, error_budget=10, sleep=self.sleeps.append)
+        return super().setUp()
+
+    def test_get_uses_timeouts(self):
+        self.session.get.return_value = response(200)
+        assert self.client.get('url').status_code == 200
+        self.session.get.assert_called_once_with('url', timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), headers={})
+
+    def test_get_accepts_not_modified(self):
+        self.session.get.return_value = response(304)
+        assert self.client.get('url', headers={'If-None-Match': '"1"'}).status_code == 304
+
+    def test_post(self):
+        self.session.post.return_value = response(200)
+        assert self.client.post('url', data={'a': 1}).status_code == 200
+        self.session.post.assert_called_once_with('url', timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), data={'a': 1})
+
+    def test_counts_transferred_bytes(self):
+        gzipped = mock.Mock(status_code=200, headers={}, content=b'x' * 1000, history=[])
+        gzipped.raw.tell.return_value = 40
+        self.session.get.return_value = gzipped
+        self.client.get('url')
+        assert self.client.profiler.bytes_received == 1000
+        assert self.client.profiler.bytes_transferred == 40
+
+    def test_transferred_bytes(self):
+        assert transferred_bytes(mock.Mock(num_bytes_downloaded=30, content=b'x' * 100)) == 30
+        assert transferred_bytes(mock.Mock(spec=['content'], content=b'x' * 100)) == 100
+        assert transferred_bytes(response(200)) == 0
+
+    def test_retries_server_errors(self):
+        self.session.get.side_effect = [response(503), response(500), response(200)]
+        assert self.client.get('url').status_code == 200
+        assert len(self.sleeps) == 2
+        assert self.client.errors_left == 8
+
+    def test_retries_connection_errors_and_timeouts(self):
+        self.session.get.side_effect = [requests.ConnectionError(), requests.ReadTimeout(), response(200)]
+        assert self.client.get('url').status_code == 200
+        assert len(self.sleeps) == 2
+
+    def test_backoff_grows_exponentially(self):
+        self.session.get.return_value = response(502)
+        with mock.patch('random.uniform', side_effect=lambda low, high: high):
+            with self.assertRaises(FetchError):
+                self.client.get('url')
+        assert self.sleeps == [1.0, 2.0, 4.0, 8.0]
+        assert self.session.get.call_count == MAX_RETRIES + 1
+
+    def test_honors_retry_after_seconds(self):
+        self.session.get.side_effect = [response(429, {'Retry-After': '7'}), response(200)]
+        self.client.get('url')
+        assert self.sleeps == [7.0]
+
+    def test_honors_retry_after_date(self):
+        self.session.get.side_effect = [response(503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}), response(200)]
+        self.client.get('url')
+        assert self.sleeps == [0]
+
+    def test_caps_retry_after(self):
+        self.session.get.side_effect = [response(429, {'Retry-After': '86400'}), response(200)]
+        self.client.get('url')
+        assert self.sleeps == [RETRY_AFTER_MAX]
+
+    def test_does_not_retry_client_errors(self):
+        self.session.get.return_value = response(404)
+        with self.assertRaises(FetchError):
+            self.client.get('url')
+        assert self.session.get.call_count == 1
+        assert self.client.errors_left == 10
+
+    def test_reset_error_budget(self):
+        client = HttpClient(self.session, error_budget=2, sleep=self.sleeps.append)
+        self.session.get.return_value = response(500)
+        with self.assertRaises(FetchError):
+            client.get('url')
+        client.reset_error_budget()
+        assert client.errors_left == 2
+        self.session.get.return_value = response(200)
+        assert client.get('url').status_code == 200
+
+    def test_error_budget(self):
+        client = HttpClient(self.session, error_budget=2, sleep=self.sleeps.append)
+        self.session.get.return_value = response(500)
+        with self.assertRaises(FetchError):
+            client.get('url')
+        assert self.session.get.call_count == 2
+        with self.assertRaises(ErrorBudgetExhausted):
+            client.get('other_url')
+        assert self.session.get.call_count == 2
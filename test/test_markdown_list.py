@@ -2,9 +2,10 @@ import os
 from typing import List
 from pathlib import Path
 from copy import deepcopy
-from unittest import TestCase
+from unittest import TestCase, mock
 from src.constants import *
-from src.markdown_list import MarkdownList
+from src.markdown_list import MarkdownList, ProblemRow
+from src.solved_problem import SolvedProblem, ProblemStatus, Difficulty
 from constants import SOLVED_PROBLEMS, TEST_DIR
 
 TEST_FILE = TEST_DIR + '/README.md'
@@ -64,7 +65,7 @@ class TestMarkdownList(TestCase):
         assert self.md_list.new_contents == original_contents[:2] + README_LIST_START(3)
 
     def test_sort_solved_problems_by_difficulty(self):
-        expected_result = ['Hard', 'Medium', 'Easy', 'Easy']
+        expected_result = [Difficulty.HARD, Difficulty.MEDIUM, Difficulty.EASY, Difficulty.EASY]
         self.md_list._sort_solved_problems_by_difficulty()
         for i, entry in enumerate(self.md_list.solved_problems):
             assert entry.difficulty == expected_result[i]
@@ -102,3 +103,23 @@ class TestMarkdownList(TestCase):
         self.md_list.create()
         self.md_list.create()
         assert self.md_list.should_add_and_commit is False
+
+    def test_create_does_not_rewrite_unchanged_README(self):
+        self.md_list.create()
+        md_list = MarkdownList(directory=Path(TEST_DIR), solved_problems=SOLVED_PROBLEMS)
+        with mock.patch.object(md_list, '_save_contents_to_README') as save:
+            md_list.create()
+        save.assert_not_called()
+        assert md_list.should_add_and_commit is False
+
+    def test_solved_problems_are_lightweight_views(self):
+        sp = SolvedProblem(name='A', problem_link='B', difficulty='Easy', status=ProblemStatus.CODE_FOUND,
+                           filename_hash_dict={'a.py': 'abc'}, filename_language_dict={'a.py': 'Python 3'})
+        md_list = MarkdownList(directory=Path(TEST_DIR), solved_problems=[sp])
+        assert md_list.solved_problems == [ProblemRow('A', 'B', Difficulty.EASY, (('a.py', 'Python 3'),), 2)]
+
+    def test_sort_unknown_difficulty_last(self):
+        sp = SolvedProblem(name='A', difficulty='Unknown', status=ProblemStatus.CODE_FOUND)
+        md_list = MarkdownList(directory=Path(TEST_DIR), solved_problems=SOLVED_PROBLEMS + [sp])
+        md_list._sort_solved_problems_by_difficulty()
+        assert md_list.solved_problems[-1].difficulty == Difficulty.UNKNOWN
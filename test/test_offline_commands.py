@@ -0,0 +1,104 @@
+import io
+import sys
+import shutil
+import subprocess
+from pathlib import Path
+from tempfile import mkdtemp
+from argparse import Namespace
+from contextlib import redirect_stdout
+from unittest import TestCase, mock
+from src.csv_handler import CsvHandler
+from src.sqlite_state import SqliteStateStore
+from src.progress_journal import ProgressJournal
+from src.offline_commands import run_offline_command
+from constants import SOLVED_PROBLEMS
+
+REPOSITORY = Path(__file__).parent.parent
+HEAVY_MODULES = ['requests', 'urllib3', 'bs4', 'lxml']
+
+
+class TestOfflineCommands(TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(mkdtemp())
+        CsvHandler(self.directory).save(SOLVED_PROBLEMS)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+        return super().tearDown()
+
+    def __run(self, command: str, state: str = 'csv') -> str:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert run_offline_command(Namespace(command=command, state=state), self.directory) is True
+        return output.getvalue()
+
+    def test_readme(self):
+        assert 'was updated' in self.__run('readme')
+        with open(self.directory / 'README.md', 'r') as file:
+            contents = file.read()
+        assert 'Problem1' in contents and 'Problem4' not in contents
+        assert 'already up to date' in self.__run('readme')
+
+    def test_status(self):
+        output = self.__run('status')
+        assert '#: 4 solved problems' in output
+        assert '#:   CODE_FOUND: 3' in output
+        assert 'Python 3 3, C++ 1' in output
+
+    def test_pending_includes_unfinished_problems(self):
+        unfinished = SOLVED_PROBLEMS[1]
+        ProgressJournal(self.directory).record(unfinished, finished=False)
+        output = self.__run('pending')
+        assert '#: 2 solved problems are waiting' in output
+        assert 'Problem2 (UNFINISHED)' in output
+        assert 'Problem4 (CODE_NOT_FOUND)' in output
+
+    def test_sqlite_state(self):
+        SqliteStateStore(self.directory).close()
+        assert '#: 4 solved problems' in self.__run('status', state='sqlite')
+
+    def test_sqlite_state_is_not_created(self):
+        assert '#: 4 solved problems' in self.__run('status', state='sqlite')
+        assert not (self.directory / 'status.db').exists()
+
+    def test_sqlite_state_is_read_only(self):
+        SqliteStateStore(self.directory).close()
+        saved = (self.directory / 'status.db').read_bytes()
+        for command in ['status', 'pending', 'readme']:
+            self.__run(command, state='sqlite')
+        assert (self.directory / 'status.db').read_bytes() == saved
+
+    def test_pending_queries_sqlite_status_index(self):
+        SqliteStateStore(self.directory).close()
+        ProgressJournal(self.directory).record(SOLVED_PROBLEMS[1], finished=False)
+        with mock.patch.object(SqliteStateStore, 'load_registry') as load_registry:
+            output = self.__run('pending', state='sqlite')
+        load_registry.assert_not_called()
+        assert '#: 2 solved problems are waiting' in output
+        assert 'Problem2 (UNFINISHED)' in output
+        assert 'Problem4 (CODE_NOT_FOUND)' in output
+
+    def test_without_saved_state(self):
+        (self.directory / 'status.csv').unlink()
+        with redirect_stdout(io.StringIO()):
+            assert run_offline_command(Namespace(command='status', state='csv'), self.directory) is False
+
+    def test_command_line(self):
+        result = subprocess.run(
+            [sys.executable, 'KattisToGithub.py', 'pending', '-d', str(self.directory)],
+            cwd=REPOSITORY, capture_output=True, text=True
+        )
+        assert result.returncode == 0
+        assert 'Problem4 (CODE_NOT_FOUND)' in result.stdout
+
+
+class TestStartup(TestCase):
+    """
+    Loading KTG must not import the HTTP or HTML stack, which is only needed once a sync starts.
+    """
+    def test_import_does_not_load_heavy_modules(self):
+        code = f'import sys, KattisToGithub; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+        result = subprocess.run([sys.executable, '-c', code], cwd=REPOSITORY, capture_output=True, text=True)
+        assert result.returncode == 0
+        assert result.stdout.strip() == ''
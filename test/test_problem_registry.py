@@ -0,0 +1,50 @@
+from copy import deepcopy
+from unittest import TestCase
+from src.solved_problem import SolvedProblem, ProblemStatus, Difficulty
+from src.problem_registry import ProblemRegistry
+from constants import SOLVED_PROBLEMS
+
+
+class TestProblemRegistry(TestCase):
+    def setUp(self) -> None:
+        self.registry = ProblemRegistry(deepcopy(SOLVED_PROBLEMS))
+        return super().setUp()
+
+    def test_create(self):
+        assert len(self.registry) == len(SOLVED_PROBLEMS)
+        assert list(self.registry) == SOLVED_PROBLEMS
+        assert self.registry.solved_problems == SOLVED_PROBLEMS
+
+    def test_get(self):
+        assert self.registry.get('submissions_link2') == SOLVED_PROBLEMS[1]
+        assert self.registry.get('unknown') is None
+        assert 'submissions_link3' in self.registry
+
+    def test_get_by_slug(self):
+        assert self.registry.get_by_slug('problem_link3') == SOLVED_PROBLEMS[2]
+        assert self.registry.get_by_slug('unknown') is None
+
+    def test_upsert_new(self):
+        sp = SolvedProblem(problem_link='https://open.kattis.com/problems/hello', submissions_link='new')
+        assert self.registry.upsert(sp) is True
+        assert self.registry.solved_problems[-1] is sp
+        assert self.registry.get_by_slug('hello') is sp
+
+    def test_upsert_unchanged(self):
+        assert self.registry.upsert(deepcopy(SOLVED_PROBLEMS[0])) is False
+        assert len(self.registry) == len(SOLVED_PROBLEMS)
+
+    def test_upsert_merges_points_and_difficulty(self):
+        known = self.registry.get('submissions_link1')
+        scraped = SolvedProblem(submissions_link='submissions_link1', name='Problem1', points='5.5', difficulty='Hard')
+        assert self.registry.upsert(scraped) is True
+        assert known.points == 5.5
+        assert known.difficulty == Difficulty.HARD
+        assert known.status == ProblemStatus.CODE_FOUND
+        assert known.filename_language_dict == SOLVED_PROBLEMS[0].filename_language_dict
+        assert len(self.registry) == len(SOLVED_PROBLEMS)
+
+    def test_duplicates_are_merged_on_create(self):
+        registry = ProblemRegistry([SolvedProblem(submissions_link='a'), SolvedProblem(submissions_link='a', points='1.0')])
+        assert len(registry) == 1
+        assert registry.get('a').points == 1.0
@@ -0,0 +1,86 @@
+import os
+from pathlib import Path
+from unittest import TestCase
+from src.solved_problem import SolvedProblem, ProblemStatus
+from src.problem_registry import ProblemRegistry
+from src.progress_journal import ProgressJournal
+from constants import TEST_DIR
+
+JOURNAL_PATH = Path(TEST_DIR) / 'status.journal'
+
+
+class TestProgressJournal(TestCase):
+    def setUp(self) -> None:
+        self.journal = ProgressJournal(Path(TEST_DIR))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.journal.clear()
+        return super().tearDown()
+
+    def __solved_problem(self, link: str = '/problems/hello/statistics') -> SolvedProblem:
+        return SolvedProblem(
+            problem_link='/problems/hello', submissions_link=link, name='Hello', difficulty='1.2 Easy', points='1.2',
+            status=ProblemStatus.CODE_FOUND, last_submission_id='123',
+            filename_language_dict={'hello.py': 'Python 3'}, filename_hash_dict={'hello.py': 'abc'}, changed_filenames=['hello.py']
+        )
+
+    def test_replay_without_journal(self):
+        assert self.journal.replay(ProblemRegistry()) == set()
+
+    def test_replay_restores_solved_problems(self):
+        self.journal.record(self.__solved_problem(), finished=True)
+        registry = ProblemRegistry()
+        assert ProgressJournal(Path(TEST_DIR)).replay(registry) == set()
+        assert registry.get('/problems/hello/statistics') == self.__solved_problem()
+        assert registry.get('/problems/hello/statistics').changed_filenames == ['hello.py']
+
+    def test_replay_updates_existing_solved_problem(self):
+        self.journal.record(self.__solved_problem(), finished=False)
+        existing = SolvedProblem(problem_link='/problems/hello', submissions_link='/problems/hello/statistics', name='Hello')
+        registry = ProblemRegistry([existing])
+        assert ProgressJournal(Path(TEST_DIR)).replay(registry) == {'/problems/hello/statistics'}
+        assert existing.status == ProblemStatus.CODE_FOUND
+        assert existing.filename_language_dict == {'hello.py': 'Python 3'}
+        assert existing.last_submission_id == '123'
+
+    def test_replay_uses_latest_record(self):
+        sp = self.__solved_problem()
+        self.journal.record(sp, finished=False)
+        self.journal.record(sp, finished=True)
+        assert ProgressJournal(Path(TEST_DIR)).replay(ProblemRegistry()) == set()
+
+    def test_replay_ignores_truncated_last_line(self):
+        self.journal.record(self.__solved_problem(), finished=True)
+        with open(JOURNAL_PATH, 'a', encoding='utf-8') as file:
+            file.write('{"submissions_link": "/problems/oth')
+        registry = ProblemRegistry()
+        ProgressJournal(Path(TEST_DIR)).replay(registry)
+        assert len(registry) == 1
+
+    def test_clear(self):
+        self.journal.record(self.__solved_problem(), finished=True)
+        assert self.journal.records_since_compaction == 1
+        self.journal.clear()
+        assert not os.path.exists(JOURNAL_PATH)
+        assert self.journal.records_since_compaction == 0
+
+    def test_compact(self):
+        sp = self.__solved_problem()
+        for _ in range(3):
+            self.journal.record(sp, finished=False)
+        self.journal.compact([sp])
+        assert self.journal.records_since_compaction == 0
+        with open(JOURNAL_PATH, 'r') as file:
+            assert len(file.readlines()) == 1
+        self.journal.record(self.__solved_problem('/problems/other/statistics'), finished=False)
+        assert ProgressJournal(Path(TEST_DIR)).replay(ProblemRegistry()) == {'/problems/other/statistics'}
+
+    def test_should_add_to_gitignore(self):
+        gitignore = Path(TEST_DIR) / '.gitignore'
+        try:
+            assert self.journal.should_add_to_gitignore is True
+            assert self.journal.should_add_to_gitignore is False
+            assert gitignore.read_text() == 'status.journal*\n'
+        finally:
+            gitignore.unlink()
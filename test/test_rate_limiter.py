@@ -0,0 +1,34 @@
+import pytest
+from src.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+def test_spaces_out_requests():
+    clock = FakeClock()
+    limiter = RateLimiter(4, sleep=clock.sleep, clock=lambda: clock.now)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == [0.25, 0.25]
+
+
+def test_does_not_wait_after_idle_time():
+    clock = FakeClock()
+    limiter = RateLimiter(4, sleep=clock.sleep, clock=lambda: clock.now)
+    limiter.acquire()
+    clock.now += 10
+    limiter.acquire()
+    assert clock.sleeps == []
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from src.solved_problem import SolvedProblem
+from src.problem_registry import ProblemRegistry
+from src.recent_activity import RecentActivity
+
+
+def row(link: str, activity: str = None) -> SolvedProblem:
+    return SolvedProblem(submissions_link=link, activity=activity or link)
+
+
+class TestRecentActivity(TestCase):
+    def setUp(self) -> None:
+        self.registry = ProblemRegistry(
+            SolvedProblem(submissions_link=link, activity=link, activity_rank=rank) for rank, link in enumerate(['a', 'b', 'c', 'd'])
+        )
+        self.activity = RecentActivity(self.registry)
+        return super().setUp()
+
+    def observe(self, *rows: SolvedProblem):
+        return [self.activity.observe(sp) for sp in rows]
+
+    def test_unchanged_rows_are_not_active(self):
+        assert self.observe(row('a'), row('b'), row('c')) == [False, False, False]
+
+    def test_new_problem_is_active(self):
+        assert self.observe(row('new'), row('a')) == [True, False]
+        assert self.registry.get('new') is not None
+
+    def test_changed_row_is_active(self):
+        assert self.observe(row('a'), row('b', 'b2')) == [False, True]
+        assert self.registry.get('b').activity == 'b2'
+
+    def test_problem_moved_ahead_is_active(self):
+        assert self.observe(row('c'), row('a'), row('b'), row('d')) == [True, False, False, False]
+
+    def test_problems_pushed_down_are_not_active(self):
+        assert self.observe(row('d'), row('c'), row('a'), row('b')) == [True, True, False, False]
+
+    def test_unrecorded_row(self):
+        self.registry.upsert(SolvedProblem(submissions_link='old'))
+        assert self.activity.observe(row('old')) is False
+        assert self.registry.get('old').activity == 'old'
+        self.registry.upsert(SolvedProblem(submissions_link='older'))
+        assert self.activity.observe(row('older'), unrecorded_is_active=True) is True
+
+    def test_finish_ranks_problems_which_moved_ahead_first(self):
+        self.observe(row('new'), row('c'), row('a'), row('b', 'b2'))
+        assert [sp.submissions_link for sp in self.activity.finish()] == ['new', 'c', 'b']
+        assert {sp.submissions_link: sp.activity_rank for sp in self.registry} == {'new': -2, 'c': -1, 'a': 0, 'b': 1, 'd': 3}
+
+    def test_finish_without_activity_changes_nothing(self):
+        self.observe(row('a'), row('b'))
+        assert self.activity.finish() == []
+        assert [sp.activity_rank for sp in self.registry] == [0, 1, 2, 3]
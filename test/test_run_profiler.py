@@ -0,0 +1,97 @@
+import os
+import json
+import pstats
+import threading
+from pathlib import Path
+from unittest import TestCase, mock
+from src.run_profiler import RunProfiler
+from constants import TEST_DIR
+
+REPORT_PATH = Path(TEST_DIR) / 'profile.json'
+
+
+class TestRunProfiler(TestCase):
+    def tearDown(self) -> None:
+        for path in [REPORT_PATH, REPORT_PATH.with_suffix('.prof')]:
+            if path.exists():
+                os.remove(path)
+        return super().tearDown()
+
+    def test_phase_counts_requests(self):
+        profiler = RunProfiler()
+        profiler.count_request(10)
+        with profiler.phase('login'):
+            profiler.count_request(100)
+            profiler.count_request(0, failed=True)
+        report = profiler.report()
+        assert report['requests'] == 3
+        assert report['failed_requests'] == 1
+        assert report['bytes_received'] == 110
+        assert report['phases']['login']['requests'] == 2
+        assert report['phases']['login']['bytes_received'] == 100
+        assert report['phases']['login']['wall_time'] >= 0
+
+    def test_counts_transferred_bytes_and_request_time(self):
+        profiler = RunProfiler()
+        with profiler.phase('submission_fetch'):
+            profiler.count_request(1000, bytes_transferred=250, elapsed=0.2)
+            profiler.count_request(500, elapsed=0.1)
+        report = profiler.report()
+        assert report['bytes_received'] == 1500
+        assert report['bytes_transferred'] == 750
+        assert report['request_time'] == 0.3
+        assert report['phases']['submission_fetch']['bytes_transferred'] == 750
+        assert '2 requests' in profiler.summary()
+        assert '(50% saved by compression), 150 ms per request' in profiler.summary()
+
+    def test_phase_accumulates(self):
+        profiler = RunProfiler()
+        for _ in range(2):
+            with profiler.phase('git'):
+                profiler.count_request(1)
+        assert profiler.report()['phases']['git']['requests'] == 2
+
+    def test_timer_from_threads(self):
+        profiler = RunProfiler()
+        def parse():
+            with profiler.timer('parse'):
+                pass
+        threads = [threading.Thread(target=parse) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert profiler.report()['timers']['parse']['count'] == 4
+
+    def test_write(self):
+        profiler = RunProfiler()
+        with profiler.phase('setup'):
+            pass
+        profiler.write(REPORT_PATH)
+        with open(REPORT_PATH, 'r') as file:
+            assert 'setup' in json.load(file)['phases']
+        assert not REPORT_PATH.with_suffix('.prof').exists()
+
+    def test_write_cprofile_includes_worker_threads(self):
+        profiler = RunProfiler(cprofile=True)
+        def work_in_thread():
+            return sum(range(1000))
+        with profiler.phase('setup'):
+            thread = threading.Thread(target=profiler.profiled(work_in_thread))
+            thread.start()
+            thread.join()
+        profiler.write(REPORT_PATH)
+        stats = pstats.Stats(str(REPORT_PATH.with_suffix('.prof')))
+        assert any(function_name == 'work_in_thread' for _, _, function_name in stats.stats)
+
+    def test_worker_threads_share_the_profiler_since_python_3_12(self):
+        profiler = RunProfiler(cprofile=True)
+        with mock.patch('src.run_profiler.PER_THREAD_PROFILES', False):
+            assert profiler.profiled(sum) is sum
+
+    def test_profiler_already_active(self):
+        profiler = RunProfiler(cprofile=True)
+        with mock.patch('cProfile.Profile.enable', side_effect=ValueError('Another profiling tool is already active')):
+            with profiler.phase('setup'):
+                pass
+        assert 'setup' in profiler.report()['phases']
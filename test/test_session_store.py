@@ -0,0 +1,45 @@
+import os
+import stat
+import json
+import requests
+from pathlib import Path
+from unittest import TestCase
+from src.session_store import SessionStore
+from constants import TEST_DIR
+
+SESSION_PATH = Path(TEST_DIR) / '.ktg_session'
+
+
+class TestSessionStore(TestCase):
+    def setUp(self) -> None:
+        self.store = SessionStore(Path(TEST_DIR))
+        self.session = requests.Session()
+        self.session.cookies.set('EduSiteCookie', 'abc', domain='open.kattis.com', path='/')
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.store.clear()
+        return super().tearDown()
+
+    def test_save_is_private(self):
+        self.store.save(self.session, 'user')
+        assert stat.S_IMODE(os.stat(SESSION_PATH).st_mode) == 0o600
+
+    def test_load(self):
+        self.store.save(self.session, 'user')
+        session = requests.Session()
+        assert self.store.load(session, 'user') is True
+        assert session.cookies.get('EduSiteCookie', domain='open.kattis.com') == 'abc'
+
+    def test_load_without_file(self):
+        assert self.store.load(requests.Session(), 'user') is False
+
+    def test_load_other_user(self):
+        self.store.save(self.session, 'user')
+        assert self.store.load(requests.Session(), 'other_user') is False
+
+    def test_load_skips_expired_cookies(self):
+        cookie = {'name': 'EduSiteCookie', 'value': 'abc', 'domain': 'open.kattis.com', 'path': '/', 'expires': 1, 'secure': True}
+        with open(SESSION_PATH, 'w') as file:
+            json.dump({'user': 'user', 'cookies': [cookie]}, file)
+        assert self.store.load(requests.Session(), 'user') is False
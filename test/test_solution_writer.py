@@ -0,0 +1,58 @@
+import os
+import shutil
+from pathlib import Path
+from unittest import TestCase
+from src.solved_problem import SolvedProblem
+from src.solution_writer import SolutionWriter
+from constants import TEST_DIR
+
+SOLUTIONS_DIR = Path(TEST_DIR) / 'Solutions'
+
+
+class TestSolutionWriter(TestCase):
+    def setUp(self) -> None:
+        os.mkdir(SOLUTIONS_DIR)
+        self.writer = SolutionWriter(Path(TEST_DIR))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(SOLUTIONS_DIR)
+        return super().tearDown()
+
+    def __read(self, filename: str) -> str:
+        with open(SOLUTIONS_DIR / filename, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def test_write_new_file(self):
+        sp = SolvedProblem()
+        assert self.writer.write(sp, 'test.py', 'print("Hyvä")') is True
+        assert self.__read('test.py') == 'print("Hyvä")'
+        assert sp.filename_hash_dict == {'test.py': SolutionWriter.content_hash('print("Hyvä")')}
+        assert sp.changed_filenames == ['test.py']
+        assert self.writer.changed_paths == ['Solutions/test.py']
+        assert os.listdir(SOLUTIONS_DIR) == ['test.py']
+
+    def test_write_unchanged_file(self):
+        sp = SolvedProblem()
+        self.writer.write(sp, 'test.py', 'print()')
+        assert SolutionWriter(Path(TEST_DIR)).write(sp, 'test.py', 'print()') is False
+        assert sp.changed_filenames == ['test.py']
+
+    def test_write_changed_file(self):
+        sp = SolvedProblem()
+        self.writer.write(sp, 'test.py', 'print()')
+        assert self.writer.write(sp, 'test.py', 'print(1)') is True
+        assert self.__read('test.py') == 'print(1)'
+        assert self.writer.changed_paths == ['Solutions/test.py', 'Solutions/test.py']
+
+    def test_write_existing_file_without_stored_hash(self):
+        with open(SOLUTIONS_DIR / 'test.py', 'w', encoding='utf-8') as file:
+            file.write('print()')
+        sp = SolvedProblem()
+        assert self.writer.write(sp, 'test.py', 'print()') is False
+        assert sp.filename_hash_dict == {'test.py': SolutionWriter.content_hash('print()')}
+        assert self.writer.changed_paths == []
+
+    def test_write_deleted_file(self):
+        sp = SolvedProblem(filename_hash_dict={'test.py': SolutionWriter.content_hash('print()')})
+        assert self.writer.write(sp, 'test.py', 'print()') is True
@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+from unittest import TestCase
+from src.csv_handler import CsvHandler
+from src.solved_problem import SolvedProblem, ProblemStatus, Difficulty, parse_points
+from constants import TEST_DIR
+
+TEST_FILE = TEST_DIR + '/status.csv'
+
+
+class TestSolvedProblem(TestCase):
+    def tearDown(self) -> None:
+        if os.path.exists(TEST_FILE):
+            os.remove(TEST_FILE)
+        return super().tearDown()
+
+    def test_parse_difficulty(self):
+        assert Difficulty.parse('Easy') == Difficulty.EASY
+        assert Difficulty.parse('hard') == Difficulty.HARD
+        assert Difficulty.parse('1.2 Medium') == Difficulty.MEDIUM
+        assert Difficulty.parse('Unknown') == Difficulty.UNKNOWN
+        assert Difficulty.parse('Impossible') == Difficulty.UNKNOWN
+        assert Difficulty.parse('') is None
+        assert Difficulty.parse(None) is None
+
+    def test_difficulty_is_printed_by_name(self):
+        assert str(Difficulty.MEDIUM) == 'Medium'
+        assert f'|{Difficulty.HARD}|' == '|Hard|'
+        assert Difficulty.HARD < Difficulty.MEDIUM < Difficulty.EASY
+
+    def test_parse_points(self):
+        assert parse_points('2.5') == 2.5
+        assert parse_points('') is None
+        assert parse_points('n/a') is None
+        assert parse_points(None) is None
+
+    def test_is_slotted(self):
+        sp = SolvedProblem(points='1.5', difficulty='Easy')
+        assert not hasattr(sp, '__dict__')
+        assert sp.points == 1.5
+        assert sp.difficulty == Difficulty.EASY
+
+    def test_to_dict(self):
+        sp = SolvedProblem(name='A', difficulty=Difficulty.HARD, points=7.1, status=ProblemStatus.CODE_FOUND)
+        assert sp.to_dict()['Difficulty'] == 'Hard'
+        assert sp.to_dict()['Points'] == 7.1
+        assert SolvedProblem(name='A').to_dict()['Difficulty'] is None
+
+    def test_csv_round_trip(self):
+        solved_problems = [
+            SolvedProblem(name=name, difficulty=difficulty, points='3.4', problem_link=name, submissions_link=name,
+                          status=ProblemStatus.CODE_FOUND, filename_language_dict={f'{name}.py': ''.join(['Python', ' 3'])})
+            for name, difficulty in [('A', 'Easy'), ('B', 'Hard'), ('C', 'Unknown')]
+        ]
+        CsvHandler(Path(TEST_DIR)).save(solved_problems)
+        with open(TEST_FILE, 'r') as csv_file:
+            contents = csv_file.read()
+        assert ',Easy,' in contents and ',Unknown,' in contents and ',3.4,' in contents
+        loaded = CsvHandler(Path(TEST_DIR)).load_solved_problems()
+        assert loaded == solved_problems
+        assert loaded[0].filename_language_dict['A.py'] is loaded[1].filename_language_dict['B.py']
@@ -0,0 +1,161 @@
+import os
+import csv
+import sqlite3
+from copy import deepcopy
+from pathlib import Path
+from unittest import TestCase
+from src.constants import CSV_FIELD_NAMES
+from src.solved_problem import SolvedProblem, ProblemStatus
+from src.sqlite_state import SqliteStateStore
+from constants import SOLVED_PROBLEMS, TEST_DIR
+
+TEST_FILE = TEST_DIR + '/status.db'
+TEST_CSV_FILE = TEST_DIR + '/status.csv'
+TEST_GITIGNORE = TEST_DIR + '/.gitignore'
+
+
+class TestSqliteStateStore(TestCase):
+    def setUp(self) -> None:
+        self.store = SqliteStateStore(directory=Path(TEST_DIR))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.store.close()
+        for filepath in [TEST_FILE, TEST_FILE + '-wal', TEST_FILE + '-shm', TEST_CSV_FILE, TEST_GITIGNORE]:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        return super().tearDown()
+
+    def test_uses_wal_mode(self):
+        connection = sqlite3.connect(TEST_FILE)
+        assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        connection.close()
+
+    def test_load_empty(self):
+        assert self.store.load_solved_problems() == []
+
+    def test_save_and_load(self):
+        solved_problems = deepcopy(SOLVED_PROBLEMS)
+        solved_problems[0].filename_hash_dict = {'test1.py': 'abc'}
+        solved_problems[0].points = 2.5
+        self.store.save(solved_problems)
+        reopened = SqliteStateStore(Path(TEST_DIR))
+        assert reopened.load_solved_problems() == sorted(solved_problems, key=lambda sp: sp.name)
+        reopened.close()
+
+    def test_upsert(self):
+        sp = deepcopy(SOLVED_PROBLEMS[0])
+        assert self.store.upsert(sp) is True
+        assert self.store.upsert(sp) is False
+        sp.status = ProblemStatus.UPDATE
+        sp.filename_language_dict = {'new.go': 'Go'}
+        assert self.store.upsert(sp) is True
+        assert self.store.load_solved_problems() == [sp]
+
+    def test_save_only_writes_changed_problems(self):
+        self.store.save(deepcopy(SOLVED_PROBLEMS))
+        registry = self.store.load_registry()
+        registry.get('submissions_link2').status = ProblemStatus.UPDATE
+        changes = []
+        self.store._SqliteStateStore__connection.set_trace_callback(
+            lambda sql: changes.append(sql) if sql.startswith('INSERT INTO problems') else None
+        )
+        self.store.save(registry)
+        assert len(changes) == 1
+
+    def test_problem_without_difficulty(self):
+        sp = deepcopy(SOLVED_PROBLEMS[0])
+        sp.difficulty = None
+        assert self.store.upsert(sp) is True
+        assert self.store.load_solved_problems() == [sp]
+
+    def test_upgrade_problems_table_of_earlier_version(self):
+        self.store.close()
+        os.remove(TEST_FILE)
+        connection = sqlite3.connect(TEST_FILE)
+        connection.executescript('''
+            CREATE TABLE problems (
+                submissions_link TEXT PRIMARY KEY, slug TEXT, name TEXT NOT NULL, difficulty TEXT NOT NULL, points TEXT,
+                status INTEGER NOT NULL, problem_link TEXT NOT NULL, last_submission_id TEXT
+            );
+            CREATE TABLE solutions (
+                submissions_link TEXT NOT NULL REFERENCES problems (submissions_link) ON DELETE CASCADE,
+                filename TEXT NOT NULL, language TEXT NOT NULL, content_hash TEXT, PRIMARY KEY (submissions_link, filename)
+            );
+            INSERT INTO problems VALUES ('link', 'slug', 'Name', 'Easy', '1.5', 1, 'https://open.kattis.com/problems/slug', '7');
+            INSERT INTO solutions VALUES ('link', 'slug.py', 'Python 3', 'abc');
+        ''')
+        connection.close()
+        self.store = SqliteStateStore(Path(TEST_DIR))
+        sp = self.store.load_solved_problems()[0]
+        assert (sp.name, sp.last_submission_id, sp.filename_hash_dict, sp.activity) == ('Name', '7', {'slug.py': 'abc'}, None)
+        sp.difficulty = None
+        assert self.store.upsert(sp) is True
+        assert self.store.get_by_slug('slug').difficulty is None
+
+    def test_read_only(self):
+        self.store.save(deepcopy(SOLVED_PROBLEMS))
+        self.store.close()
+        self.store = SqliteStateStore(Path(TEST_DIR), read_only=True)
+        assert self.store.count() == 4
+        assert self.store.load_solved_problems() == sorted(SOLVED_PROBLEMS, key=lambda sp: sp.name)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.store.upsert(SolvedProblem(name='New', difficulty='Easy', status=ProblemStatus.CODE_FOUND, submissions_link='new'))
+
+    def test_read_only_problems_table_of_earlier_version(self):
+        self.store.close()
+        os.remove(TEST_FILE)
+        connection = sqlite3.connect(TEST_FILE)
+        connection.executescript('''
+            CREATE TABLE problems (
+                submissions_link TEXT PRIMARY KEY, slug TEXT, name TEXT NOT NULL, difficulty TEXT NOT NULL, points TEXT,
+                status INTEGER NOT NULL, problem_link TEXT NOT NULL, last_submission_id TEXT
+            );
+            CREATE TABLE solutions (
+                submissions_link TEXT NOT NULL, filename TEXT NOT NULL, language TEXT NOT NULL, content_hash TEXT
+            );
+            INSERT INTO problems VALUES ('link', 'slug', 'Name', 'Easy', '1.5', 1, 'https://open.kattis.com/problems/slug', '7');
+        ''')
+        connection.close()
+        self.store = SqliteStateStore(Path(TEST_DIR), read_only=True)
+        sp = self.store.load_solved_problems()[0]
+        assert (sp.name, sp.activity, sp.activity_rank) == ('Name', None, None)
+        connection = sqlite3.connect(TEST_FILE)
+        assert len(connection.execute('PRAGMA table_info(problems)').fetchall()) == 8
+        connection.close()
+
+    def test_pending_solved_problems(self):
+        self.store.save(deepcopy(SOLVED_PROBLEMS))
+        assert [sp.name for sp in self.store.pending_solved_problems()] == ['Problem4']
+
+    def test_pending_solved_problems_uses_status_index(self):
+        connection = self.store._SqliteStateStore__connection
+        queries = []
+        connection.set_trace_callback(lambda sql: queries.append(sql) if sql.startswith('SELECT * FROM problems') else None)
+        self.store.pending_solved_problems()
+        connection.set_trace_callback(None)
+        plan = ' '.join(row[-1] for row in connection.execute('EXPLAIN QUERY PLAN ' + queries[0]))
+        assert 'USING INDEX problems_status' in plan
+
+    def test_get_by_slug(self):
+        self.store.save(deepcopy(SOLVED_PROBLEMS))
+        assert self.store.get_by_slug('problem_link2') == SOLVED_PROBLEMS[1]
+        assert self.store.get_by_slug('unknown') is None
+
+    def test_migrate_from_csv(self):
+        self.store.close()
+        os.remove(TEST_FILE)
+        with open(TEST_CSV_FILE, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELD_NAMES)
+            writer.writeheader()
+            for sp in SOLVED_PROBLEMS:
+                writer.writerow(sp.to_dict())
+        self.store = SqliteStateStore(Path(TEST_DIR))
+        assert self.store.load_solved_problems() == SOLVED_PROBLEMS
+        assert os.path.exists(TEST_CSV_FILE)
+
+    def test_should_add_to_gitignore(self):
+        assert self.store.should_add_to_gitignore is True
+        assert self.store.should_add_to_gitignore is False
+        with open(TEST_GITIGNORE, 'r') as ignore_file:
+            assert ignore_file.read() == 'status.db*\n'
@@ -0,0 +1,279 @@
+import csv
+import os
+import asyncio
+import json
+import time
+import shutil
+import signal
+import threading
+import tracemalloc
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest import TestCase, mock
+from benchmark.stand_in import KattisStandIn, SyntheticAccount
+from src.solved_problem import ProblemStatus
+from src.async_http_client import AsyncResponse
+from src.sqlite_state import SqliteStateStore
+from KattisToGithub import KattisToGithub, run_batch, _skipped_batch_account
+
+USER = 'benchmark'
+PASSWORD = 'benchmark-password'
+
+
+class TestStandIn(TestCase):
+    """
+    Runs the whole sync offline against the stand-in used by benchmark/run_benchmark.py.
+    """
+    def setUp(self) -> None:
+        self.directory = Path(mkdtemp())
+        self.account = SyntheticAccount(USER, PASSWORD, problems=12)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+        return super().tearDown()
+
+    def __ktg(self, stand_in: KattisStandIn, *args: str) -> KattisToGithub:
+        argv = ['', '-u', USER, '-p', PASSWORD, '-d', str(self.directory), '--base-url', stand_in.base_url, '--no-git', *args]
+        with mock.patch('sys.argv', argv):
+            ktg = KattisToGithub()
+            ktg.get_run_details_from_sys_argv()
+        return ktg
+
+    def __run(self, stand_in: KattisStandIn, *args: str) -> KattisToGithub:
+        ktg = self.__ktg(stand_in, *args)
+        ktg.run()
+        return ktg
+
+    def __status_rows(self):
+        with open(self.directory / 'status.csv', 'r') as csv_file:
+            return list(csv.DictReader(csv_file))
+
+    def test_full_sync(self):
+        with KattisStandIn(self.account) as stand_in:
+            ktg = self.__run(stand_in)
+        assert len(ktg.solved_problems) == 12
+        assert all(sp.status == ProblemStatus.CODE_FOUND for sp in ktg.solved_problems)
+        assert len(self.__status_rows()) == 12
+        assert (self.directory / 'README.md').exists()
+        assert stand_in.stats.requests['login'] == 2
+
+    def test_second_run_reuses_session_and_fetches_new_submission(self):
+        with KattisStandIn(self.account) as stand_in:
+            self.__run(stand_in)
+            problem = self.account.problems[-1]
+            self.account.add_submission(problem.slug, 'Python 3', 'print("new")')
+            stand_in.stats.reset()
+            ktg = self.__run(stand_in)
+        assert 'login' not in stand_in.stats.requests
+        assert stand_in.stats.requests['submission'] == 1
+        with open(self.directory / 'Solutions' / f'{problem.slug}.py', 'r') as file:
+            assert file.read() == 'print("new")'
+        assert ktg.failed_links == set()
+
+    def test_unreadable_submissions_page_is_retried(self):
+        from benchmark import stand_in as stand_in_module
+        expired = self.account.problems[3]
+        def submissions_page(problem):
+            # Kattis answers with its login page once the session has expired
+            return stand_in_module.login_page('token') if problem is expired else original(problem)
+        original = stand_in_module.submissions_page
+        with KattisStandIn(self.account) as stand_in:
+            with mock.patch.object(stand_in_module, 'submissions_page', side_effect=submissions_page):
+                ktg = self.__run(stand_in)
+            assert [sp.name for sp in ktg.solved_problems if sp.submissions_link in ktg.failed_links] == [expired.name]
+            assert len(self.__status_rows()) == 12
+            ktg = self.__run(stand_in)
+        assert ktg.failed_links == set()
+        assert all(sp.status == ProblemStatus.CODE_FOUND for sp in ktg.solved_problems)
+
+    def test_unchanged_warm_run_checks_no_submissions(self):
+        with KattisStandIn(self.account) as stand_in:
+            self.__run(stand_in)
+            for args in [(), ('--full',)]:
+                stand_in.stats.reset()
+                self.__run(stand_in, *args)
+                assert stand_in.stats.requests.get('submissions', 0) == 0
+                assert stand_in.stats.requests.get('submission', 0) == 0
+        assert stand_in.stats.requests['problems'] == 1
+
+    def test_warm_run_checks_only_changed_problems(self):
+        with KattisStandIn(self.account) as stand_in:
+            self.__run(stand_in)
+            slug = self.account.problems[5].slug
+            self.account.add_submission(slug, 'Go', 'package main')
+            stand_in.stats.reset()
+            ktg = self.__run(stand_in)
+            assert ktg.recently_active_links == {ktg.registry.get_by_slug(slug).submissions_link}
+            assert stand_in.stats.requests['submissions'] == 1
+            stand_in.stats.reset()
+            self.account.add_submission(self.account.problems[-1].slug, 'Go', 'package main')
+            self.__run(stand_in, '--full')
+        assert stand_in.stats.requests['submissions'] == 1
+
+    def test_sqlite_state_is_upserted(self):
+        with KattisStandIn(self.account) as stand_in:
+            ktg = self.__run(stand_in, '--state', 'sqlite')
+            ktg.state_store.close()
+            slug = self.account.problems[3].slug
+            self.account.add_submission(slug, 'Go', 'package main')
+            ktg = self.__run(stand_in, '--state', 'sqlite')
+        ktg.state_store.close()
+        store = SqliteStateStore(self.directory)
+        assert len(store.load_solved_problems()) == 12
+        assert f'{slug}.go' in store.get_by_slug(slug).filename_language_dict
+        assert store.get_by_slug(slug).activity_rank < min(sp.activity_rank for sp in store.load_solved_problems() if sp.slug != slug)
+        store.close()
+        assert not (self.directory / 'status.csv').exists()
+
+    def test_profile_report(self):
+        with KattisStandIn(self.account) as stand_in:
+            self.__run(stand_in, '--profile', str(self.directory / 'profile.json'))
+        with open(self.directory / 'profile.json', 'r') as file:
+            report = json.load(file)
+        assert report['requests'] == stand_in.stats.total_requests
+        assert report['phases']['submission_fetch']['requests'] == stand_in.stats.requests['submissions'] + stand_in.stats.requests['submission']
+        assert report['bytes_transferred'] == stand_in.stats.bytes_sent
+        assert report['bytes_transferred'] < report['bytes_received']
+        assert report['timers']['parse']['count'] > 0
+        assert report['timers']['write']['count'] > 0
+
+    def test_full_sync_with_server_errors(self):
+        with KattisStandIn(self.account, error_rate=0.1, seed=1) as stand_in:
+            ktg = self.__run(stand_in, '--no-cache')
+        assert stand_in.stats.errors > 0
+        assert all(sp.status == ProblemStatus.CODE_FOUND for sp in ktg.solved_problems)
+
+    def test_batch(self):
+        other_account = SyntheticAccount('other', 'other-password', problems=5, seed=1)
+        with KattisStandIn(self.account) as stand_in, KattisStandIn(other_account) as other_stand_in:
+            with open(self.directory / 'batch.json', 'w') as file:
+                json.dump({
+                    'workers': 3,
+                    'requests_per_second': 1000,
+                    'defaults': {'no_git': True},
+                    'accounts': [
+                        {'user': USER, 'password': PASSWORD, 'directory': 'first', 'base_url': stand_in.base_url},
+                        {'user': 'other', 'password': 'wrong', 'directory': 'second', 'base_url': other_stand_in.base_url},
+                        {'user': 'other', 'password': 'other-password', 'directory': 'third', 'base_url': other_stand_in.base_url}
+                    ]
+                }, file)
+            for directory in ['first', 'second', 'third']:
+                (self.directory / directory).mkdir()
+            assert run_batch(self.directory / 'batch.json') is False
+        assert len(os.listdir(self.directory / 'first' / 'Solutions')) >= 12
+        assert not (self.directory / 'second' / 'status.csv').exists()
+        assert len(os.listdir(self.directory / 'third' / 'Solutions')) >= 5
+
+    def test_batch_interrupted(self):
+        with open(self.directory / 'batch.json', 'w') as file:
+            json.dump({'accounts': [{'user': f'user{n}', 'password': 'p', 'directory': f'd{n}'} for n in range(3)]}, file)
+        started = []
+        def run_account(account, *args):
+            started.append(account.arguments.user)
+            signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+            time.sleep(0.2)
+            return {**_skipped_batch_account(account), 'status': 'ok'}
+        with mock.patch('KattisToGithub._run_batch_account', side_effect=run_account):
+            assert run_batch(self.directory / 'batch.json') is False
+        assert started == ['user0']
+
+    def test_watch_poll_after_exhausted_error_budget(self):
+        with KattisStandIn(self.account) as stand_in:
+            ktg = self.__run(stand_in)
+            while ktg.http_client.errors_left > 0:
+                ktg.http_client._use_error_budget()
+            assert ktg._poll_recent_activity() is not None
+
+    def test_watch(self):
+        problem = self.account.problems[-1]
+        sleeps = []
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 3:
+                stand_in.stats.reset()
+                self.account.add_submission(problem.slug, 'Python 3', 'print("watched")')
+            elif len(sleeps) == 5:
+                raise KeyboardInterrupt
+        with KattisStandIn(self.account) as stand_in:
+            ktg = self.__ktg(stand_in, '--watch', '--poll-interval', '10')
+            with mock.patch('KattisToGithub.time.sleep', side_effect=sleep):
+                ktg.watch()
+        assert sleeps == [10, 20, 40, 10, 20]
+        assert 'login' not in stand_in.stats.requests
+        assert stand_in.stats.requests['submission'] == 1
+        with open(self.directory / 'Solutions' / f'{problem.slug}.py', 'r') as file:
+            assert file.read() == 'print("watched")'
+
+    def test_new_submission_is_downloaded_as_raw_source(self):
+        with KattisStandIn(self.account) as stand_in:
+            ktg = self.__run(stand_in)
+            assert 'source' not in stand_in.stats.requests
+            problem = self.account.problems[-1]
+            filename, language = next(iter(ktg.registry.get(ktg._solved_problem_submission_url + problem.slug).filename_language_dict.items()))
+            submission = self.account.add_submission(problem.slug, language, 'print("raw")\n# ä')
+            submission.filename = filename
+            stand_in.stats.reset()
+            self.__run(stand_in)
+        assert stand_in.stats.requests['source'] == 1
+        assert 'submission' not in stand_in.stats.requests
+        with open(self.directory / 'Solutions' / filename, 'r', encoding='utf-8') as file:
+            assert file.read() == 'print("raw")\n# ä'
+
+    def test_discover_new_submissions(self):
+        with KattisStandIn(self.account) as stand_in:
+            self.__run(stand_in, '--discover')
+            assert 'all_submissions' not in stand_in.stats.requests
+            first, second = self.account.problems[-1], self.account.problems[-2]
+            self.account.add_submission(first.slug, 'Python 3', 'print("first")')
+            self.account.add_submission(second.slug, 'Go', 'package main')
+            stand_in.stats.reset()
+            ktg = self.__run(stand_in, '--discover')
+        assert stand_in.stats.requests['all_submissions'] == 1
+        assert 'submissions' not in stand_in.stats.requests
+        assert stand_in.stats.requests['submission'] == 2
+        assert set(ktg.discovered_submissions) == {ktg._solved_problem_submission_url + problem.slug for problem in [first, second]}
+        with open(self.directory / 'Solutions' / f'{second.slug}.go', 'r') as file:
+            assert file.read() == 'package main'
+
+    def test_async_engine(self):
+        def async_fetch(ktg: KattisToGithub):
+            async def fetch(url, headers):
+                response = await asyncio.to_thread(ktg.session.get, url, headers=headers, timeout=5)
+                return AsyncResponse(response.status_code, response.text, response.content, dict(response.headers))
+            return fetch
+        with KattisStandIn(self.account, error_rate=0.1, seed=1) as stand_in:
+            ktg = self.__ktg(stand_in, '--async', '--workers', '16')
+            ktg.async_fetch = async_fetch(ktg)
+            ktg.run()
+            assert all(sp.status == ProblemStatus.CODE_FOUND for sp in ktg.solved_problems)
+            assert len(self.__status_rows()) == 12
+            assert stand_in.stats.errors > 0
+            problem = self.account.problems[-1]
+            self.account.add_submission(problem.slug, 'Python 3', 'print("async")')
+            stand_in.error_rate = 0.0
+            stand_in.stats.reset()
+            ktg = self.__ktg(stand_in, '--async')
+            ktg.async_fetch = async_fetch(ktg)
+            ktg.run()
+        assert stand_in.stats.requests['submission'] == 1
+        assert ktg.failed_links == set()
+        with open(self.directory / 'Solutions' / f'{problem.slug}.py', 'r') as file:
+            assert file.read() == 'print("async")'
+
+    def test_downloaded_codes_are_not_kept_in_memory(self):
+        account = SyntheticAccount(USER, PASSWORD, problems=30, seed=2)
+        for submission in account.submissions.values():
+            submission.code = f'x = {submission.id}\n' * 20000
+        code_size = sum(len(s.code) for s in account.submissions.values() if s.accepted)
+        with KattisStandIn(account) as stand_in:
+            ktg = self.__ktg(stand_in, '--no-cache')
+            tracemalloc.start()
+            try:
+                ktg.run()
+                retained, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        assert all(sp.status == ProblemStatus.CODE_FOUND for sp in ktg.solved_problems)
+        assert retained < code_size / 10
+        assert peak < code_size